@@ -0,0 +1,277 @@
+# batch_predict.py - Headless batch scoring of soil-survey CSV, Parquet and Arrow exports
+#
+# Usage:
+#   python batch_predict.py survey.csv predictions.csv --chunk-size 50000
+#   python batch_predict.py survey.csv predictions.csv --top-k 3
+#   python batch_predict.py survey.parquet predictions.parquet --top-k 3
+#
+# The input needs the columns N,P,K,temperature,humidity,ph,rainfall (extra
+# columns are ignored). Rows are read, scored and written one chunk at a
+# time, so memory use depends on --chunk-size and not on the file size.
+# Formats follow the file extension: .parquet/.pq and .arrow/.feather/.ipc
+# are read as Arrow record batches of just the seven feature columns,
+# straight into the feature matrix without going through pandas, and
+# .parquet output is written batch by batch with pyarrow's ParquetWriter.
+# pyarrow is only needed for those formats.
+# With --top-k the runner-up crops are written as prediction_2/confidence_2
+# and so on, all taken from the same predict_proba call.
+#
+# Every chunk is checked by validation.py (missing, non-numeric and
+# infinite values, and the sidebar input ranges) before scoring. Rows that
+# fail are left out of the output and written to --quarantine (default
+# <output>.rejected.csv, only created when there are any) with their
+# 0-based input row number, the values as they were read (text stays
+# text), the error code and a readable description; the job carries on.
+# CSV numbers are parsed with float_precision='round_trip', so scored and
+# quarantined values are exactly the ones in the file. If every row is
+# rejected the output still gets its header (CSV) or schema (Parquet).
+
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURES
+from inference import predict_batch, top_k
+from model_registry import BACKENDS, DEFAULT_BACKEND, DEFAULT_MODEL, load_model
+from validation import explain, validate
+
+
+DEFAULT_CHUNK_SIZE = 50_000
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+ARROW_SUFFIXES = ('.arrow', '.feather', '.ipc')
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit('Parquet/Arrow files need pyarrow: pip install pyarrow')
+    return pyarrow
+
+
+def iter_csv_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (X, error codes, raw chunk) from a CSV, chunk_size rows at a time"""
+    # No dtype= here: one unparsable value would abort the whole read
+    chunks = pd.read_csv(path, usecols=FEATURES, chunksize=chunk_size, low_memory=False,
+                         float_precision='round_trip')
+    for chunk in chunks:
+        yield (*validate(chunk), chunk)
+
+
+def _feature_matrix(batch):
+    """(X, error codes, raw columns) from the feature columns of an Arrow record batch"""
+    pa = _pyarrow()
+    columns = {}
+    for name in FEATURES:
+        column = batch.column(name)
+        if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+            column = column.cast(pa.float64())
+        # Nulls come through as NaN (or None in text columns)
+        columns[name] = column.to_numpy(zero_copy_only=False)
+    return (*validate(columns), columns)
+
+
+def iter_parquet_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (X, error codes, raw columns) from a Parquet file, one record batch at a time"""
+    pa = _pyarrow()
+    parquet = pa.parquet.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=FEATURES):
+        yield _feature_matrix(batch)
+
+
+def iter_arrow_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (X, error codes, raw columns) from an Arrow IPC file or stream"""
+    pa = _pyarrow()
+    with pa.memory_map(path) as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            source.seek(0)
+            batches = iter(pa.ipc.open_stream(source))
+        for batch in batches:
+            batch = batch.select(FEATURES)
+            for start in range(0, batch.num_rows, chunk_size):
+                yield _feature_matrix(batch.slice(start, chunk_size))
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Pick the reader for a file by its extension"""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in PARQUET_SUFFIXES:
+        return iter_parquet_chunks(path, chunk_size)
+    if suffix in ARROW_SUFFIXES:
+        return iter_arrow_chunks(path, chunk_size)
+    return iter_csv_chunks(path, chunk_size)
+
+
+def rank_chunk(model, X, k=1):
+    """Prediction columns for one chunk: prediction/confidence, then prediction_2/confidence_2 ..."""
+    if k == 1:
+        labels, confidence = predict_batch(model, X)
+        return {'prediction': labels, 'confidence': confidence}
+
+    labels, proba = top_k(model, X, k)
+    columns = {'prediction': labels[:, 0], 'confidence': proba[:, 0]}
+    for rank in range(1, labels.shape[1]):
+        columns[f'prediction_{rank + 1}'] = labels[:, rank]
+        columns[f'confidence_{rank + 1}'] = proba[:, rank]
+    return columns
+
+
+def output_columns(model, k=1):
+    """Column names of the scored output, known before any row is scored"""
+    ranks = min(k, len(model.classes_)) if hasattr(model, 'predict_proba') else 1
+    columns = list(FEATURES)
+    for rank in range(1, ranks + 1):
+        suffix = '' if rank == 1 else f'_{rank}'
+        columns += [f'prediction{suffix}', f'confidence{suffix}']
+    return columns
+
+
+def output_schema(model, k=1):
+    """Arrow schema of the scored output: float64 columns, string predictions"""
+    pa = _pyarrow()
+    return pa.schema([
+        (name, pa.string() if name.startswith('prediction') else pa.float64())
+        for name in output_columns(model, k)
+    ])
+
+
+def score_chunk(model, X, k=1):
+    """Score one chunk and return it as an output frame"""
+    out = pd.DataFrame(X, columns=FEATURES)
+    for name, values in rank_chunk(model, X, k).items():
+        out[name] = values
+    return out
+
+
+def score_record_batch(model, X, k=1):
+    """Score one chunk and return it as an Arrow record batch"""
+    pa = _pyarrow()
+    columns = {name: X[:, j] for j, name in enumerate(FEATURES)}
+    columns.update(rank_chunk(model, X, k))
+    return pa.RecordBatch.from_pydict(columns)
+
+
+class Quarantine:
+    """CSV of rejected rows, opened on the first one"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._file = None
+
+    def write(self, raw, codes, first_row):
+        """Append the rows with a non-zero code, taken from raw (a DataFrame or {feature: column})"""
+        bad = np.flatnonzero(codes)
+        out = pd.DataFrame({name: np.asarray(raw[name])[bad] for name in FEATURES})
+        out.insert(0, 'row', first_row + bad)
+        out['error_code'] = codes[bad]
+        out['errors'] = ['; '.join(explain(code)) for code in codes[bad]]
+        if self._file is None:
+            self._file = open(self.path, 'w', newline='')
+        out.to_csv(self._file, header=(self.rows == 0), index=False)
+        self.rows += len(bad)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def iter_valid_chunks(input_path, chunk_size=DEFAULT_CHUNK_SIZE, quarantine=None):
+    """Yield the valid rows of every chunk, sending the others to quarantine (if given)"""
+    seen = 0
+    for X, codes, raw in iter_chunks(input_path, chunk_size):
+        good = codes == 0
+        if not good.all():
+            if quarantine is not None:
+                quarantine.write(raw, codes, seen)
+            X = X[good]
+        seen += len(good)
+        if len(X):
+            yield X
+
+
+def score_csv(input_path, output_path, model, chunk_size=DEFAULT_CHUNK_SIZE, k=1, quarantine=None):
+    """Stream input_path through the model into a CSV at output_path, returns rows scored"""
+    total = 0
+    with open(output_path, 'w', newline='') as out:
+        for X in iter_valid_chunks(input_path, chunk_size, quarantine):
+            score_chunk(model, X, k).to_csv(out, header=(total == 0), index=False)
+            total += len(X)
+        if total == 0:
+            # Every row was rejected: still write the header
+            pd.DataFrame(columns=output_columns(model, k)).to_csv(out, index=False)
+    return total
+
+
+def score_parquet(input_path, output_path, model, chunk_size=DEFAULT_CHUNK_SIZE, k=1, quarantine=None):
+    """Stream input_path through the model into a Parquet file at output_path, returns rows scored"""
+    pa = _pyarrow()
+    total = 0
+    writer = None
+    try:
+        for X in iter_valid_chunks(input_path, chunk_size, quarantine):
+            batch = score_record_batch(model, X, k)
+            if writer is None:
+                writer = pa.parquet.ParquetWriter(output_path, batch.schema)
+            writer.write_batch(batch)
+            total += len(X)
+        if writer is None:
+            # Every row was rejected: still leave a valid, empty file
+            pa.parquet.write_table(output_schema(model, k).empty_table(), output_path)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def score_file(input_path, output_path, model, chunk_size=DEFAULT_CHUNK_SIZE, k=1, quarantine=None):
+    """Score any supported input into CSV or Parquet, chosen by output_path's extension"""
+    if os.path.splitext(output_path)[1].lower() in PARQUET_SUFFIXES:
+        return score_parquet(input_path, output_path, model, chunk_size, k, quarantine)
+    return score_csv(input_path, output_path, model, chunk_size, k, quarantine)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score a file of soil/climate readings with the crop model')
+    parser.add_argument('input', help='CSV, Parquet or Arrow file with N,P,K,temperature,humidity,ph,rainfall columns')
+    parser.add_argument('output', help='where to write the predictions (.parquet for Parquet, otherwise CSV)')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='artifact name or path to a .pkl (default: %(default)s)')
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND, help='inference backend (default: %(default)s)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows per vectorized chunk (default: %(default)s)')
+    parser.add_argument('--top-k', type=int, default=1, help='ranked crops to write per row (default: %(default)s)')
+    parser.add_argument('--quarantine', help='CSV for rows that fail validation (default: <output>.rejected.csv)')
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be positive')
+    if args.top_k < 1:
+        parser.error('--top-k must be positive')
+
+    model = load_model(args.model, args.backend).model
+    quarantine = Quarantine(args.quarantine or f"{os.path.splitext(args.output)[0]}.rejected.csv")
+    start = time.perf_counter()
+    try:
+        total = score_file(args.input, args.output, model, args.chunk_size, args.top_k, quarantine)
+    finally:
+        quarantine.close()
+    elapsed = time.perf_counter() - start
+
+    rate = total / elapsed if elapsed > 0 else float('inf')
+    print(f"Scored {total:,} rows in {elapsed:.2f}s ({rate:,.0f} rows/s) -> {args.output}", file=sys.stderr)
+    if quarantine.rows:
+        print(f"Rejected {quarantine.rows:,} invalid rows -> {quarantine.path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# bench_batch_formats.py - CSV vs Parquet throughput of batch_predict.py
+#
+# Usage:
+#   python benchmarks/bench_batch_formats.py --rows 1000000 --top-k 3
+#
+# Writes the same random readings (across the sidebar input ranges) as CSV
+# and as Parquet, then times reading alone and full scoring runs for
+# csv -> csv, parquet -> csv and parquet -> parquet. The Parquet and CSV
+# runs must produce the same predictions; the script exits non-zero
+# otherwise.
+
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_predict import DEFAULT_CHUNK_SIZE, iter_chunks, score_file  # noqa: E402
+from features import FEATURES, INPUT_SPECS  # noqa: E402
+from model_registry import BACKENDS, load_model  # noqa: E402
+
+
+def random_frame(n, seed=0):
+    low = [INPUT_SPECS[f][0] for f in FEATURES]
+    high = [INPUT_SPECS[f][1] for f in FEATURES]
+    X = np.random.default_rng(seed).uniform(low, high, (n, len(FEATURES))).round(3)
+    return pd.DataFrame(X, columns=FEATURES)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def read_all(path, chunk_size):
+    return sum(len(X) for X, *_ in iter_chunks(path, chunk_size))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare CSV and Parquet batch scoring throughput')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--model', default='RF')
+    parser.add_argument('--backend', choices=BACKENDS, default='sklearn')
+    args = parser.parse_args(argv)
+
+    import pyarrow.parquet as pq
+
+    warnings.filterwarnings('ignore', message='Trying to unpickle estimator')
+    model = load_model(args.model, args.backend).model
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {fmt: os.path.join(tmp, f"input.{fmt}") for fmt in ('csv', 'parquet')}
+        frame = random_frame(args.rows)
+        frame.to_csv(paths['csv'], index=False)
+        frame.to_parquet(paths['parquet'], index=False, row_group_size=args.chunk_size)
+        del frame
+
+        report = {
+            'rows': args.rows,
+            'chunk_size': args.chunk_size,
+            'top_k': args.top_k,
+            'input_bytes': {fmt: os.path.getsize(path) for fmt, path in paths.items()},
+            'read_rows_per_s': {},
+            'score_rows_per_s': {},
+        }
+        for fmt, path in paths.items():
+            _, seconds = timed(lambda: read_all(path, args.chunk_size))
+            report['read_rows_per_s'][fmt] = round(args.rows / seconds)
+
+        outputs = {}
+        for source, target in (('csv', 'csv'), ('parquet', 'csv'), ('parquet', 'parquet')):
+            out = os.path.join(tmp, f"{source}-out.{target}")
+            _, seconds = timed(lambda: score_file(paths[source], out, model, args.chunk_size, args.top_k))
+            report['score_rows_per_s'][f"{source}->{target}"] = round(args.rows / seconds)
+            outputs[f"{source}->{target}"] = out
+
+        predictions = [
+            pd.read_csv(outputs['csv->csv'], usecols=['prediction'])['prediction'].to_numpy(),
+            pd.read_csv(outputs['parquet->csv'], usecols=['prediction'])['prediction'].to_numpy(),
+            pq.read_table(outputs['parquet->parquet'], columns=['prediction'])['prediction'].to_numpy(),
+        ]
+        identical = all(np.array_equal(predictions[0], p) for p in predictions[1:])
+        report['identical_predictions'] = identical
+
+    print(json.dumps(report, indent=2))
+    return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
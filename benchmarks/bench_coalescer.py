@@ -0,0 +1,91 @@
+# bench_coalescer.py - Throughput and tail latency of direct vs coalesced predictions
+#
+# Usage:
+#   python benchmarks/bench_coalescer.py --concurrency 1 4 16 64 --window-ms 2 5
+#
+# N client threads each send single-row predictions back to back, either
+# straight to predict_batch (one model call per row) or through a
+# MicroBatcher. Prints one JSON line per (mode, concurrency).
+
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coalescer import MicroBatcher  # noqa: E402
+from features import DATASET_PATH, FEATURES  # noqa: E402
+from inference import predict_batch  # noqa: E402
+from model_registry import BASE_DIR, DEFAULT_MODEL, load_model  # noqa: E402
+
+
+def load_rows():
+    return np.genfromtxt(os.path.join(BASE_DIR, DATASET_PATH), delimiter=',', skip_header=1, usecols=range(len(FEATURES)))
+
+
+def run(predict_one, rows, concurrency, per_client):
+    latencies = [[] for _ in range(concurrency)]
+
+    def client(i):
+        out = latencies[i]
+        for j in range(per_client):
+            row = rows[(i * per_client + j) % len(rows)]
+            start = time.perf_counter()
+            predict_one(row)
+            out.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    lat_ms = np.concatenate([np.array(l) for l in latencies]) * 1000
+    return {
+        'concurrency': concurrency,
+        'predictions': len(lat_ms),
+        'throughput_per_s': round(len(lat_ms) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(lat_ms, 50)), 3),
+        'p99_ms': round(float(np.percentile(lat_ms, 99)), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the micro-batching coalescer')
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument('--window-ms', type=float, nargs='+', default=[2.0, 5.0])
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--per-client', type=int, default=200, help='predictions per client thread')
+    args = parser.parse_args(argv)
+
+    model = load_model(args.model).model
+    rows = load_rows()
+
+    for concurrency in args.concurrency:
+        result = run(lambda row: predict_batch(model, row), rows, concurrency, args.per_client)
+        print(json.dumps({'mode': 'direct', **result}), flush=True)
+
+        for window_ms in args.window_ms:
+            batcher = MicroBatcher(model, window_ms, args.max_batch)
+            try:
+                result = run(batcher.predict, rows, concurrency, args.per_client)
+            finally:
+                batcher.close()
+            print(json.dumps({
+                'mode': 'coalesced', 'window_ms': window_ms,
+                'mean_batch': round(batcher.mean_batch_size, 1), **result,
+            }), flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
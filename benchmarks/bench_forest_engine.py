@@ -0,0 +1,116 @@
+# bench_forest_engine.py - Check CompiledForest against sklearn, then time both
+#
+# Usage:
+#   python benchmarks/bench_forest_engine.py --models RF RandomForest
+#
+# For every model the compiled forest must reproduce predict() and
+# predict_proba() exactly on Crop_recommendation.csv (whole and in small
+# batches) and on random points across the sidebar input ranges; the script
+# exits non-zero otherwise.
+# Latency is then measured for single rows and for larger batches.
+
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features import DATASET_PATH, FEATURES, INPUT_SPECS  # noqa: E402
+from forest_engine import CompiledForest  # noqa: E402
+from model_registry import BASE_DIR, artifact_path, read_manifest  # noqa: E402
+
+
+def load_rows():
+    return np.genfromtxt(os.path.join(BASE_DIR, DATASET_PATH), delimiter=',', skip_header=1, usecols=range(len(FEATURES)))
+
+
+def load_pickle(name):
+    """The pickled estimator itself: load_model() refuses forests whose leaves
+    hold vote counts, but the engine must still match them"""
+    with open(artifact_path(name, read_manifest()), 'rb') as f:
+        return pickle.load(f)
+
+
+def random_rows(n, seed=0):
+    low = [INPUT_SPECS[f][0] for f in FEATURES]
+    high = [INPUT_SPECS[f][1] for f in FEATURES]
+    return np.random.default_rng(seed).uniform(low, high, (n, len(FEATURES)))
+
+
+def check_equivalence(model, compiled, X):
+    """Return a list of mismatch descriptions (empty when identical)"""
+    problems = []
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        expected_proba = model.predict_proba(X)
+        expected = model.predict(X)
+    if not np.array_equal(expected_proba, compiled.predict_proba(X)):
+        problems.append('predict_proba differs')
+    if not np.array_equal(expected, compiled.predict(X)):
+        problems.append('predict differs')
+    return problems
+
+
+def time_calls(fn, X, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - start)
+    ms = np.array(times) * 1000
+    return {'p50_ms': round(float(np.percentile(ms, 50)), 4), 'p99_ms': round(float(np.percentile(ms, 99)), 4)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Equivalence and latency of the compiled forest engine')
+    parser.add_argument('--models', nargs='+', default=['RF', 'RandomForest'])
+    parser.add_argument('--repeats', type=int, default=200)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100, 10_000])
+    args = parser.parse_args(argv)
+
+    dataset = load_rows()
+    failed = False
+    for name in args.models:
+        model = load_pickle(name)
+        compiled = CompiledForest.from_sklearn(model)
+
+        problems = []
+        # Small batches take the lock-step path, large ones the per-tree path
+        cases = [('dataset', dataset), ('random', random_rows(50_000))]
+        cases += [(f"dataset[{i}:{i + 100}]", dataset[i:i + 100]) for i in range(0, len(dataset), 100)]
+        for label, X in cases:
+            problems += [f"{label}: {p}" for p in check_equivalence(model, compiled, X)]
+        failed |= bool(problems)
+
+        report = {
+            'model': name,
+            'trees': compiled.n_trees,
+            'nodes': compiled.n_nodes,
+            'compiled_bytes': compiled.nbytes,
+            'identical': not problems,
+            'problems': problems,
+            'latency': {},
+        }
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='X does not have valid feature names')
+            for batch in args.batch_sizes:
+                X = random_rows(batch, seed=batch)
+                repeats = max(5, args.repeats // max(1, batch // 100))
+                report['latency'][batch] = {
+                    'sklearn': time_calls(model.predict_proba, X, repeats),
+                    'compiled': time_calls(compiled.predict_proba, X, repeats),
+                }
+        print(json.dumps(report, indent=2), flush=True)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# bench_inference_pool.py - Prediction throughput of InferencePool by worker count
+#
+# Usage:
+#   python benchmarks/bench_inference_pool.py --workers 1 2 4 8 --clients 16
+#
+# 'single' has --clients threads, like Streamlit sessions, each asking for one
+# row at a time. 'batch' scores --batch-rows rows per call, which the pool
+# splits across its workers. The in-process sklearn model and CompiledForest
+# are measured under the same load as the baseline the pool has to beat.
+# Pool results are checked against sklearn before timing.
+
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features import FEATURES, INPUT_SPECS  # noqa: E402
+from forest_engine import CompiledForest  # noqa: E402
+from inference import predict_proba  # noqa: E402
+from inference_pool import InferencePool  # noqa: E402
+from model_registry import load_model  # noqa: E402
+
+
+def random_rows(n, seed=0):
+    low = [INPUT_SPECS[f][0] for f in FEATURES]
+    high = [INPUT_SPECS[f][1] for f in FEATURES]
+    return np.random.default_rng(seed).uniform(low, high, (n, len(FEATURES)))
+
+
+def single_row_throughput(model, clients, seconds):
+    """Rows per second with `clients` threads each predicting one row per call"""
+    rows = random_rows(1000)
+    stop = time.perf_counter() + seconds
+    counts = [0] * clients
+
+    def client(i):
+        n = 0
+        while time.perf_counter() < stop:
+            predict_proba(model, rows[n % len(rows)][np.newaxis, :])
+            n += 1
+        counts[i] = n
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return round(sum(counts) / (time.perf_counter() - start), 1)
+
+
+def batch_throughput(model, batch_rows, repeats):
+    X = random_rows(batch_rows, seed=1)
+    predict_proba(model, X)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict_proba(model, X)
+    return round(batch_rows * repeats / (time.perf_counter() - start), 1)
+
+
+def measure(label, model, args):
+    return {
+        'backend': label,
+        'single_rows_per_s': single_row_throughput(model, args.clients, args.seconds),
+        'batch_rows_per_s': batch_throughput(model, args.batch_rows, args.repeats),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Throughput of the shared-memory inference pool')
+    parser.add_argument('--model', default='RF')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--clients', type=int, default=16, help='concurrent single-row callers')
+    parser.add_argument('--seconds', type=float, default=3.0, help='duration of the single-row test')
+    parser.add_argument('--batch-rows', type=int, default=100_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+    warnings.filterwarnings('ignore', message='Trying to unpickle estimator')
+    model = load_model(args.model, 'sklearn').model
+    check = random_rows(5000, seed=2)
+    expected = predict_proba(model, check)
+
+    results = [measure('sklearn', model, args), measure('compiled', CompiledForest.from_sklearn(model), args)]
+    for workers in args.workers:
+        start = time.perf_counter()
+        with InferencePool(model, workers) as pool:
+            startup = time.perf_counter() - start
+            if not np.array_equal(pool.predict_proba(check), expected):
+                print(f"pool with {workers} workers disagrees with sklearn", file=sys.stderr)
+                return 1
+            results.append({**measure(f'pool[{workers}]', pool, args), 'startup_s': round(startup, 3)})
+        print(f"measured {workers} workers", file=sys.stderr)
+
+    print(json.dumps({'cpus': os.cpu_count(), 'clients': args.clients, 'results': results}, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
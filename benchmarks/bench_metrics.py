@@ -0,0 +1,87 @@
+# bench_metrics.py - Cost of a metrics.py span and accuracy of its quantiles
+#
+# Usage:
+#   python benchmarks/bench_metrics.py --calls 1000000 --threads 8
+#
+# Times an empty `with span(...)` block (single thread and --threads
+# contending threads, which is what Streamlit sessions do) against an empty
+# loop, then records lognormal latencies and compares p50/p95/p99 from the
+# histogram with numpy's exact percentiles. Exits non-zero if any quantile is
+# off by more than one bucket width (19%).
+
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import QUANTILES, Metrics  # noqa: E402
+
+
+def loop_seconds(calls, body):
+    start = time.perf_counter()
+    for _ in range(calls):
+        body()
+    return time.perf_counter() - start
+
+
+def span_overhead_ns(registry, calls, threads=1):
+    def empty():
+        pass
+
+    def spanned():
+        with registry.span('bench'):
+            pass
+
+    baseline = loop_seconds(calls, empty)
+    if threads == 1:
+        seconds = loop_seconds(calls, spanned)
+    else:
+        per_thread = calls // threads
+        workers = [threading.Thread(target=loop_seconds, args=(per_thread, spanned)) for _ in range(threads)]
+        start = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        seconds = time.perf_counter() - start
+    return round((seconds - baseline) / calls * 1e9, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Overhead and accuracy of metrics.py histograms')
+    parser.add_argument('--calls', type=int, default=1_000_000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--samples', type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    report = {
+        'span_ns': span_overhead_ns(Metrics(), args.calls),
+        f'span_ns_{args.threads}_threads': span_overhead_ns(Metrics(), args.calls, args.threads),
+        'disabled_span_ns': span_overhead_ns(Metrics(enabled=False), args.calls),
+    }
+
+    # Latencies around 2ms with a long tail, like predict_crop
+    latencies = np.random.default_rng(0).lognormal(np.log(2e-3), 0.6, args.samples)
+    registry = Metrics()
+    histogram = registry.histogram('sample')
+    for value in latencies:
+        histogram.observe(float(value))
+    errors = {}
+    for q in QUANTILES:
+        exact = float(np.quantile(latencies, q))
+        errors[f"p{round(q * 100)}"] = round(abs(histogram.quantile(q) - exact) / exact, 4)
+    report['quantile_relative_error'] = errors
+
+    print(json.dumps(report, indent=2))
+    return 0 if max(errors.values()) <= 0.19 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# bench_model_format.py - Round-trip check of .forest exports, then load cost
+#
+# Usage:
+#   python benchmarks/bench_model_format.py --models RF RandomForest --workers 8
+#
+# Every shipped forest pickle is exported with model_format.export_pickle() and
+# read back with load_forest(), both memory-mapped and copied into memory.
+# The node arrays must equal CompiledForest.from_sklearn() and predict() /
+# predict_proba() must equal the pickled estimator on Crop_recommendation.csv
+# and on random rows across the sidebar ranges; the script exits non-zero
+# otherwise.
+# It then times pickle.load() against load_forest(). It also starts
+# --workers processes that load the model at the same time and compares
+# their proportional set size (PSS): mapped pages are shared between the
+# workers, while unpickled copies are private to each one (Linux only).
+
+
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features import DATASET_PATH, FEATURES, INPUT_SPECS  # noqa: E402
+from forest_engine import CompiledForest  # noqa: E402
+from model_format import ARRAYS, export_pickle, load_forest, read_header  # noqa: E402
+from model_registry import BASE_DIR, MODEL_DIR, MODEL_FILES  # noqa: E402
+
+
+def load_rows():
+    return np.genfromtxt(os.path.join(BASE_DIR, DATASET_PATH), delimiter=',', skip_header=1, usecols=range(len(FEATURES)))
+
+
+def random_rows(n, seed=0):
+    low = [INPUT_SPECS[f][0] for f in FEATURES]
+    high = [INPUT_SPECS[f][1] for f in FEATURES]
+    return np.random.default_rng(seed).uniform(low, high, (n, len(FEATURES)))
+
+
+def load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def round_trip(model, forest_path, X):
+    """Return a list of mismatch descriptions (empty when the export is exact)"""
+    problems = []
+    compiled = CompiledForest.from_sklearn(model)
+    header = read_header(forest_path)
+    if header['classes'] != [str(c) for c in model.classes_]:
+        problems.append('classes differ')
+    expected_proba = model.predict_proba(X)
+    expected = model.predict(X)
+    for mmap in (True, False):
+        loaded = load_forest(forest_path, mmap=mmap)
+        label = 'mmap' if mmap else 'in-memory'
+        for name in ARRAYS:
+            if not np.array_equal(getattr(compiled, name), getattr(loaded, name)):
+                problems.append(f"{label}: {name} differs")
+        if not np.array_equal(expected_proba, loaded.predict_proba(X)):
+            problems.append(f"{label}: predict_proba differs")
+        if not np.array_equal(expected, loaded.predict(X)):
+            problems.append(f"{label}: predict differs")
+    return problems
+
+
+def time_load(fn, path, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(path)
+        times.append(time.perf_counter() - start)
+    return round(float(np.median(times)) * 1000, 3)
+
+
+def _pss_kib():
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                return int(line.split()[1])
+    return 0
+
+
+def _worker(kind, path, ready, done, results):
+    # Import everything first so only the model itself shows up in the delta
+    import sklearn.ensemble  # noqa: F401
+    X = random_rows(1000)
+    before = _pss_kib()
+    model = load_forest(path) if kind == 'forest' else load_pickle(path)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model.predict_proba(X)
+    ready.wait()  # every worker holds the model now
+    results.put(_pss_kib() - before)
+    done.wait()
+
+
+def shared_memory_kib(kind, path, workers):
+    """Summed PSS growth of `workers` processes that all hold the model at once"""
+    ctx = multiprocessing.get_context('spawn')
+    ready, done, results = ctx.Barrier(workers), ctx.Barrier(workers + 1), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(kind, path, ready, done, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    total = sum(results.get() for _ in procs)
+    done.wait()
+    for p in procs:
+        p.join()
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Round-trip and load cost of .forest model files')
+    parser.add_argument('--models', nargs='+', default=['RF', 'RandomForest'])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4, help='processes for the shared-memory check, 0 to skip')
+    args = parser.parse_args(argv)
+
+    X = np.vstack([load_rows(), random_rows(20_000)])
+    measure_memory = args.workers > 0 and os.path.exists('/proc/self/smaps_rollup')
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp, warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        warnings.filterwarnings('ignore', message='Trying to unpickle estimator')
+        for name in args.models:
+            pickle_path = os.path.join(MODEL_DIR, MODEL_FILES[name])
+            forest_path = export_pickle(pickle_path, os.path.join(tmp, f"{name}.forest"))
+            problems = round_trip(load_pickle(pickle_path), forest_path, X)
+            failed |= bool(problems)
+
+            report = {
+                'model': name,
+                'identical': not problems,
+                'problems': problems,
+                'pickle_bytes': os.path.getsize(pickle_path),
+                'forest_bytes': os.path.getsize(forest_path),
+                'load_ms': {
+                    'pickle': time_load(load_pickle, pickle_path, args.repeats),
+                    'forest_mmap': time_load(load_forest, forest_path, args.repeats),
+                },
+            }
+            if measure_memory:
+                report[f'pss_kib_{args.workers}_workers'] = {
+                    'pickle': shared_memory_kib('pickle', pickle_path, args.workers),
+                    'forest_mmap': shared_memory_kib('forest', forest_path, args.workers),
+                }
+            print(json.dumps(report, indent=2), flush=True)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# bench_models.py - Cost and accuracy of every shipped model pickle
+#
+# Usage:
+#   python benchmarks/bench_models.py --output bench_models.json
+#
+# For each artifact in model_registry.MODEL_FILES this records load time,
+# size on disk, memory held after unpickling, single-row and 10k-row
+# predict latency percentiles, and accuracy on Crop_recommendation.csv
+# (whole file and the notebook's holdout split). Artifacts that fail to
+# load or validate are reported with an error instead of stopping the run.
+
+
+import argparse
+import gc
+import json
+import os
+import pickle
+import platform
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features import DATASET_PATH, FEATURES  # noqa: E402
+from model_registry import BASE_DIR, MODEL_DIR, MODEL_FILES, holdout_accuracy, validate_model  # noqa: E402
+
+
+def load_dataset():
+    import pandas as pd
+
+    df = pd.read_csv(os.path.join(BASE_DIR, DATASET_PATH))
+    return df[FEATURES].to_numpy(dtype=np.float64), df['label'].to_numpy()
+
+
+def in_memory_bytes(obj, seen=None):
+    """Bytes held by the NumPy arrays and sklearn tree tables inside a model
+
+    Tree nodes are malloc'ed by Cython, so neither tracemalloc nor
+    sys.getsizeof sees them; their pickled state exposes the real arrays.
+    """
+    # Keep every visited object alive so temporary state arrays cannot reuse an id
+    seen = {} if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen[id(obj)] = obj
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + (sum(in_memory_bytes(o, seen) for o in obj.flat) if obj.dtype == object else 0)
+    if type(obj).__name__ == 'Tree' and hasattr(obj, '__getstate__'):
+        return sum(in_memory_bytes(v, seen) for v in obj.__getstate__().values())
+    if isinstance(obj, dict):
+        return sum(in_memory_bytes(v, seen) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(in_memory_bytes(v, seen) for v in obj)
+    if hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + in_memory_bytes(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+def load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {f"p{q}_ms": round(float(np.percentile(ms, q)), 4) for q in (50, 90, 99)}
+
+
+def time_predict(model, X, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X)
+        times.append(time.perf_counter() - start)
+    return percentiles(times)
+
+
+def bench_artifact(name, path, X, y, single_repeats, batch_repeats, batch_size):
+    result = {'name': name, 'file': os.path.basename(path), 'disk_bytes': os.path.getsize(path)}
+
+    # The first load also imports the estimator's modules; time it separately
+    start = time.perf_counter()
+    try:
+        load_pickle(path)
+    except Exception as e:
+        return {**result, 'error': f"{type(e).__name__}: {e}"}
+    result['first_load_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    gc.collect()
+
+    start = time.perf_counter()
+    model = load_pickle(path)
+    result['load_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    result['resident_bytes'] = in_memory_bytes(model)
+    result['estimator'] = type(model).__name__
+
+    try:
+        validate_model(model)
+    except Exception as e:
+        return {**result, 'error': f"{type(e).__name__}: {e}"}
+
+    rng = np.random.default_rng(0)
+    rows = X[rng.integers(0, len(X), single_repeats)]
+    batch = X[rng.integers(0, len(X), batch_size)]
+
+    model.predict(X[:1])  # first call pays one-off setup costs
+    single = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict(row[np.newaxis, :])
+        single.append(time.perf_counter() - start)
+
+    result['single_row'] = percentiles(single)
+    result[f'batch_{batch_size}'] = time_predict(model, batch, batch_repeats)
+    result['accuracy_full'] = round(float(np.mean(model.predict(X) == y)), 4)
+    result['accuracy_holdout'] = round(holdout_accuracy(model), 4)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark every shipped model artifact')
+    parser.add_argument('--models', nargs='+', default=list(MODEL_FILES))
+    parser.add_argument('--single-repeats', type=int, default=500)
+    parser.add_argument('--batch-repeats', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    args = parser.parse_args(argv)
+
+    X, y = load_dataset()
+    results = []
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        warnings.filterwarnings('ignore', message='Trying to unpickle estimator')
+        for name in args.models:
+            path = os.path.join(MODEL_DIR, MODEL_FILES[name])
+            results.append(bench_artifact(name, path, X, y, args.single_repeats, args.batch_repeats, args.batch_size))
+            print(f"benchmarked {name}", file=sys.stderr)
+
+    import sklearn
+
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__,
+            'sklearn': sklearn.__version__,
+        },
+        'dataset_rows': len(X),
+        'models': results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# bench_rerun.py - Cost of one Streamlit script rerun of webapp.py
+#
+# Usage:
+#   python benchmarks/bench_rerun.py --reruns 50
+#
+# Runs the app headlessly with streamlit.testing's AppTest and times plain
+# reruns, language switches and predict clicks. Peak Python allocation per
+# rerun comes from tracemalloc. The 'helpers' entry times just the
+# translation, recommendation and gauge helpers a predict rerun calls.
+# Run it before and after a change to compare.
+
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'webapp.py')
+
+
+def measure(at, action, reruns):
+    times, peaks = [], []
+    for i in range(reruns):
+        tracemalloc.start()
+        start = time.perf_counter()
+        action(at, i)
+        times.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    ms = np.array(times) * 1000
+    return {
+        'reruns': reruns,
+        'mean_ms': round(float(ms.mean()), 3),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'peak_alloc_kib': round(float(np.mean(peaks)) / 1024, 1),
+    }
+
+
+def plain_rerun(at, i):
+    at.run()
+
+
+def switch_language(at, i):
+    at.selectbox[0].select_index(i % 3).run()
+
+
+def click_predict(at, i):
+    at.button[0].click().run()
+
+
+def helper_calls(webapp, language):
+    """The translation and HTML helper calls made by one predict rerun of main()"""
+    t = webapp.get_translations(language)
+    for value, hi in ((50, 140), (52, 145), (48, 205), (25, 50), (65, 100), (7, 14), (120, 500)):
+        webapp.create_interactive_gauge(value, 0, hi, t['nitrogen'], 'ppm', '#667eea', '#764ba2', language)
+    # getattr() keeps the script runnable against trees without the fragment caches
+    getattr(webapp, 'crop_info_cards', lambda *a: None)('rice', language)  # display_crop_info
+    getattr(webapp, 'recommendation_cards', webapp.get_crop_recommendations)('rice', language)
+
+
+def time_helpers(repeats):
+    # Importing webapp outside `streamlit run` executes it in bare mode
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    sys.path.insert(0, ROOT)
+    import webapp
+
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        helper_calls(webapp, ('en', 'hi', 'ml')[i % 3])
+        times.append(time.perf_counter() - start)
+    us = np.array(times) * 1e6
+    return {'calls': repeats, 'mean_us': round(float(us.mean()), 2), 'p50_us': round(float(np.percentile(us, 50)), 2)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time Streamlit reruns of webapp.py')
+    parser.add_argument('--reruns', type=int, default=30)
+    args = parser.parse_args(argv)
+
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(ROOT)
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.run()
+    click_predict(at, 0)  # load the model outside the measurement
+
+    report = {
+        name: measure(at, action, args.reruns)
+        for name, action in (('rerun', plain_rerun), ('language_switch', switch_language), ('predict', click_predict))
+    }
+    report['helpers'] = time_helpers(args.reruns * 100)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
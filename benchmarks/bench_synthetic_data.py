@@ -0,0 +1,97 @@
+# bench_synthetic_data.py - Row-by-row sample data against synthetic_data.generate()
+#
+# Usage:
+#   python benchmarks/bench_synthetic_data.py --rows 10000 100000 1000000
+#
+# The old webapp load_sample_data() drew every value with a scalar
+# np.random.uniform call into a list of dicts. Both it and
+# synthetic_data.generate() are timed per --rows (the loop only up to
+# --loop-max rows, beyond that it is extrapolated). The script checks that
+# generate() is reproducible, leaves the global np.random state alone and
+# recovers the per-crop profile means, and exits non-zero if any check fails.
+
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features import FEATURES  # noqa: E402
+from synthetic_data import PROFILES, compile_profiles, generate  # noqa: E402
+
+
+def loop_generate(n_rows):
+    """The previous load_sample_data() body, scaled to n_rows"""
+    import pandas as pd
+
+    np.random.seed(42)
+    crops = list(PROFILES)
+    data = []
+    for crop in crops:
+        for _ in range(n_rows // len(crops)):
+            data.append({
+                'N': np.random.uniform(0, 140),
+                'P': np.random.uniform(5, 145),
+                'K': np.random.uniform(5, 205),
+                'temperature': np.random.uniform(8, 43),
+                'humidity': np.random.uniform(14, 100),
+                'ph': np.random.uniform(3.5, 10),
+                'rainfall': np.random.uniform(20, 300),
+                'label': crop
+            })
+    return pd.DataFrame(data)
+
+
+def seconds(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def checks():
+    state = np.random.get_state()[1].copy()
+    first, again = generate(50_000, seed=3), generate(50_000, seed=3)
+    crops, _, a, b = compile_profiles(PROFILES)
+    means = first.groupby('label')[FEATURES].mean().loc[crops].to_numpy()
+    # Uniform profiles: the mean is the range midpoint, within a few standard errors
+    tolerance = 5 * (b - a) / np.sqrt(12 * len(first) / len(crops)) + 1e-9
+    return {
+        'reproducible': bool(first.equals(again)),
+        'global_state_untouched': bool((np.random.get_state()[1] == state).all()),
+        'profile_means': bool((np.abs(means - (a + b) / 2) <= tolerance).all()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the synthetic crop data generator')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--loop-max', type=int, default=100_000, help='largest size the row loop is actually run at')
+    args = parser.parse_args(argv)
+
+    generate(1000)  # first-call page faults and imports
+    results = []
+    for n in args.rows:
+        vectorized = min(seconds(generate, n) for _ in range(3))
+        measured = min(n, args.loop_max)
+        loop = seconds(loop_generate, measured) * n / measured
+        results.append({
+            'rows': n,
+            'loop_s': round(loop, 3),
+            'loop_extrapolated': measured < n,
+            'generate_s': round(vectorized, 4),
+            'speedup': round(loop / vectorized, 1),
+        })
+        print(f"{n} rows: loop {loop:.2f}s, generate {vectorized:.3f}s", file=sys.stderr)
+
+    ok = checks()
+    print(json.dumps({'results': results, 'checks': ok}, indent=2))
+    return 0 if all(ok.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
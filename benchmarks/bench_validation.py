@@ -0,0 +1,101 @@
+# bench_validation.py - Throughput of validation.validate() against a per-row Python check
+#
+# Usage:
+#   python benchmarks/bench_validation.py --rows 1000000 --bad-fraction 0.001
+#
+# Builds --rows synthetic rows with --bad-fraction of them broken (NaN, inf,
+# text, out of range), then times validate() on a float matrix, on a
+# DataFrame whose text cells make it an object frame, and on one UI-sized
+# row. The baseline is the obvious loop that checks every value with
+# float()/math.isfinite and the INPUT_SPECS bounds. Exits non-zero if the two
+# disagree on which rows are bad.
+
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features import FEATURES, INPUT_SPECS  # noqa: E402
+from synthetic_data import generate_arrays  # noqa: E402
+from validation import validate  # noqa: E402
+
+BROKEN = (np.nan, np.inf, -1.0, 1e6, 'n/a')
+
+
+def loop_bad_rows(rows):
+    """Per-row, per-value Python check: the indices of invalid rows"""
+    bounds = [INPUT_SPECS[f][:2] for f in FEATURES]
+    bad = []
+    for i, row in enumerate(rows):
+        for value, (low, high) in zip(row, bounds):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                bad.append(i)
+                break
+            if not math.isfinite(value) or not low <= value <= high:
+                bad.append(i)
+                break
+    return np.array(bad, dtype=np.int64)
+
+
+def broken_frame(n, fraction, seed=0):
+    rng = np.random.default_rng(seed)
+    X, _, _ = generate_arrays(n, seed)
+    df = pd.DataFrame(X, columns=FEATURES).astype(object)
+    rows = rng.choice(n, int(n * fraction), replace=False)
+    cols = rng.integers(0, len(FEATURES), len(rows))
+    values = rng.integers(0, len(BROKEN), len(rows))
+    for r, c, v in zip(rows, cols, values):
+        df.iat[r, c] = BROKEN[v]
+    return df
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark vectorized input validation')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--bad-fraction', type=float, default=0.001)
+    parser.add_argument('--loop-max', type=int, default=200_000, help='rows the Python loop is run on')
+    args = parser.parse_args(argv)
+
+    df = broken_frame(args.rows, args.bad_fraction)
+    floats = pd.DataFrame(generate_arrays(args.rows, 1)[0], columns=FEATURES).to_numpy()
+    (_, codes), object_s = best_of(lambda: validate(df))
+    _, float_s = best_of(lambda: validate(floats))
+    row = [90.0, 42.0, 43.0, 20.9, 82.0, 6.5, 203.0]
+    _, single_s = best_of(lambda: [validate(row) for _ in range(1000)])
+
+    sample = df.iloc[:args.loop_max]
+    loop_bad, loop_s = best_of(lambda: loop_bad_rows(sample.itertuples(index=False)), repeat=1)
+    agree = np.array_equal(np.flatnonzero(codes[:len(sample)]), loop_bad)
+    print(json.dumps({
+        'rows': args.rows,
+        'bad_rows': int((codes != 0).sum()),
+        'float_matrix_rows_per_s': round(args.rows / float_s),
+        'object_frame_rows_per_s': round(args.rows / object_s),
+        'python_loop_rows_per_s': round(len(sample) / loop_s),
+        'single_row_us': round(single_s / 1000 * 1e6, 1),
+        'agrees_with_loop': bool(agree),
+    }, indent=2))
+    return 0 if agree else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
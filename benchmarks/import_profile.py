@@ -0,0 +1,98 @@
+# import_profile.py - Import-time profile of the app and service entry points
+#
+# Usage:
+#   python benchmarks/import_profile.py --top 15
+#   python benchmarks/import_profile.py --targets webapp --env AGRIVERSE_INFERENCE_ONLY=1
+#
+# Each target is imported in a fresh interpreter under `python -X importtime`.
+# The report gives the total import time, the target's slowest direct imports by
+# cumulative time, and whether the training stack (pandas, sklearn's
+# model_selection, PIL) got pulled in. Importing webapp outside `streamlit
+# run` executes one bare-mode rerun of the page without a prediction.
+
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGETS = ('webapp', 'serve', 'batch_predict', 'model_registry')
+WATCHED = ('pandas', 'sklearn', 'sklearn.model_selection', 'sklearn.ensemble', 'PIL', 'scipy', 'streamlit')
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def profile(target, env, top):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        return {'target': target, 'error': proc.stderr.strip().splitlines()[-1]}
+
+    rows = parse_importtime(proc.stderr)
+    # Lines come out children first, so the target's direct imports are the
+    # depth-1 rows just before its own depth-0 row
+    children, direct, total_us = [], [], 0
+    for name, _, cumulative_us, depth in rows:
+        if depth == 1:
+            children.append((name, cumulative_us))
+        elif depth == 0:
+            if name == target:
+                direct, total_us = children, cumulative_us
+            children = []
+    modules = {name for name, *_ in rows}
+    return {
+        'target': target,
+        'wall_ms': round(wall * 1000, 1),
+        'import_ms': round(total_us / 1000, 1),
+        'modules': len(modules),
+        'loaded': {name: name in modules for name in WATCHED},
+        'slowest': [
+            {'module': name, 'cumulative_ms': round(cum / 1000, 1)}
+            for name, cum in sorted(direct, key=lambda r: -r[1])[:top]
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Profile import time of the entry points')
+    parser.add_argument('--targets', nargs='+', default=list(DEFAULT_TARGETS))
+    parser.add_argument('--top', type=int, default=10, help='slowest top-level imports to list')
+    parser.add_argument('--env', nargs='*', default=[], metavar='KEY=VALUE', help='extra environment variables')
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env.update(item.split('=', 1) for item in args.env)
+    report = {
+        'python': sys.version.split()[0],
+        'env': args.env,
+        'targets': [profile(target, env, args.top) for target in args.targets],
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
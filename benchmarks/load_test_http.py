@@ -0,0 +1,145 @@
+# load_test_http.py - Drive serve.py with concurrent clients and report latency
+#
+# Usage:
+#   python benchmarks/load_test_http.py --concurrency 16 --requests 5000
+#   python benchmarks/load_test_http.py --url http://127.0.0.1:8000 --batch 100
+#
+# Without --url an in-process server is started on a free port. Each client
+# thread keeps one HTTP/1.1 connection open and sends requests back to back.
+
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features import DATASET_PATH, FEATURES  # noqa: E402
+from model_registry import BASE_DIR, DEFAULT_MODEL  # noqa: E402
+
+
+def sample_rows(n, seed=0):
+    """Real rows from Crop_recommendation.csv so every request is plausible"""
+    data = np.genfromtxt(os.path.join(BASE_DIR, DATASET_PATH), delimiter=',', skip_header=1, usecols=range(len(FEATURES)))
+    rng = np.random.default_rng(seed)
+    return data[rng.integers(0, len(data), n)].tolist()
+
+
+def start_local_server(workers, model, coalesce_ms=0.0):
+    import serve
+
+    server = serve.make_server('127.0.0.1', 0, workers, model, coalesce_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def wait_ready(url, timeout=60):
+    parsed = urlparse(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=5)
+            conn.request('GET', '/readyz')
+            status = conn.getresponse().status
+            conn.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise SystemExit(f"{url} did not become ready within {timeout}s")
+
+
+def client(url, bodies, path, latencies, errors):
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    for body in bodies:
+        start = time.perf_counter()
+        try:
+            conn.request('POST', path, body, headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except OSError as e:
+            errors.append(repr(e))
+            conn.close()
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run(url, concurrency, n_requests, batch):
+    rows = sample_rows(n_requests * batch)
+    if batch == 1:
+        path = '/predict'
+        bodies = [json.dumps({'features': row}) for row in rows]
+    else:
+        path = '/predict/batch'
+        bodies = [json.dumps({'rows': rows[i:i + batch]}) for i in range(0, len(rows), batch)]
+
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=client, args=(url, bodies[i::concurrency], path, latencies, errors))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    lat_ms = np.array(latencies) * 1000
+    return {
+        'path': path,
+        'concurrency': concurrency,
+        'requests': len(bodies),
+        'rows_per_request': batch,
+        'errors': len(errors),
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_s': round(len(bodies) / elapsed, 1),
+        'rows_per_s': round(len(bodies) * batch / elapsed, 1),
+        'p50_ms': round(float(np.percentile(lat_ms, 50)), 3),
+        'p99_ms': round(float(np.percentile(lat_ms, 99)), 3),
+        'max_ms': round(float(lat_ms.max()), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the crop inference HTTP API')
+    parser.add_argument('--url', help='running server to target (default: start one in-process)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=1, help='rows per request; >1 uses /predict/batch')
+    parser.add_argument('--workers', type=int, default=8, help='worker threads for the in-process server')
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--coalesce-ms', type=float, default=0.0, help='micro-batch window for the in-process server')
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_local_server(args.workers, args.model, args.coalesce_ms)
+    try:
+        wait_ready(url)
+        # Warm up connections and the model before measuring
+        run(url, args.concurrency, min(args.requests, 50), args.batch)
+        print(json.dumps(run(url, args.concurrency, args.requests, args.batch), indent=2))
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+# load_test_streamlit.py - Drive webapp.py with many simulated sessions and report capacity
+#
+# Usage:
+#   python benchmarks/load_test_streamlit.py --sessions 1 4 16 --duration 20
+#   python benchmarks/load_test_streamlit.py --sessions 8 --think-ms 500 --mix input=6,language=1,predict=3
+#
+# Each simulated farmer is its own streamlit.testing AppTest, so it has its
+# own st.session_state, while st.cache_resource/st.cache_data are shared by
+# the process as they are under `streamlit run`. Sessions run in threads.
+# Each one repeatedly picks an action from --mix:
+#   input     set a random sidebar number_input to a random value in its range
+#   language  switch to a random language
+#   predict   press the predict button
+# waits --think-ms and goes again. No server, browser or network is needed.
+#
+# AppTest installs a process-global mock Runtime for each run, so two runs
+# cannot overlap: sessions queue on a lock for their rerun. A rerun of
+# main() is pure Python under the GIL, so a real server also executes about
+# one at a time, and the queue is what a farmer waits on at peak.
+#
+# For every --sessions level the report gives
+#   - rerun latency as a session sees it (queueing + rerun, p50/p95/p99/max),
+#     overall and per action,
+#   - service time, the rerun alone; 1000 / its mean is the throughput
+#     ceiling of one process in reruns/s,
+#   - reruns/s achieved over all sessions,
+#   - st.session_state size per session and process RSS growth per session.
+# AppTest normally compiles the script on every run; here all runs share one
+# ScriptCache, as `streamlit run` does, so compile time is not counted.
+
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'webapp.py')
+sys.path.insert(0, ROOT)
+
+from features import FEATURES, INPUT_SPECS  # noqa: E402
+from translations import LANGUAGES  # noqa: E402
+
+
+ACTIONS = ('input', 'language', 'predict')
+RUN_LOCK = threading.Lock()
+
+
+def parse_mix(text):
+    """'input=6,language=1,predict=3' -> (actions, weights)"""
+    weights = dict.fromkeys(ACTIONS, 0)
+    for part in text.split(','):
+        action, _, weight = part.partition('=')
+        if action not in weights:
+            raise argparse.ArgumentTypeError(f"unknown action {action!r}; choose from {ACTIONS}")
+        weights[action] = float(weight or 1)
+    return list(weights), list(weights.values())
+
+
+def rss_bytes():
+    """Resident set size of this process (Linux), else peak RSS"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def deep_size(obj, seen=None):
+    """Approximate bytes held by obj and everything it references"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(v, seen) for v in obj)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def session_state_bytes(at):
+    return deep_size(at.session_state._state)
+
+
+def share_script_cache():
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+
+    shared = ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared
+
+
+def new_session():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    with RUN_LOCK:
+        at.run()
+    if at.exception:
+        raise SystemExit(f"webapp.py failed on its first run: {at.exception[0].message}")
+    return at
+
+
+def act(at, action, rng):
+    """Apply one user action to the session's widgets; the next run() sends it"""
+    if action == 'input':
+        i = rng.randrange(len(FEATURES))
+        low, high, _, step = INPUT_SPECS[FEATURES[i]]
+        at.number_input[i].set_value(round(round(rng.uniform(low, high) / step) * step, 3))
+    elif action == 'language':
+        at.selectbox[0].select_index(rng.randrange(len(LANGUAGES)))
+    else:
+        at.button[0].click()
+
+
+def session(at, seed, stop, actions, weights, think, latencies, service, errors):
+    rng = random.Random(seed)
+    while time.perf_counter() < stop:
+        action = rng.choices(actions, weights)[0]
+        act(at, action, rng)
+        start = time.perf_counter()
+        try:
+            with RUN_LOCK:
+                began = time.perf_counter()
+                at.run()
+                end = time.perf_counter()
+        except Exception as e:
+            errors.append(repr(e))
+            return
+        if at.exception:
+            errors.append(at.exception[0].message)
+            return  # the page is gone; later actions would fail instantly
+        latencies[action].append(end - start)
+        service.append(end - began)
+        if think:
+            time.sleep(think)
+
+
+def summarize(seconds):
+    ms = np.array(seconds) * 1000
+    return {
+        'reruns': len(ms),
+        'p50_ms': round(float(np.percentile(ms, 50)), 2),
+        'p95_ms': round(float(np.percentile(ms, 95)), 2),
+        'p99_ms': round(float(np.percentile(ms, 99)), 2),
+        'max_ms': round(float(ms.max()), 2),
+    }
+
+
+def run_level(n_sessions, duration, actions, weights, think, seed):
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    sessions = [new_session() for _ in range(n_sessions)]
+    startup = time.perf_counter() - start
+    state_before = [session_state_bytes(at) for at in sessions]
+
+    latencies = [{a: [] for a in actions} for _ in sessions]
+    service, errors = [], []
+    stop = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=session, args=(at, seed + i, stop, actions, weights, think, latencies[i], service, errors)
+        )
+        for i, at in enumerate(sessions)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    state_after = [session_state_bytes(at) for at in sessions]
+    rss_after = rss_bytes()
+    by_action = {a: [s for per_session in latencies for s in per_session[a]] for a in actions}
+    everything = [s for values in by_action.values() for s in values]
+    return {
+        'sessions': n_sessions,
+        'startup_s': round(startup, 2),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'reruns_per_s': round(len(everything) / elapsed, 1),
+        'all': summarize(everything) if everything else None,
+        'by_action': {a: summarize(v) for a, v in by_action.items() if v},
+        'service': summarize(service) if service else None,
+        'ceiling_reruns_per_s': round(len(service) / sum(service), 1) if service else None,
+        'session_state_kib': round(float(np.mean(state_after)) / 1024, 1),
+        'session_state_growth_kib': round(float(np.mean(state_after) - np.mean(state_before)) / 1024, 2),
+        'rss_growth_per_session_mib': round((rss_after - rss_before) / n_sessions / 2**20, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test webapp.py with simulated Streamlit sessions')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16], help='concurrent sessions per level')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds per level (default: %(default)s)')
+    parser.add_argument('--think-ms', type=float, default=0.0, help='pause between actions (default: %(default)s)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('input=6,language=1,predict=3'),
+                        help='action weights (default: input=6,language=1,predict=3)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('STREAMLIT_BROWSER_GATHER_USAGE_STATS', 'false')
+    logging.disable(logging.WARNING)
+    share_script_cache()
+    actions, weights = args.mix
+    # Warm the shared caches (model, translations, HTML) so level 1 is not charged for them
+    warm = new_session()
+    act(warm, 'predict', random.Random(args.seed))
+    warm.run()
+
+    levels = []
+    for n in args.sessions:
+        levels.append(run_level(n, args.duration, actions, weights, args.think_ms / 1000, args.seed))
+        print(f"measured {n} sessions: {levels[-1]['reruns_per_s']} reruns/s", file=sys.stderr)
+
+    busiest = max(levels, key=lambda level: level['reruns_per_s'])
+    print(json.dumps({
+        'cpus': os.cpu_count(),
+        'duration_s': args.duration,
+        'think_ms': args.think_ms,
+        'mix': dict(zip(actions, weights)),
+        'levels': levels,
+        'peak': {'reruns_per_s': busiest['reruns_per_s'], 'sessions': busiest['sessions']},
+        'ceiling_reruns_per_s': max(level['ceiling_reruns_per_s'] or 0 for level in levels),
+    }, indent=2))
+    return 1 if any(level['errors'] for level in levels) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
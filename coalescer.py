@@ -0,0 +1,107 @@
+# coalescer.py - Merge concurrent single-row predictions into one model call
+
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from inference import as_feature_matrix, predict_batch
+
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Collects single-row requests for up to window_ms (or max_batch rows)
+    and scores them with one vectorized predict_proba call.
+
+    Each caller gets its own (label, confidence) back through a Future, so
+    sklearn's fixed per-call overhead is paid once per batch, not per row.
+    """
+
+    def __init__(self, model, window_ms=3.0, max_batch=64):
+        if window_ms < 0 or max_batch < 1:
+            raise ValueError('window_ms must be >= 0 and max_batch >= 1')
+        self.model = model
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        # Makes "not closed, so enqueue" atomic with "close, then enqueue _STOP"
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, features):
+        """Queue one row of features, returns a Future of (label, confidence)"""
+        row = as_feature_matrix(features)[0]
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('MicroBatcher is closed')
+            self._queue.put((row, future))
+        return future
+
+    def predict(self, features, timeout=None):
+        """Blocking single-row prediction through the batcher"""
+        return self.submit(features).result(timeout)
+
+    def close(self):
+        """Finish queued requests and stop the batching thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+        # Nothing can be queued behind _STOP any more; this is only a safety net
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(RuntimeError('MicroBatcher is closed'))
+
+    @property
+    def mean_batch_size(self):
+        return self.rows / self.batches if self.batches else 0.0
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch, stopping = self._collect(item)
+            self._score(batch)
+
+    def _score(self, batch):
+        futures = [future for _, future in batch]
+        try:
+            labels, confidence = predict_batch(self.model, [row for row, _ in batch])
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        for future, label, c in zip(futures, labels, confidence):
+            future.set_result((label, float(c)))
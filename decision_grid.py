@@ -0,0 +1,316 @@
+# decision_grid.py - Precomputed model answers over a quantized sidebar input space
+#
+# Usage:
+#   python decision_grid.py build --bins 10 --output models/grids/RF-10.grid.npy
+#   python decision_grid.py build --bins N=14,P=14,K=20,temperature=10,humidity=10,ph=14,rainfall=10 --output g.grid.npy
+#   python decision_grid.py compare models/grids/RF-10.grid.npy --samples 200000
+#   python decision_grid.py sweep --bins 4 6 8 10      # disagreement per resolution, nothing written
+#
+#   AGRIVERSE_GRID=models/grids/RF-10.grid.npy streamlit run webapp.py
+#
+# The sidebar inputs are bounded (features.INPUT_SPECS), so the model's
+# answer can be tabulated. Each input range is cut into `bins` equal cells,
+# the model predicts every cell's centre, and the winning class index and
+# its probability (scaled to 0-255) are stored as a (*bins, 2) uint8 array.
+# 10 bins per input is 10**7 cells, 20 MB.
+#
+# The array is saved with np.save as <name>.grid.npy, with the ranges,
+# classes, source model and the array file's sha256 in <name>.grid.json
+# beside it. load_grid() checks that digest, so a stale or corrupted grid is
+# refused rather than served, then memory-maps the array. A prediction is
+# arithmetic plus one array read per row. model_registry loads *.grid.npy paths like model artifacts, with the
+# grid's own holdout accuracy (measured at build time) as the accuracy.
+#
+# `compare` and `sweep` measure how often the grid and the live model
+# disagree, on random sidebar inputs (snapped to the input steps) and on the
+# notebook's holdout rows, to choose a resolution.
+
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+
+from features import DATASET_PATH, DATASET_DTYPES, FEATURES, INPUT_SPECS, INPUT_STEPS
+
+
+FORMAT = 'agriverse-grid'
+FORMAT_VERSION = 1
+GRID_SUFFIX = '.grid.npy'
+DEFAULT_BINS = 10
+# Cell centres predicted per model call while building
+BUILD_CHUNK_ROWS = 1 << 18
+COMPARE_SAMPLES = 200_000
+
+
+class DecisionGrid:
+    """Class index and confidence of a model, tabulated over the sidebar input box
+
+    Has classes_, predict() and predict_proba(), so it drops in wherever a
+    model is expected. predict_proba() carries only the winning class's
+    probability; every other class reads 0.
+    """
+
+    def __init__(self, cells, meta):
+        self.cells = cells
+        self.meta = meta
+        self.classes_ = np.asarray(meta['classes'], dtype=object)
+        self.n_features_in_ = len(FEATURES)
+        self.feature_names_in_ = np.asarray(FEATURES, dtype=object)
+        self.low = np.asarray(meta['low'], dtype=np.float64)
+        self.high = np.asarray(meta['high'], dtype=np.float64)
+        self.bins = np.asarray(meta['bins'], dtype=np.int64)
+        self._scale = self.bins / (self.high - self.low)
+        self._flat = cells.reshape(-1, 2)
+        self._strides = np.array([int(np.prod(self.bins[i + 1:])) for i in range(len(self.bins))], dtype=np.int64)
+
+    def cell_index(self, X):
+        """Flat cell number of every row; inputs outside the ranges use the edge cells"""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURES))
+        idx = np.floor((X - self.low) * self._scale).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        return idx @ self._strides
+
+    def lookup(self, X):
+        """(class indices, confidences) for every row"""
+        cells = self._flat[self.cell_index(X)]
+        return cells[:, 0], cells[:, 1] / 255.0
+
+    def predict(self, X):
+        return self.classes_.take(self.lookup(X)[0])
+
+    def predict_proba(self, X):
+        best, confidence = self.lookup(X)
+        proba = np.zeros((len(best), len(self.classes_)))
+        proba[np.arange(len(best)), best] = confidence
+        return proba
+
+    def score(self, X, y):
+        return float(np.mean(self.predict(X) == np.asarray(y, dtype=object)))
+
+
+def parse_bins(text):
+    """'10' or 'N=14,P=14,...' -> bins per feature, in FEATURES order"""
+    if '=' not in text:
+        return [int(text)] * len(FEATURES)
+    bins = dict.fromkeys(FEATURES, DEFAULT_BINS)
+    for part in text.split(','):
+        name, _, value = part.partition('=')
+        if name not in bins:
+            raise argparse.ArgumentTypeError(f"unknown feature {name!r}; features are {FEATURES}")
+        bins[name] = int(value)
+    return [bins[f] for f in FEATURES]
+
+
+def cell_centres(low, high, bins, start, stop):
+    """Centres of flat cells start..stop-1 as an (n, 7) array"""
+    idx = np.stack(np.unravel_index(np.arange(start, stop), bins), axis=1)
+    return low + (idx + 0.5) * ((high - low) / bins)
+
+
+def fast_model(model):
+    """The forest_engine version of a tree model (bit-identical, much faster on big batches)"""
+    from forest_engine import CompiledForest
+    if isinstance(model, CompiledForest):
+        return model
+    try:
+        return CompiledForest.from_sklearn(model)
+    except ValueError:
+        return model
+
+
+def build_grid(model, bins, source=None, chunk_rows=BUILD_CHUNK_ROWS):
+    """Predict every cell centre with model; returns an in-memory DecisionGrid
+    whose metadata records its own holdout accuracy"""
+    from inference import predict_proba
+
+    bins = [int(b) for b in bins]
+    if len(bins) != len(FEATURES) or min(bins) < 1:
+        raise ValueError(f"need a positive bin count for each of {FEATURES}")
+    classes = [str(c) for c in model.classes_]
+    if len(classes) > 256:
+        raise ValueError('a uint8 grid holds at most 256 classes')
+    low = np.array([INPUT_SPECS[f][0] for f in FEATURES])
+    high = np.array([INPUT_SPECS[f][1] for f in FEATURES])
+
+    start = time.perf_counter()
+    scorer = fast_model(model)
+    n_cells = int(np.prod(bins))
+    flat = np.empty((n_cells, 2), dtype=np.uint8)
+    for first in range(0, n_cells, chunk_rows):
+        last = min(first + chunk_rows, n_cells)
+        proba = predict_proba(scorer, cell_centres(low, high, bins, first, last))
+        best = proba.argmax(axis=1)
+        flat[first:last, 0] = best
+        flat[first:last, 1] = np.rint(proba[np.arange(len(best)), best] * 255)
+    meta = {
+        'format': FORMAT,
+        'format_version': FORMAT_VERSION,
+        'features': FEATURES,
+        'classes': classes,
+        'low': low.tolist(),
+        'high': high.tolist(),
+        'bins': bins,
+        'source': source or {},
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'build_seconds': round(time.perf_counter() - start, 2),
+    }
+    grid = DecisionGrid(flat.reshape(*bins, 2), meta)
+    meta['holdout_accuracy'] = grid.score(*holdout_rows())
+    return grid
+
+
+def _meta_path(path):
+    if not path.endswith(GRID_SUFFIX):
+        raise ValueError(f"grid files are named *{GRID_SUFFIX}, got {path}")
+    return path[:-len('.npy')] + '.json'
+
+
+def _sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def save_grid(grid, path):
+    """Write <path> (the array) and its .json metadata, each atomically"""
+    meta_path = _meta_path(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        np.save(f, np.ascontiguousarray(grid.cells))
+    os.replace(tmp, path)
+    grid.meta['sha256'] = _sha256(path)
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(grid.meta, f, indent=2)
+    os.replace(meta_path + '.tmp', meta_path)
+    return path
+
+
+def load_grid(path, mmap=True, sha256=None):
+    """Memory-map a saved grid (mmap=False reads it into RAM)
+
+    sha256 is the array file's digest when the caller has already hashed it.
+    """
+    with open(_meta_path(path)) as f:
+        meta = json.load(f)
+    if meta.get('format') != FORMAT or meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} {FORMAT} file")
+    if (sha256 or _sha256(path)) != meta.get('sha256'):
+        raise ValueError(f"{path} does not match the sha256 in its metadata; rebuild the grid")
+    cells = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+    if cells.dtype != np.uint8 or cells.shape != (*meta['bins'], 2):
+        raise ValueError(f"{path} has shape {cells.shape} {cells.dtype}, its metadata says {(*meta['bins'], 2)} uint8")
+    if list(meta['features']) != FEATURES:
+        raise ValueError(f"{path} was built for features {meta['features']}")
+    if int(cells[..., 0].max(initial=0)) >= len(meta['classes']):
+        raise ValueError(f"{path} refers to classes it does not list")
+    return DecisionGrid(cells, meta)
+
+
+def sidebar_samples(n, seed=0):
+    """Random inputs the sidebar can produce: uniform over the ranges, snapped to the input steps"""
+    low = np.array([INPUT_SPECS[f][0] for f in FEATURES])
+    high = np.array([INPUT_SPECS[f][1] for f in FEATURES])
+    steps = np.array(INPUT_STEPS)
+    X = np.random.default_rng(seed).uniform(low, high, (n, len(FEATURES)))
+    return np.clip(np.round(X / steps) * steps, low, high)
+
+
+def holdout_rows():
+    """The notebook's 20% holdout split as (X, labels)"""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    from model_registry import BASE_DIR
+
+    df = pd.read_csv(os.path.join(BASE_DIR, DATASET_PATH), dtype=DATASET_DTYPES)
+    _, test = train_test_split(df, test_size=0.2, random_state=2)
+    return test[FEATURES].to_numpy(dtype=np.float64), test['label'].to_numpy().astype(str)
+
+
+def single_row_us(predict, X, rows=2000):
+    times = []
+    for row in X[:rows]:
+        start = time.perf_counter()
+        predict(row[np.newaxis, :])
+        times.append(time.perf_counter() - start)
+    return round(float(np.median(times)) * 1e6, 2)
+
+
+def compare(grid, model, n_samples=COMPARE_SAMPLES, seed=0):
+    """How often grid and model pick different crops, plus accuracy and lookup cost"""
+    from inference import predict_proba
+
+    classes = np.asarray(model.classes_).astype(str)
+    if list(classes) != [str(c) for c in grid.classes_]:
+        raise ValueError('grid and model have different classes')
+    X = sidebar_samples(n_samples, seed)
+    live = predict_proba(fast_model(model), X).argmax(axis=1)
+    test_X, test_y = holdout_rows()
+    test_live = predict_proba(model, test_X).argmax(axis=1)
+    test_grid = grid.lookup(test_X)[0]
+    return {
+        'bins': [int(b) for b in grid.bins],
+        'cells': int(grid.bins.prod()),
+        'mib': round(grid.cells.nbytes / 2**20, 2),
+        'sidebar_disagreement': float(np.mean(grid.lookup(X)[0] != live)),
+        'holdout_disagreement': float(np.mean(test_grid != test_live)),
+        'holdout_accuracy_grid': float(np.mean(classes[test_grid] == test_y)),
+        'holdout_accuracy_model': float(np.mean(classes[test_live] == test_y)),
+        'grid_us': single_row_us(grid.lookup, test_X),
+        'model_us': single_row_us(lambda row: predict_proba(model, row), test_X),
+        'build_seconds': grid.meta.get('build_seconds'),
+    }
+
+
+def main(argv=None):
+    from model_registry import BACKENDS, DEFAULT_MODEL, load_model
+
+    parser = argparse.ArgumentParser(description='Build and check precomputed decision grids')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='artifact name or path (default: %(default)s)')
+    parser.add_argument('--backend', choices=BACKENDS, default='sklearn')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='tabulate the model and save the grid')
+    build.add_argument('--bins', type=parse_bins, default=[DEFAULT_BINS] * len(FEATURES),
+                       help="cells per input: one number, or e.g. N=14,ph=20 (others %d)" % DEFAULT_BINS)
+    build.add_argument('--output', required=True, help=f'grid file, named *{GRID_SUFFIX}')
+    check = commands.add_parser('compare', help='disagreement between a saved grid and the live model')
+    check.add_argument('grid')
+    check.add_argument('--samples', type=int, default=COMPARE_SAMPLES)
+    sweep = commands.add_parser('sweep', help='compare in-memory grids at several resolutions')
+    sweep.add_argument('--bins', type=parse_bins, nargs='+', required=True)
+    sweep.add_argument('--samples', type=int, default=COMPARE_SAMPLES)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore', message='Trying to unpickle estimator')
+    entry = load_model(args.model, args.backend)
+    source = {'name': entry.name, 'version': entry.version}
+    if args.command == 'build':
+        _meta_path(args.output)
+        grid = build_grid(entry.model, args.bins, source)
+        save_grid(grid, args.output)
+        print(f"Wrote {args.output}: {grid.cells.nbytes / 2**20:.1f} MiB in {grid.meta['build_seconds']}s",
+              file=sys.stderr)
+        return 0
+    if args.command == 'compare':
+        grid = load_grid(args.grid)
+        if grid.meta['source'].get('version') != entry.version:
+            print(f"note: grid was built from {grid.meta['source']}, comparing against {source}", file=sys.stderr)
+        print(json.dumps(compare(grid, entry.model, args.samples), indent=2))
+        return 0
+    results = []
+    for bins in args.bins:
+        results.append(compare(build_grid(entry.model, bins, source), entry.model, args.samples))
+        print(f"bins {bins}: {results[-1]['sidebar_disagreement']:.2%} of sidebar inputs disagree", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# distill.py - Distill the random forest into a compact student for phones and kiosks
+#
+# Usage:
+#   python distill.py                                  # report the trade-off for the default grid
+#   python distill.py --depths 6 8 10 --trees 1 3 --max-kib 64 --output student.json
+#   python distill.py --teacher models/20240101-000000/RF.pkl --samples 400000
+#
+# The teacher (default: the served model) labels --samples points with its
+# predict_proba: half drawn uniformly from the sidebar input ranges, half
+# jittered copies of the notebook's training rows, so the student is taught
+# both the whole input box and the region real fields fall in. Students are
+# regression trees (or small forests of them) fitted to those probability
+# vectors, one per --depths x --trees combination.
+#
+# For the teacher, the notebook's depth-5 DecisionTree baseline and every
+# student the report gives holdout accuracy on the notebook's 20% split,
+# fidelity (agreement with the teacher's top crop, on fresh sample points and
+# on the holdout rows), size and single-row latency. The students' size and
+# latency are those of the exported JSON file and of predict_exported(),
+# which needs nothing but the Python standard library.
+#
+# The pick is the most accurate student within --max-kib (default 64) and
+# --max-latency-us; --output writes it. The JSON holds the features, classes
+# and, per tree, flat feature/threshold/left/right arrays plus the leaf
+# distributions.
+# A row goes left when float32(x[feature]) <= threshold, like sklearn's
+# tree code. predict_exported() is the reference implementation to port.
+
+
+import argparse
+import json
+import os
+import pickle
+import struct
+import sys
+import time
+import warnings
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeRegressor
+
+from features import FEATURES, INPUT_SPECS
+from inference import predict_proba
+from model_registry import DEFAULT_MODEL, load_model
+from train_pipeline import SPLIT_SEED, TEST_SIZE, candidate_models, load_dataset
+
+
+FORMAT = 'agriverse-student'
+FORMAT_VERSION = 1
+DEFAULT_SAMPLES = 100_000
+EVAL_SAMPLES = 20_000
+DEFAULT_DEPTHS = (4, 6, 8, 10, 12)
+DEFAULT_TREES = (1, 4)
+# Jitter of training rows, as a fraction of each input's range
+JITTER = 0.05
+LATENCY_ROWS = 2000
+# Default size budget for --output: what the field phones and kiosks can comfortably load
+MAX_KIB = 64.0
+
+
+def sample_inputs(n, train_X, seed=0):
+    """n points: half uniform over INPUT_SPECS, half jittered training rows, clipped to the ranges"""
+    rng = np.random.default_rng(seed)
+    low = np.array([INPUT_SPECS[f][0] for f in FEATURES])
+    high = np.array([INPUT_SPECS[f][1] for f in FEATURES])
+    uniform = rng.uniform(low, high, (n // 2, len(FEATURES)))
+    base = train_X[rng.integers(0, len(train_X), n - n // 2)]
+    jittered = base + rng.normal(0, JITTER * (high - low), base.shape)
+    return np.clip(np.vstack([uniform, jittered]), low, high)
+
+
+def fit_student(X, P, depth, trees, seed=0):
+    """A regression tree (trees == 1) or forest fitted to the teacher's probabilities"""
+    if trees == 1:
+        student = DecisionTreeRegressor(max_depth=depth, random_state=seed)
+    else:
+        student = RandomForestRegressor(n_estimators=trees, max_depth=depth, max_features=None,
+                                        random_state=seed, n_jobs=-1)
+    return student.fit(X, P)
+
+
+def export_student(student, classes, teacher_info=None, decimals=4):
+    """The dependency-free JSON representation of a fitted student"""
+    trees = []
+    for estimator in getattr(student, 'estimators_', None) or [student]:
+        tree = estimator.tree_
+        values = tree.value[:, :, 0]
+        leaves = tree.children_left < 0
+        trees.append({
+            'feature': [int(f) if not leaf else -1 for f, leaf in zip(tree.feature, leaves)],
+            'threshold': [float(t) if not leaf else 0 for t, leaf in zip(tree.threshold, leaves)],
+            'left': [int(c) for c in tree.children_left],
+            'right': [int(c) for c in tree.children_right],
+            'value': [
+                [round(float(p), decimals) or 0 for p in values[node]] if leaf else None
+                for node, leaf in enumerate(leaves)
+            ],
+        })
+    return {
+        'format': FORMAT,
+        'format_version': FORMAT_VERSION,
+        'features': FEATURES,
+        'classes': [str(c) for c in classes],
+        'teacher': teacher_info or {},
+        'trees': trees,
+    }
+
+
+def _float32(value):
+    return struct.unpack('f', struct.pack('f', value))[0]
+
+
+def predict_exported(spec, row):
+    """Class probabilities for one row of FEATURES from an exported student (standard library only)"""
+    x = [_float32(float(v)) for v in row]
+    totals = [0.0] * len(spec['classes'])
+    for tree in spec['trees']:
+        feature, threshold, left, right = tree['feature'], tree['threshold'], tree['left'], tree['right']
+        node = 0
+        while left[node] >= 0:
+            node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+        for i, p in enumerate(tree['value'][node]):
+            totals[i] += p
+    return [t / len(spec['trees']) for t in totals]
+
+
+def exported_top(spec, X):
+    """Index of the top class for every row, through predict_exported()"""
+    out = np.empty(len(X), dtype=np.int64)
+    for i, row in enumerate(X.tolist()):
+        proba = predict_exported(spec, row)
+        out[i] = max(range(len(proba)), key=proba.__getitem__)
+    return out
+
+
+def predict_proba_student(student, X):
+    """The sklearn student's averaged leaf distributions, shape (n, classes)"""
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        return student.predict(X)
+
+
+def median_latency_us(predict_row, X, rows=LATENCY_ROWS):
+    times = []
+    for row in X[:rows]:
+        start = time.perf_counter()
+        predict_row(row)
+        times.append(time.perf_counter() - start)
+    return round(float(np.median(times)) * 1e6, 2)
+
+
+def _trees(model):
+    """The fitted sklearn trees of a forest or boosted ensemble, or [model] for a single tree"""
+    estimators = getattr(model, 'estimators_', None)
+    return list(np.ravel(estimators)) if estimators is not None else [model]
+
+
+def check_teacher(teacher):
+    """Raise ValueError unless teacher is an sklearn tree model with predict_proba"""
+    if not hasattr(teacher, 'predict_proba') or not all(hasattr(e, 'tree_') for e in _trees(teacher)):
+        raise ValueError(f"the teacher must be an sklearn tree or forest with predict_proba,"
+                         f" got {type(teacher).__name__}")
+
+
+def distill(teacher, df, depths=DEFAULT_DEPTHS, trees=DEFAULT_TREES, n_samples=DEFAULT_SAMPLES, seed=0,
+            teacher_info=None):
+    """Fit every student and measure it; returns (report rows, {(depth, trees): exported spec})"""
+    check_teacher(teacher)
+    train, test = train_test_split(df, test_size=TEST_SIZE, random_state=SPLIT_SEED)
+    train_X = train[FEATURES].to_numpy(dtype=np.float64)
+    test_X = test[FEATURES].to_numpy(dtype=np.float64)
+    test_y = test['label'].to_numpy().astype(str)
+    classes = np.asarray(teacher.classes_).astype(str)
+
+    X = sample_inputs(n_samples, train_X, seed)
+    P = predict_proba(teacher, X)
+    eval_X = sample_inputs(EVAL_SAMPLES, train_X, seed + 1)
+    eval_top = predict_proba(teacher, eval_X).argmax(axis=1)
+    test_top = predict_proba(teacher, test_X).argmax(axis=1)
+
+    baseline = clone(candidate_models()['DecisionTree']).fit(train[FEATURES], train['label'])
+    report = []
+    for name, model in (('teacher', teacher), ('baseline depth-5 tree', baseline)):
+        report.append({
+            'model': name,
+            'holdout_accuracy': float(np.mean(classes[predict_proba(model, test_X).argmax(axis=1)] == test_y)),
+            'fidelity': float(np.mean(predict_proba(model, eval_X).argmax(axis=1) == eval_top)),
+            'holdout_fidelity': float(np.mean(predict_proba(model, test_X).argmax(axis=1) == test_top)),
+            'nodes': int(sum(e.tree_.node_count for e in _trees(model))),
+            'kib': round(len(pickle.dumps(model)) / 1024, 1),
+            'latency_us': median_latency_us(lambda row: predict_proba(model, row[np.newaxis, :]), test_X),
+            'format': 'pickle',
+        })
+
+    exported = {}
+    for n_trees in trees:
+        for depth in depths:
+            start = time.perf_counter()
+            student = fit_student(X, P, depth, n_trees, seed)
+            fit_seconds = time.perf_counter() - start
+            spec = export_student(student, classes, teacher_info)
+            data = json.dumps(spec, separators=(',', ':'))
+            top = predict_proba_student(student, test_X).argmax(axis=1)
+            report.append({
+                'model': f"student depth {depth} x {n_trees} tree{'s' if n_trees > 1 else ''}",
+                'depth': depth,
+                'trees': n_trees,
+                'holdout_accuracy': float(np.mean(classes[top] == test_y)),
+                'fidelity': float(np.mean(predict_proba_student(student, eval_X).argmax(axis=1) == eval_top)),
+                'holdout_fidelity': float(np.mean(top == test_top)),
+                'export_agreement': float(np.mean(exported_top(spec, test_X) == top)),
+                'nodes': sum(len(t['left']) for t in spec['trees']),
+                'kib': round(len(data) / 1024, 1),
+                'latency_us': median_latency_us(lambda row: predict_exported(spec, row), test_X),
+                'fit_seconds': round(fit_seconds, 2),
+                'format': 'json',
+            })
+            exported[(depth, n_trees)] = spec
+    return report, exported
+
+
+def pick(report, max_kib=None, max_latency_us=None):
+    """The most accurate student within the budgets (ties: higher fidelity), or None"""
+    students = [
+        r for r in report
+        if r['format'] == 'json'
+        and (max_kib is None or r['kib'] <= max_kib)
+        and (max_latency_us is None or r['latency_us'] <= max_latency_us)
+    ]
+    return max(students, key=lambda r: (r['holdout_accuracy'], r['fidelity'], -r['kib']), default=None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Distill the crop forest into a compact, dependency-free student')
+    parser.add_argument('--teacher', default=DEFAULT_MODEL, help='artifact name or path (default: %(default)s)')
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES, help='teacher-labelled points (default: %(default)s)')
+    parser.add_argument('--depths', type=int, nargs='+', default=list(DEFAULT_DEPTHS))
+    parser.add_argument('--trees', type=int, nargs='+', default=list(DEFAULT_TREES), help='trees per student')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-kib', type=float, default=MAX_KIB, help='size budget for the exported student (default: %(default)s)')
+    parser.add_argument('--max-latency-us', type=float, help='single-row latency budget for the exported student')
+    parser.add_argument('--data', help='training CSV (default: the notebook dataset)')
+    parser.add_argument('--output', help='write the picked student here as JSON')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    warnings.filterwarnings('ignore', message='Trying to unpickle estimator')
+    entry = load_model(args.teacher, 'sklearn')
+    teacher_info = {'name': entry.name, 'version': entry.version}
+    try:
+        check_teacher(entry.model)
+    except ValueError as e:
+        print(f"error: {entry.name}: {e}", file=sys.stderr)
+        return 1
+    report, exported = distill(entry.model, load_dataset(args.data), args.depths, args.trees, args.samples,
+                               args.seed, teacher_info)
+
+    for r in report:
+        print(f"{r['model']:28s} holdout {r['holdout_accuracy']:.4f}  fidelity {r['fidelity']:.4f}"
+              f" / {r['holdout_fidelity']:.4f}"
+              f"  {r['nodes']:7d} nodes  {r['kib']:8.1f} KiB  {r['latency_us']:8.1f} us", file=sys.stderr)
+    best = pick(report, args.max_kib, args.max_latency_us)
+    print(json.dumps({'teacher': teacher_info, 'samples': args.samples, 'report': report, 'pick': best}, indent=2))
+    if best is None:
+        print('error: no student fits the size and latency budgets', file=sys.stderr)
+        return 1
+    if args.output:
+        tmp = f"{args.output}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(exported[(best['depth'], best['trees'])], f, separators=(',', ':'))
+        os.replace(tmp, args.output)
+        print(f"Wrote {best['model']} to {args.output}", file=sys.stderr)
+    print(f"Done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
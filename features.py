@@ -0,0 +1,29 @@
+# features.py - Shared feature schema for the crop models
+
+
+# Column order used by Crop_recommendation.csv, the notebook and the web app
+FEATURES = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+
+# Crops the shipped models were trained on (sorted, as in model.classes_)
+CROP_LABELS = (
+    'apple', 'banana', 'blackgram', 'chickpea', 'coconut', 'coffee', 'cotton',
+    'grapes', 'jute', 'kidneybeans', 'lentil', 'maize', 'mango', 'mothbeans',
+    'mungbean', 'muskmelon', 'orange', 'papaya', 'pigeonpeas', 'pomegranate',
+    'rice', 'watermelon'
+)
+
+DATASET_PATH = 'Crop_recommendation.csv'
+DATASET_DTYPES = {**{col: 'float64' for col in FEATURES}, 'label': 'str'}
+
+# Sidebar number_input settings in main(): (min, max, default, step)
+INPUT_SPECS = {
+    'N': (0.0, 140.0, 50.0, 1.0),
+    'P': (0.0, 145.0, 52.0, 1.0),
+    'K': (0.0, 205.0, 48.0, 1.0),
+    'temperature': (0.0, 50.0, 25.0, 0.5),
+    'humidity': (0.0, 100.0, 65.0, 1.0),
+    'ph': (0.0, 14.0, 7.0, 0.1),
+    'rainfall': (0.0, 500.0, 120.0, 5.0),
+}
+
+INPUT_STEPS = tuple(INPUT_SPECS[f][3] for f in FEATURES)
@@ -0,0 +1,162 @@
+# forest_engine.py - Flat-array inference for fitted sklearn tree ensembles
+
+
+import numpy as np
+
+from features import FEATURES
+
+
+# Rows scored per traversal pass; bounds the (rows, trees) leaf index array
+BLOCK_ROWS = 8192
+# Up to this many rows all trees are stepped together instead of one by one
+LOCKSTEP_ROWS = 256
+
+
+class CompiledForest:
+    """A RandomForestClassifier (or single DecisionTreeClassifier) flattened
+    into contiguous NumPy arrays.
+
+    All trees share one node table. children[node] holds (right, left) so a
+    step is children[node, x <= threshold]; leaves point at themselves, so a
+    row can keep stepping after it has reached one. Predictions are
+    bit-identical to the installed sklearn: inputs are cast to float32 like
+    sklearn's tree code, leaf distributions are taken exactly as
+    DecisionTreeClassifier.predict_proba returns them, and per-tree
+    probabilities are summed in estimator order before dividing by the
+    number of trees.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, depths, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.depths = depths
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = len(FEATURES)
+        self.feature_names_in_ = np.asarray(FEATURES, dtype=object)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Export the fitted trees of a sklearn forest or decision tree"""
+        estimators = getattr(model, 'estimators_', None) or [model]
+        normalize = _sklearn_normalizes_leaves()
+        features, thresholds, children, values, roots, depths = [], [], [], [], [], []
+        offset = 0
+        for estimator in estimators:
+            tree = getattr(estimator, 'tree_', None)
+            if tree is None:
+                raise ValueError(f"only fitted tree ensembles can be compiled, got {type(model).__name__}")
+            if tree.n_outputs != 1:
+                raise ValueError('only single-output trees can be compiled')
+            n = tree.node_count
+            ids = np.arange(offset, offset + n, dtype=np.int64)
+            is_leaf = tree.children_left < 0
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(tree.threshold.astype(np.float64))
+            children.append(np.stack([
+                np.where(is_leaf, ids, tree.children_right + offset),
+                np.where(is_leaf, ids, tree.children_left + offset),
+            ], axis=1).astype(np.int64))
+
+            proba = tree.value[:, 0, :len(model.classes_)].astype(np.float64)
+            if normalize:
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba = proba / normalizer
+            values.append(proba)
+
+            roots.append(offset)
+            depths.append(tree.max_depth)
+            offset += n
+
+        return cls(
+            np.concatenate(features),
+            np.concatenate(thresholds),
+            np.ascontiguousarray(np.concatenate(children)),
+            np.ascontiguousarray(np.concatenate(values)),
+            np.asarray(roots, dtype=np.int64),
+            np.asarray(depths, dtype=np.int64),
+            model.classes_,
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        arrays = (self.feature, self.threshold, self.children, self.value, self.roots, self.depths)
+        return sum(a.nbytes for a in arrays)
+
+    def apply(self, X):
+        """Leaf node index (into the shared node table) for every row and tree"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        base = np.arange(n_rows, dtype=np.int64) * n_features
+        children = self.children.ravel()
+
+        if n_rows <= LOCKSTEP_ROWS:
+            # Few rows: step every tree at once, paying one NumPy call per level
+            base = base[:, np.newaxis]
+            node = np.broadcast_to(self.roots, (n_rows, self.n_trees))
+            for _ in range(int(self.depths.max())):
+                go_left = flat[base + self.feature[node]] <= self.threshold[node]
+                node = children[2 * node + go_left]
+            return node
+
+        # Many rows: walk one tree at a time over 1-D index arrays
+        leaves = np.empty((self.n_trees, n_rows), dtype=np.int64)
+        for t in range(self.n_trees):
+            node = np.full(n_rows, self.roots[t], dtype=np.int64)
+            for _ in range(self.depths[t]):
+                go_left = flat[base + self.feature[node]] <= self.threshold[node]
+                node = children[2 * node + go_left]
+            leaves[t] = node
+        return leaves.T
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"expected rows of {self.n_features_in_} features, got shape {X.shape}")
+        out = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], BLOCK_ROWS):
+            leaves = self.apply(X[start:start + BLOCK_ROWS])
+            proba = np.zeros((leaves.shape[0], len(self.classes_)), dtype=np.float64)
+            for t in range(self.n_trees):
+                proba += self.value[leaves[:, t]]
+            proba /= self.n_trees
+            out[start:start + BLOCK_ROWS] = proba
+        return out
+
+    def predict(self, X):
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1), axis=0)
+
+    def score(self, X, y):
+        return float(np.mean(self.predict(np.asarray(X, dtype=np.float64)) == np.asarray(y)))
+
+
+def _sklearn_normalizes_leaves():
+    """scikit-learn < 1.4 stored class counts in tree_.value and normalised
+    them in predict_proba; newer versions store fractions and return them
+    as they are. Match whichever version is installed.
+    """
+    import sklearn
+
+    major, minor = (int(part) for part in sklearn.__version__.split('.')[:2])
+    return (major, minor) < (1, 4)
+
+
+def compilable(model):
+    """True if CompiledForest can take the model: a fitted sklearn tree or forest, or already compiled"""
+    if isinstance(model, CompiledForest):
+        return True
+    estimators = getattr(model, 'estimators_', None) or [model]
+    return all(getattr(estimator, 'tree_', None) is not None for estimator in estimators)
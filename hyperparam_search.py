@@ -0,0 +1,415 @@
+# hyperparam_search.py - Parallel, resumable hyperparameter search over every candidate family
+#
+# Usage:
+#   python hyperparam_search.py                              # successive halving, all families
+#   python hyperparam_search.py --mode random --n-iter 30 --families RF SVC
+#   python hyperparam_search.py --latency-weight 0.02 --max-latency-ms 5 --write
+#
+# Replaces the notebook's one-model-per-cell cross_val_score runs. Every
+# family from train_pipeline.candidate_models() gets a search space; its
+# notebook hyperparameters are always the first configuration tried.
+#   random    every sampled configuration is cross-validated on all folds
+#   halving   configurations start on --min-resource of each fold's training
+#             rows; each rung keeps the best 1/--factor per family and grows
+#             the rows by --factor until the survivors use all of them
+# Each (configuration, rung, fold) fit is one task on a process pool. The
+# feature matrix, encoded labels and fold assignment are prepared once and
+# saved as .npy files under --store's directory, which the workers memory-map
+# instead of re-reading and re-splitting the CSV.
+#
+# Every finished fit is appended to the results store (JSON lines) at once,
+# so an interrupted search resumes by running the same command: finished
+# fits are read back instead of being refitted.
+#
+# The best --finalists configurations per family are then refitted on the
+# notebook's training split and timed on single-row top-k predictions, the
+# webapp's hot path. The production pick maximizes
+#     cv accuracy - --latency-weight * p50 latency in ms
+# among configurations within --max-latency-ms. --write stores it in a new
+# release under its family's artifact name, carrying the other models of the
+# current release over unchanged. The served model (RF) is only replaced if
+# a random forest wins; --name RF refuses to publish any other family as RF,
+# which the forest-only code paths (compiled backend, inference pool,
+# incremental updates) would break on.
+
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from scipy.stats import loguniform, randint
+from sklearn.base import clone
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import log_loss
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
+
+from features import DATASET_PATH, FEATURES
+from inference import top_k
+from model_registry import BASE_DIR, RELEASES_DIR, read_manifest
+from train_pipeline import SPLIT_SEED, TEST_SIZE, candidate_models, load_dataset, write_artifacts
+
+
+SEARCH_DIR = os.environ.get('AGRIVERSE_SEARCH_DIR', os.path.join(BASE_DIR, 'searches'))
+MODES = ('halving', 'random')
+DEFAULT_ITER = 20
+HALVING_FACTOR = 3
+MIN_RESOURCE = 0.2
+FINALISTS = 3
+LATENCY_CALLS = 200
+# Accuracy given up per millisecond of single-row latency
+LATENCY_WEIGHT = 0.01
+
+SEARCH_SPACES = {
+    'DecisionTree': {
+        'criterion': ['gini', 'entropy'],
+        'max_depth': [None, 5, 8, 12, 16, 24],
+        'min_samples_leaf': randint(1, 10),
+    },
+    'NBClassifier': {
+        'var_smoothing': loguniform(1e-12, 1e-5),
+    },
+    'SVC': {
+        'C': loguniform(0.1, 1000),
+        'gamma': ['scale', 'auto', 1e-3, 1e-2, 1e-1],
+    },
+    'LogisticRegression': {
+        'C': loguniform(1e-3, 100),
+        'max_iter': [100, 500, 2000],
+    },
+    'RF': {
+        'n_estimators': randint(10, 300),
+        'max_depth': [None, 10, 20, 30],
+        'max_features': ['sqrt', 'log2', None],
+        'min_samples_leaf': randint(1, 5),
+    },
+    'KNeighborsClassifier': {
+        'n_neighbors': randint(1, 30),
+        'weights': ['uniform', 'distance'],
+        'p': [1, 2],
+    },
+    'XGBoost': {
+        'estimator__n_estimators': randint(50, 400),
+        'estimator__max_depth': randint(2, 10),
+        'estimator__learning_rate': loguniform(0.01, 0.3),
+    },
+}
+
+# Set in each worker by _load_data()
+_data = None
+_candidates = None
+
+
+def _plain(value):
+    """numpy scalars from scipy distributions -> JSON-friendly Python values"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def configurations(families, n_iter, seed):
+    """[(family, params)], the notebook's hyperparameters ({}) first for each family
+
+    Deterministic for a given seed, which is what lets a search resume.
+    """
+    configs = []
+    for family in families:
+        configs.append((family, {}))
+        sampler = ParameterSampler(SEARCH_SPACES[family], n_iter - 1, random_state=seed)
+        for params in sampler:
+            configs.append((family, {k: _plain(v) for k, v in sorted(params.items())}))
+    return configs
+
+
+def config_id(family, params):
+    return hashlib.sha256(json.dumps([family, params], sort_keys=True).encode()).hexdigest()[:12]
+
+
+def prepare_data(df, cv, seed, directory):
+    """Write X, encoded y and each row's test fold as .npy files, once per dataset/cv/seed
+
+    Returns (directory, data id).
+    """
+    X = np.ascontiguousarray(df[FEATURES].to_numpy(dtype=np.float64))
+    classes, y = np.unique(df['label'].to_numpy().astype(str), return_inverse=True)
+    digest = hashlib.sha256(X.tobytes() + y.astype(np.int64).tobytes() + '\n'.join(classes).encode()).hexdigest()
+    data_id = f"{digest[:12]}-cv{cv}-s{seed}"
+    data_dir = os.path.join(directory, f"data-{data_id}")
+    if not os.path.exists(os.path.join(data_dir, 'fold_of.npy')):
+        fold_of = np.empty(len(y), dtype=np.int64)
+        for fold, (_, test_idx) in enumerate(StratifiedKFold(cv, shuffle=True, random_state=seed).split(X, y)):
+            fold_of[test_idx] = fold
+        os.makedirs(data_dir, exist_ok=True)
+        np.save(os.path.join(data_dir, 'X.npy'), X)
+        np.save(os.path.join(data_dir, 'y.npy'), y.astype(np.int64))
+        np.save(os.path.join(data_dir, 'classes.npy'), classes)
+        # Written last: its presence marks a complete cache
+        np.save(os.path.join(data_dir, 'fold_of.npy'), fold_of)
+    return data_dir, data_id
+
+
+def _load_data(data_dir):
+    """Worker initializer: map the prepared arrays"""
+    global _data, _candidates
+    _data = {name: np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode='r') for name in ('X', 'y', 'fold_of')}
+    _candidates = candidate_models()
+
+
+def fold_indices(fold_of, fold, resource, seed):
+    """Train and test rows of a fold; resource < 1 keeps that fraction of the training rows"""
+    train_idx = np.flatnonzero(fold_of != fold)
+    test_idx = np.flatnonzero(fold_of == fold)
+    if resource < 1:
+        keep = max(1, math.ceil(resource * len(train_idx)))
+        train_idx = np.sort(np.random.default_rng(seed + fold).permutation(train_idx)[:keep])
+    return train_idx, test_idx
+
+
+def _evaluate(family, params, resource, fold, seed):
+    """One task: fit a configuration on one fold and score it"""
+    X, y = _data['X'], _data['y']
+    train_idx, test_idx = fold_indices(_data['fold_of'], fold, resource, seed)
+    estimator = clone(_candidates[family]).set_params(**params)
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        estimator.fit(X[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+    return float(estimator.score(X[test_idx], y[test_idx])), fit_seconds
+
+
+class ResultStore:
+    """Append-only JSON lines file of finished fits, keyed by task"""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a line cut short by an interrupted run
+                    self.records[record['key']] = record
+
+    def append(self, record):
+        self.records[record['key']] = record
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+def task_key(data_id, family, params, resource, fold):
+    return f"{data_id}:{config_id(family, params)}:{resource:.6g}:{fold}"
+
+
+def run_rung(pool, store, data_id, configs, resource, cv, seed):
+    """Cross-validate configs at one resource level; returns {config index: mean accuracy}"""
+    pending = {}
+    for i, (family, params) in enumerate(configs):
+        for fold in range(cv):
+            key = task_key(data_id, family, params, resource, fold)
+            if key not in store.records:
+                pending[key] = (i, family, params, fold)
+
+    futures = {
+        pool.submit(_evaluate, family, params, resource, fold, seed): key
+        for key, (i, family, params, fold) in pending.items()
+    }
+    for done, future in enumerate(as_completed(futures), 1):
+        key = futures[future]
+        _, family, params, fold = pending[key]
+        accuracy, fit_seconds = future.result()
+        store.append({
+            'key': key, 'family': family, 'params': params, 'resource': resource, 'fold': fold,
+            'accuracy': accuracy, 'fit_seconds': round(fit_seconds, 4),
+        })
+        if done % 50 == 0 or done == len(futures):
+            print(f"  resource {resource:.3g}: {done}/{len(futures)} fits", file=sys.stderr)
+
+    scores = {}
+    for i, (family, params) in enumerate(configs):
+        folds = [store.records[task_key(data_id, family, params, resource, fold)]['accuracy'] for fold in range(cv)]
+        scores[i] = folds
+    return scores
+
+
+def search(pool, store, data_id, configs, mode, cv, seed, factor=HALVING_FACTOR, min_resource=MIN_RESOURCE):
+    """Run the search; returns [(family, params, fold accuracies at full resource)]"""
+    if mode == 'random':
+        scores = run_rung(pool, store, data_id, configs, 1.0, cv, seed)
+        return [(*configs[i], folds) for i, folds in scores.items()]
+
+    alive = list(range(len(configs)))
+    resource = min_resource
+    while True:
+        resource = min(resource, 1.0)
+        scores = run_rung(pool, store, data_id, [configs[i] for i in alive], resource, cv, seed)
+        scores = {alive[j]: folds for j, folds in scores.items()}
+        if resource >= 1.0:
+            return [(*configs[i], scores[i]) for i in alive]
+        survivors = []
+        for family in dict.fromkeys(configs[i][0] for i in alive):
+            ranked = sorted((i for i in alive if configs[i][0] == family), key=lambda i: -np.mean(scores[i]))
+            survivors += ranked[:max(1, math.ceil(len(ranked) / factor))]
+        print(f"resource {resource:.3g}: kept {len(survivors)} of {len(alive)} configurations", file=sys.stderr)
+        alive = sorted(survivors)
+        resource *= factor
+
+
+def single_row_latency_ms(model, X, calls=LATENCY_CALLS):
+    """p50 milliseconds of one top_k() call on one row, as a webapp prediction makes"""
+    rows = X[np.arange(calls) % len(X)]
+    top_k(model, rows[:1])
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        top_k(model, row[np.newaxis, :])
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1000)
+
+
+def fit_final(family, params, train):
+    """Fit a configuration on the notebook's training split and score it on the holdout"""
+    model = clone(candidate_models()[family]).set_params(**params)
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        model.fit(train[FEATURES], train['label'])
+    fit_seconds = time.perf_counter() - start
+    return model, fit_seconds
+
+
+def rank_finalists(store, data_id, results, df, finalists, latency_weight, max_latency_ms):
+    """Refit and time the best configurations per family; returns rows sorted by objective"""
+    train, test = train_test_split(df, test_size=TEST_SIZE, random_state=SPLIT_SEED)
+    X_test = test[FEATURES].to_numpy(dtype=np.float64)
+    rows = []
+    for family in dict.fromkeys(family for family, _, _ in results):
+        ranked = sorted((r for r in results if r[0] == family), key=lambda r: -np.mean(r[2]))
+        for _, params, folds in ranked[:finalists]:
+            key = f"{data_id}:{config_id(family, params)}:final"
+            record = store.records.get(key)
+            if record is None:
+                model, fit_seconds = fit_final(family, params, train)
+                record = {
+                    'key': key, 'family': family, 'params': params,
+                    'holdout_accuracy': float(model.score(test[FEATURES], test['label'])),
+                    'latency_ms': single_row_latency_ms(model, X_test),
+                    'fit_seconds': round(fit_seconds, 4),
+                }
+                store.append(record)
+            cv_mean = float(np.mean(folds))
+            rows.append({
+                'family': family,
+                'params': params,
+                'config': config_id(family, params),
+                'cv_mean': cv_mean,
+                'cv_std': float(np.std(folds)),
+                'cv_scores': folds,
+                'holdout_accuracy': record['holdout_accuracy'],
+                'latency_ms': record['latency_ms'],
+                'objective': cv_mean - latency_weight * record['latency_ms'],
+                'eligible': max_latency_ms is None or record['latency_ms'] <= max_latency_ms,
+            })
+    return sorted(rows, key=lambda r: (not r['eligible'], -r['objective']))
+
+
+def write_release(best, df, name, search_info, output_dir=RELEASES_DIR):
+    """Refit the winner and write it as `name` in a new release, carrying the other models over"""
+    train, test = train_test_split(df, test_size=TEST_SIZE, random_state=SPLIT_SEED)
+    model, fit_seconds = fit_final(best['family'], best['params'], train)
+    trained = {name: (model, {
+        'holdout_accuracy': float(model.score(test[FEATURES], test['label'])),
+        'holdout_log_loss': float(log_loss(test['label'], model.predict_proba(test[FEATURES]), labels=model.classes_)),
+        'calibration': None,
+        'cv_mean': best['cv_mean'],
+        'cv_std': best['cv_std'],
+        'cv_scores': best['cv_scores'],
+        'fit_seconds': round(fit_seconds, 4),
+        'params': {k: repr(v) for k, v in model.get_params(deep=False).items()},
+        'family': best['family'],
+        'latency_ms': best['latency_ms'],
+        'objective': best['objective'],
+    })}
+    manifest = read_manifest()
+    carried = {}
+    if manifest is not None:
+        source_dir = os.path.join(RELEASES_DIR, manifest['version'])
+        carried = {n: (source_dir, e) for n, e in manifest['models'].items() if n != name}
+    return write_artifacts(trained, output_dir, carried=carried, extra={'search': search_info})
+
+
+def main(argv=None):
+    families = [f for f in candidate_models() if f in SEARCH_SPACES]
+    parser = argparse.ArgumentParser(description='Search hyperparameters of every candidate model family')
+    parser.add_argument('--mode', choices=MODES, default='halving')
+    parser.add_argument('--families', nargs='+', default=families, choices=families)
+    parser.add_argument('--n-iter', type=int, default=DEFAULT_ITER, help='configurations per family (default: %(default)s)')
+    parser.add_argument('--cv', type=int, default=5, help='cross-validation folds (default: %(default)s)')
+    parser.add_argument('--factor', type=int, default=HALVING_FACTOR, help='halving rate (default: %(default)s)')
+    parser.add_argument('--min-resource', type=float, default=MIN_RESOURCE,
+                        help='fraction of training rows at the first halving rung (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--n-jobs', type=int, default=os.cpu_count(), help='worker processes (default: %(default)s)')
+    parser.add_argument('--store', default=os.path.join(SEARCH_DIR, 'results.jsonl'),
+                        help='results store; rerun with the same store to resume (default: %(default)s)')
+    parser.add_argument('--finalists', type=int, default=FINALISTS, help='configurations per family to time (default: %(default)s)')
+    parser.add_argument('--latency-weight', type=float, default=LATENCY_WEIGHT,
+                        help='accuracy traded per ms of single-row latency (default: %(default)s)')
+    parser.add_argument('--max-latency-ms', type=float, help='only pick configurations at most this slow')
+    parser.add_argument('--data', help=f'training CSV (default: {DATASET_PATH})')
+    parser.add_argument('--write', action='store_true', help='write the pick as a new release')
+    parser.add_argument('--name', help="artifact name for the pick; must be the winner's family (default: the family)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df = load_dataset(args.data)
+    store = ResultStore(args.store)
+    data_dir, data_id = prepare_data(df, args.cv, args.seed, os.path.dirname(os.path.abspath(args.store)))
+    configs = configurations(args.families, args.n_iter, args.seed)
+    print(f"{len(configs)} configurations, {len(store.records)} results already in {args.store}", file=sys.stderr)
+
+    pool = ProcessPoolExecutor(args.n_jobs, initializer=_load_data, initargs=(data_dir,))
+    try:
+        results = search(pool, store, data_id, configs, args.mode, args.cv, args.seed, args.factor, args.min_resource)
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True)
+        print(f"interrupted; rerun the same command to resume from {args.store}", file=sys.stderr)
+        return 130
+    pool.shutdown()
+
+    ranking = rank_finalists(store, data_id, results, df, args.finalists, args.latency_weight, args.max_latency_ms)
+    for row in ranking:
+        print(f"{row['family']:22s} {row['config']}  cv {row['cv_mean']:.4f} ± {row['cv_std']:.4f}"
+              f"  holdout {row['holdout_accuracy']:.4f}  {row['latency_ms']:7.3f} ms  objective {row['objective']:.4f}"
+              f"{'' if row['eligible'] else '  (over latency budget)'}")
+    best = ranking[0]
+    if not best['eligible']:
+        print(f"error: no configuration is within {args.max_latency_ms} ms", file=sys.stderr)
+        return 1
+    print(json.dumps({'pick': best}, indent=2))
+
+    name = args.name or best['family']
+    if args.write and name != best['family']:
+        print(f"error: the pick is a {best['family']} model; refusing to publish it as {name!r}", file=sys.stderr)
+        return 1
+    if args.write:
+        search_info = {
+            'mode': args.mode, 'n_iter': args.n_iter, 'cv': args.cv, 'seed': args.seed, 'data': data_id,
+            'latency_weight': args.latency_weight, 'max_latency_ms': args.max_latency_ms,
+            'pick': {k: best[k] for k in ('family', 'config', 'params', 'cv_mean', 'latency_ms', 'objective')},
+        }
+        version_dir = write_release(best, df, name, search_info)
+        print(f"Wrote {version_dir}", file=sys.stderr)
+    print(f"Done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+# incremental.py - Fold newly labelled field samples into the models without a full refit
+#
+# Usage:
+#   python incremental.py add field_2024_kharif.csv      # store a batch of labelled rows
+#   python incremental.py batches                        # list stored batches
+#   python incremental.py update --models RF NBClassifier --trees 10
+#
+# Batches use the Crop_recommendation.csv schema (N,P,K,temperature,humidity,
+# ph,rainfall,label) and are kept as immutable, content-addressed CSV files
+# under field_samples/, so every release can name exactly which ones it saw.
+# `update` starts from the models of the current release (or the shipped
+# pickles), then
+#   - grows random forests by --trees new trees (warm_start), fitted on the
+#     notebook's training split plus all stored field samples, and
+#   - calls partial_fit on models that support it (GaussianNB) with the
+#     field samples that model has not seen yet,
+# and writes a new release through train_pipeline.write_artifacts with a
+# drift report comparing the previous and new versions.
+
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import log_loss
+from sklearn.model_selection import train_test_split
+
+from features import CROP_LABELS, DATASET_DTYPES, FEATURES
+from model_registry import BASE_DIR, RELEASES_DIR, load_model, read_manifest
+from train_pipeline import SPLIT_SEED, TEST_SIZE, load_dataset, write_artifacts
+
+
+SAMPLES_DIR = os.environ.get('AGRIVERSE_SAMPLES_DIR', os.path.join(BASE_DIR, 'field_samples'))
+DEFAULT_MODELS = ('RF', 'NBClassifier')
+DEFAULT_NEW_TREES = 10
+
+
+def validate_samples(df):
+    """Check a frame of labelled rows against the dataset schema and return a clean copy"""
+    missing = [c for c in (*FEATURES, 'label') if c not in df.columns]
+    if missing:
+        raise ValueError(f"field samples are missing columns {missing}")
+    df = df[[*FEATURES, 'label']].astype(DATASET_DTYPES)
+    bad_values = ~np.isfinite(df[FEATURES].to_numpy()).all(axis=1)
+    if bad_values.any():
+        raise ValueError(f"{int(bad_values.sum())} field samples have missing or non-finite features")
+    unknown = sorted(set(df['label']) - set(CROP_LABELS))
+    if unknown:
+        raise ValueError(f"field samples use crops the models cannot learn incrementally: {unknown}")
+    return df.reset_index(drop=True)
+
+
+def add_batch(path_or_frame, samples_dir=SAMPLES_DIR):
+    """Validate and store a batch of labelled rows, returns its batch id
+
+    The id is the UTC time plus a content hash, so adding the same file
+    twice is detected instead of double-counting its rows.
+    """
+    df = path_or_frame if isinstance(path_or_frame, pd.DataFrame) else pd.read_csv(path_or_frame)
+    df = validate_samples(df)
+    data = df.to_csv(index=False).encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    os.makedirs(samples_dir, exist_ok=True)
+    for existing in list_batches(samples_dir):
+        if existing.endswith(digest):
+            return existing
+
+    batch_id = f"{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}-{digest}"
+    tmp = os.path.join(samples_dir, f"{batch_id}.csv.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, os.path.join(samples_dir, f"{batch_id}.csv"))
+    return batch_id
+
+
+def list_batches(samples_dir=SAMPLES_DIR):
+    """Stored batch ids, oldest first"""
+    if not os.path.isdir(samples_dir):
+        return []
+    return sorted(name[:-len('.csv')] for name in os.listdir(samples_dir) if name.endswith('.csv'))
+
+
+def load_batches(batch_ids, samples_dir=SAMPLES_DIR):
+    """All rows of the given batches as one frame"""
+    frames = [pd.read_csv(os.path.join(samples_dir, f"{b}.csv"), dtype=DATASET_DTYPES) for b in batch_ids]
+    if not frames:
+        return pd.DataFrame({c: pd.Series(dtype=t) for c, t in DATASET_DTYPES.items()})
+    return pd.concat(frames, ignore_index=True)
+
+
+def _accuracy(model, df):
+    if len(df) == 0:
+        return None
+    return float(model.score(df[FEATURES], df['label']))
+
+
+def grow_forest(model, train, n_trees):
+    """A copy of a fitted forest with n_trees more trees fitted on train"""
+    grown = copy.deepcopy(model)
+    grown.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_trees)
+    grown.fit(train[FEATURES], train['label'])
+    grown.set_params(warm_start=False)
+    return grown
+
+
+def partial_update(model, samples):
+    """A copy of a partial_fit model updated with samples"""
+    updated = copy.deepcopy(model)
+    if len(samples):
+        updated.partial_fit(samples[FEATURES], samples['label'])
+    return updated
+
+
+def update_models(names=DEFAULT_MODELS, n_trees=DEFAULT_NEW_TREES, samples_dir=SAMPLES_DIR, output_dir=RELEASES_DIR):
+    """Build the next release from the current one plus the stored field samples
+
+    Returns (release directory, drift report).
+    """
+    manifest = read_manifest()
+    previous = manifest['version'] if manifest is not None else None
+    seen = set((manifest or {}).get('field_samples', []))
+    batches = list_batches(samples_dir)
+    new_batches = [b for b in batches if b not in seen]
+    if not new_batches:
+        raise ValueError(f"no new field samples in {samples_dir} since release {previous}")
+
+    # The notebook's split keeps the holdout comparable across versions
+    df = load_dataset()
+    train, test = train_test_split(df, test_size=TEST_SIZE, random_state=SPLIT_SEED)
+    all_samples = load_batches(batches, samples_dir)
+    new_samples = load_batches(new_batches, samples_dir)
+
+    trained, drift = {}, {}
+    for name in names:
+        entry = load_model(name, 'sklearn')
+        base = entry.model
+        start = time.perf_counter()
+        if isinstance(base, RandomForestClassifier):
+            model = grow_forest(base, pd.concat([train, all_samples], ignore_index=True), n_trees)
+            method = f"warm_start +{n_trees} trees"
+        elif hasattr(base, 'partial_fit'):
+            model = partial_update(base, new_samples)
+            method = 'partial_fit'
+        else:
+            raise ValueError(f"{name} ({type(base).__name__}) supports neither warm_start nor partial_fit")
+        seconds = time.perf_counter() - start
+
+        holdout = _accuracy(model, test)
+        drift[name] = {
+            'method': method,
+            'update_seconds': round(seconds, 4),
+            'previous_version': entry.version,
+            'holdout_before': _accuracy(base, test),
+            'holdout_after': holdout,
+            'new_samples_before': _accuracy(base, new_samples),
+            'new_samples_after': _accuracy(model, new_samples),
+        }
+        drift[name]['holdout_delta'] = drift[name]['holdout_after'] - drift[name]['holdout_before']
+        trained[name] = (model, {
+            'holdout_accuracy': holdout,
+            'holdout_log_loss': float(log_loss(test['label'], model.predict_proba(test[FEATURES]), labels=model.classes_)),
+            'fit_seconds': round(seconds, 4),
+            'params': {k: repr(v) for k, v in model.get_params(deep=False).items()},
+            'incremental': {'from': entry.version, 'method': method},
+        })
+
+    carried = {}
+    if manifest is not None:
+        source_dir = os.path.join(RELEASES_DIR, previous)
+        carried = {n: (source_dir, e) for n, e in manifest['models'].items() if n not in trained}
+
+    report = {
+        'previous_release': previous,
+        'field_samples_added': new_batches,
+        'new_rows': len(new_samples),
+        'models': drift,
+    }
+    version_dir = write_artifacts(
+        trained, output_dir, carried=carried,
+        extra={'parent': previous, 'field_samples': batches, 'drift': report},
+    )
+    return version_dir, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Incrementally update the crop models with field samples')
+    parser.add_argument('--samples-dir', default=SAMPLES_DIR, help='where batches are stored (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help='store a CSV of labelled field samples')
+    add.add_argument('csv')
+    commands.add_parser('batches', help='list stored batches')
+    update = commands.add_parser('update', help='write a new release from the stored samples')
+    update.add_argument('--models', nargs='+', default=list(DEFAULT_MODELS))
+    update.add_argument('--trees', type=int, default=DEFAULT_NEW_TREES, help='trees added to each forest (default: %(default)s)')
+    update.add_argument('--output-dir', default=RELEASES_DIR, help='where releases go (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'add':
+        try:
+            print(add_batch(args.csv, args.samples_dir))
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+    elif args.command == 'batches':
+        for batch in list_batches(args.samples_dir):
+            print(batch)
+    else:
+        start = time.perf_counter()
+        try:
+            version_dir, report = update_models(args.models, args.trees, args.samples_dir, args.output_dir)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        print(json.dumps(report, indent=2))
+        print(f"Wrote {version_dir} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
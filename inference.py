@@ -0,0 +1,68 @@
+# inference.py - Vectorized prediction helpers shared by the app, CLI and services
+
+
+import warnings
+
+import numpy as np
+
+from features import FEATURES
+
+
+def as_feature_matrix(X):
+    """Coerce one row or many rows of features into a float64 (n, 7) array"""
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if X.ndim != 2 or X.shape[1] != len(FEATURES):
+        raise ValueError(f"expected rows of {len(FEATURES)} features {FEATURES}, got shape {X.shape}")
+    return X
+
+
+def predict_proba(model, X):
+    """Call model.predict_proba on a plain array without the feature-name warning"""
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        return model.predict_proba(X)
+
+
+def predict_batch(model, X):
+    """Predict a whole block of rows with a single model call
+
+    Returns (labels, confidence) where confidence is the probability of the
+    predicted crop, or NaN for models without predict_proba.
+    """
+    X = as_feature_matrix(X)
+    if hasattr(model, 'predict_proba'):
+        proba = predict_proba(model, X)
+        best = proba.argmax(axis=1)
+        return np.asarray(model.classes_)[best], proba[np.arange(len(best)), best]
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        labels = model.predict(X)
+    return np.asarray(labels), np.full(len(labels), np.nan)
+
+
+def top_k(model, X, k=3):
+    """Rank the k most likely crops for every row from one predict_proba call
+
+    Returns (labels, proba), both shaped (n_rows, k) and ordered from most to
+    least likely, ties in class order, so the first column always agrees
+    with argmax. Models without predict_proba give a single column with NaN
+    probabilities.
+    """
+    X = as_feature_matrix(X)
+    if not hasattr(model, 'predict_proba'):
+        labels, confidence = predict_batch(model, X)
+        return labels[:, np.newaxis], confidence[:, np.newaxis]
+
+    proba = predict_proba(model, X)
+    k = max(1, min(k, proba.shape[1]))
+    rows = np.arange(len(proba))[:, np.newaxis]
+    if k == 1:
+        best = proba.argmax(axis=1)[:, np.newaxis]
+    else:
+        # A stable sort keeps tied classes in class order; with 22 classes a
+        # full sort costs about what argpartition plus a tie-break did
+        best = np.argsort(-proba, axis=1, kind='stable')[:, :k]
+    return np.asarray(model.classes_)[best], proba[rows, best]
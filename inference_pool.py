@@ -0,0 +1,130 @@
+# inference_pool.py - Process pool that scores against one shared-memory forest
+#
+# The parent compiles the forest once (forest_engine.CompiledForest) and
+# copies its node arrays into a single multiprocessing.shared_memory block.
+# Workers are started up front, attach to that block by name and wrap it in
+# a CompiledForest without copying, so N workers cost one model in RAM and
+# predictions run outside the parent's GIL. Each worker releases a semaphore
+# once attached, and the constructor waits for all of them.
+#
+# InferencePool has classes_ and predict_proba()/predict(), so it drops in
+# wherever a model is expected (inference.predict_batch, inference.top_k).
+
+
+import os
+import weakref
+from multiprocessing import get_all_start_methods, get_context, shared_memory
+
+import numpy as np
+
+from forest_engine import CompiledForest
+
+
+# Batches above this many rows are split across the workers
+SPLIT_ROWS = 2048
+# Seconds the constructor waits for every worker to attach
+ATTACH_TIMEOUT = 60
+_ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots', 'depths')
+
+# Set in each worker by _attach()
+_shm = None
+_forest = None
+
+
+def default_start_method():
+    """forkserver where available: a clean process to fork from, even when the
+    parent (Streamlit, the HTTP server) already runs threads"""
+    return 'forkserver' if 'forkserver' in get_all_start_methods() else 'spawn'
+
+
+def _attach(name, layout, classes, ready):
+    """Worker initializer: map the parent's block, build a zero-copy forest, release `ready`"""
+    global _shm, _forest
+    # Workers share the parent's resource tracker, so registering the block
+    # again is harmless and the parent's unlink() clears it
+    _shm = shared_memory.SharedMemory(name=name)
+    arrays = {
+        key: np.ndarray(shape, dtype=dtype, buffer=_shm.buf, offset=offset)
+        for key, (dtype, shape, offset) in layout.items()
+    }
+    for array in arrays.values():
+        array.flags.writeable = False
+    _forest = CompiledForest(classes=classes, **arrays)
+    ready.release()
+
+
+def _predict_proba(X):
+    return _forest.predict_proba(X)
+
+
+def _shutdown(pool, shm):
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+    shm.close()
+    shm.unlink()
+
+
+class InferencePool:
+    """A RandomForest (or CompiledForest) served by `workers` processes
+
+    predict_proba() sends small batches to one worker and splits large ones
+    across all of them. Call close() to stop the workers and free the
+    shared block.
+    """
+
+    def __init__(self, model, workers=None, start_method=None):
+        forest = model if isinstance(model, CompiledForest) else CompiledForest.from_sklearn(model)
+        self.workers = workers or os.cpu_count() or 1
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.feature_names_in_ = forest.feature_names_in_
+
+        layout, offset = {}, 0
+        for key in _ARRAYS:
+            array = np.ascontiguousarray(getattr(forest, key))
+            layout[key] = (array.dtype.str, array.shape, offset)
+            offset += -(-array.nbytes // 64) * 64
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for key, (dtype, shape, start) in layout.items():
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)[...] = getattr(forest, key)
+        self.nbytes = offset
+
+        ctx = get_context(start_method or default_start_method())
+        ready = ctx.Semaphore(0)
+        try:
+            self._pool = ctx.Pool(self.workers, initializer=_attach,
+                                  initargs=(shm.name, layout, self.classes_, ready))
+        except BaseException:
+            _shutdown(None, shm)
+            raise
+        # Also runs at interpreter exit, so the block never outlives the app
+        self._finalizer = weakref.finalize(self, _shutdown, self._pool, shm)
+        # Preload: one release per worker, so every worker has attached, not
+        # just those that happened to pick up a task
+        for _ in range(self.workers):
+            if not ready.acquire(timeout=ATTACH_TIMEOUT):
+                self.close()
+                raise TimeoutError(f"inference pool workers did not attach within {ATTACH_TIMEOUT}s")
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"expected rows of {self.n_features_in_} features, got shape {X.shape}")
+        if len(X) <= SPLIT_ROWS or self.workers == 1:
+            return self._pool.apply(_predict_proba, (X,))
+        chunks = np.array_split(X, min(self.workers, -(-len(X) // SPLIT_ROWS)))
+        return np.concatenate(self._pool.map(_predict_proba, chunks, chunksize=1))
+
+    def predict(self, X):
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1), axis=0)
+
+    def close(self):
+        """Stop the workers and unlink the shared block"""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
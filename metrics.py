@@ -0,0 +1,226 @@
+# metrics.py - Per-stage latency histograms, exported in Prometheus text format
+#
+# Usage:
+#   from metrics import span, timed
+#
+#   with span('get_model'):
+#       entry = get_model()
+#
+#   @timed()                      # stage name defaults to the function name
+#   def predict_crop(...): ...
+#
+# Each stage has a histogram with fixed log-spaced buckets (about 19% wide,
+# from 10us to 60s), so recording a span costs one bisect and one locked
+# increment, and memory does not grow with traffic. count, sum and
+# p50/p95/p99 (interpolated within a bucket) are exported as a Prometheus
+# summary:
+#   - serve.py serves them on GET /metrics
+#   - webapp.py writes them to AGRIVERSE_METRICS_FILE, which node_exporter's
+#     textfile collector (or anything else) can pick up
+# AGRIVERSE_METRICS=0 turns every span into a no-op.
+
+
+import bisect
+import functools
+import math
+import os
+import tempfile
+import threading
+import time
+
+
+ENABLED = os.environ.get('AGRIVERSE_METRICS', '1') != '0'
+METRIC_NAME = 'agriverse_stage_seconds'
+QUANTILES = (0.5, 0.95, 0.99)
+# Upper bucket bounds in seconds: 10us * 2**(i/4), up to about 60s
+BOUNDS = tuple(1e-5 * 2 ** (i / 4) for i in range(91))
+
+
+class Histogram:
+    """Thread-safe latency histogram over BOUNDS"""
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._buckets = [0] * (len(BOUNDS) + 1)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(BOUNDS, seconds)
+        with self._lock:
+            self._buckets[i] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, or None before the first observation"""
+        with self._lock:
+            return self._quantile(q)
+
+    def _quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self._buckets):
+            if n and seen + n >= rank:
+                lo = BOUNDS[i - 1] if i > 0 else self.min
+                hi = BOUNDS[i] if i < len(BOUNDS) else self.max
+                lo, hi = max(lo, self.min), min(hi, self.max)
+                if lo <= 0 or hi <= lo:
+                    return hi
+                # Geometric interpolation, matching the log-spaced buckets
+                return lo * (hi / lo) ** ((rank - seen) / n)
+            seen += n
+        return self.max
+
+    def snapshot(self):
+        with self._lock:
+            summary = {'count': self.count, 'sum': self.sum, 'max': self.max if self.count else None}
+            for q in QUANTILES:
+                summary[f"p{round(q * 100)}"] = self._quantile(q)
+            return summary
+
+
+class _Span:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Metrics:
+    """A set of named stage histograms"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, Histogram())
+        return histogram
+
+    def observe(self, stage, seconds):
+        if self.enabled:
+            self.histogram(stage).observe(seconds)
+
+    def span(self, stage):
+        """Context manager that records the time spent in its block under stage"""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self.histogram(stage))
+
+    def timed(self, stage=None):
+        """Decorator form of span(); stage defaults to the function's name"""
+        def decorate(fn):
+            name = stage or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def snapshot(self):
+        """{stage: {count, sum, max, p50, p95, p99}}"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        return {stage: h.snapshot() for stage, h in histograms}
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def prometheus(self):
+        """All stages in the Prometheus text exposition format (as a summary)"""
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent per request stage",
+            f"# TYPE {METRIC_NAME} summary",
+        ]
+        for stage, summary in self.snapshot().items():
+            label = f'stage="{_escape(stage)}"'
+            for q in QUANTILES:
+                value = summary[f"p{round(q * 100)}"]
+                lines.append(f'{METRIC_NAME}{{{label},quantile="{q}"}} {_number(value)}')
+            lines.append(f"{METRIC_NAME}_sum{{{label}}} {_number(summary['sum'])}")
+            lines.append(f"{METRIC_NAME}_count{{{label}}} {summary['count']}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return 'NaN' if value is None else repr(float(value))
+
+
+REGISTRY = Metrics(ENABLED)
+span = REGISTRY.span
+timed = REGISTRY.timed
+observe = REGISTRY.observe
+snapshot = REGISTRY.snapshot
+prometheus = REGISTRY.prometheus
+
+_last_write = {}
+_write_lock = threading.Lock()
+
+
+def write_file(path, min_interval=0.0, registry=REGISTRY):
+    """Atomically write registry.prometheus() to path, at most once per min_interval seconds
+
+    Safe to call from every Streamlit session thread. Returns True if the
+    file was written.
+    """
+    with _write_lock:
+        now = time.monotonic()
+        last = _last_write.get(path)
+        if last is not None and now - last < min_interval:
+            return False
+        _last_write[path] = now
+        fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp',
+                                   dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(registry.prometheus())
+            # mkstemp makes it 0600; scrapers often run as another user
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        return True
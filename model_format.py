@@ -0,0 +1,203 @@
+# model_format.py - Pickle-free, memory-mappable files for compiled forests
+#
+# Usage:
+#   python model_format.py export RF.pkl RF.forest
+#   python model_format.py info RF.forest
+#
+# A .forest file is an 8-byte magic, a little-endian uint32 header length,
+# a UTF-8 JSON header (schema, classes, version and the offset, dtype and
+# shape of every array) and then the CompiledForest node arrays, each
+# aligned to 64 bytes. load_forest() maps the arrays read-only with
+# np.memmap, so every worker on a host shares one copy in the page cache,
+# and nothing in the file is ever executed the way a pickle is.
+
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+from features import FEATURES
+from forest_engine import CompiledForest
+
+
+MAGIC = b'AGRIFRST'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots', 'depths')
+# Stored dtypes are fixed, so a file cannot smuggle in object arrays
+DTYPES = {
+    'feature': '<i8',
+    'threshold': '<f8',
+    'children': '<i8',
+    'value': '<f8',
+    'roots': '<i8',
+    'depths': '<i8',
+}
+_PREFIX = struct.Struct('<8sI')
+
+
+class ModelFormatError(ValueError):
+    """Raised for .forest files that are truncated, inconsistent or not ours"""
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_forest(forest, path, **metadata):
+    """Write a CompiledForest to path atomically; metadata goes into the header"""
+    arrays = {name: np.ascontiguousarray(getattr(forest, name), dtype=DTYPES[name]) for name in ARRAYS}
+    header = {
+        'format': FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'features': FEATURES,
+        'classes': [str(c) for c in forest.classes_],
+        'n_trees': forest.n_trees,
+        'n_nodes': forest.n_nodes,
+        **metadata,
+        'arrays': {},
+    }
+    # Offsets depend on the header length, which depends on the offsets;
+    # repeat until the padded header size stops changing
+    data_start, previous = 0, None
+    while data_start != previous:
+        previous = data_start
+        offset = data_start
+        for name, array in arrays.items():
+            header['arrays'][name] = {'dtype': DTYPES[name], 'shape': list(array.shape), 'offset': offset}
+            offset = _aligned(offset + array.nbytes)
+        encoded = json.dumps(header, sort_keys=True).encode('utf-8')
+        data_start = _aligned(_PREFIX.size + len(encoded))
+
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, len(encoded)))
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.seek(header['arrays'][name]['offset'])
+            f.write(array.tobytes())
+    os.replace(tmp, path)
+    return path
+
+
+def read_header(path):
+    """The JSON header of a .forest file"""
+    with open(path, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) != _PREFIX.size:
+            raise ModelFormatError(f"{path} is too short to be a .forest file")
+        magic, length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ModelFormatError(f"{path} is not a .forest file")
+        try:
+            header = json.loads(f.read(length).decode('utf-8'))
+        except ValueError as e:
+            raise ModelFormatError(f"{path} has an unreadable header: {e}")
+    if header.get('format') != FORMAT_VERSION:
+        raise ModelFormatError(f"{path} uses format {header.get('format')}, expected {FORMAT_VERSION}")
+    return header
+
+
+def load_forest(path, mmap=True):
+    """Open a .forest file as a CompiledForest backed by read-only memory maps
+
+    The header and array bounds are checked against the file size, and the
+    node table is checked for out-of-range indices, so a corrupt or hostile
+    file raises ModelFormatError instead of crashing a worker.
+    """
+    header = read_header(path)
+    if header['features'] != FEATURES:
+        raise ModelFormatError(f"{path} was exported for features {header['features']}, expected {FEATURES}")
+
+    size = os.path.getsize(path)
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    else:
+        with open(path, 'rb') as f:
+            buffer = np.frombuffer(f.read(), dtype=np.uint8)
+
+    arrays = {}
+    for name in ARRAYS:
+        spec = header['arrays'].get(name)
+        if spec is None or spec['dtype'] != DTYPES[name]:
+            raise ModelFormatError(f"{path} has no valid {name!r} array")
+        shape, start = spec.get('shape'), spec.get('offset')
+        if (not isinstance(start, int) or not isinstance(shape, list)
+                or not all(isinstance(n, int) and n >= 0 for n in shape)):
+            raise ModelFormatError(f"{path}: array {name!r} has an invalid offset or shape")
+        dtype = np.dtype(spec['dtype'])
+        end = start + int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        if start < 0 or start % ALIGNMENT or end > size:
+            raise ModelFormatError(f"{path}: array {name!r} lies outside the file")
+        arrays[name] = buffer[start:end].view(dtype).reshape(shape)
+
+    _check_node_table(path, arrays, len(header['classes']))
+    forest = CompiledForest(classes=np.asarray(header['classes'], dtype=object), **arrays)
+    forest.header = header
+    return forest
+
+
+def _check_node_table(path, arrays, n_classes):
+    n_nodes = len(arrays['feature'])
+    n_trees = len(arrays['roots'])
+    shapes_ok = (
+        arrays['threshold'].shape == (n_nodes,)
+        and arrays['children'].shape == (n_nodes, 2)
+        and arrays['value'].shape == (n_nodes, n_classes)
+        and arrays['depths'].shape == (n_trees,)
+        and n_trees > 0
+    )
+    if not shapes_ok:
+        raise ModelFormatError(f"{path}: node arrays have inconsistent shapes")
+    for name, high in (('feature', len(FEATURES)), ('children', n_nodes), ('roots', n_nodes)):
+        values = arrays[name]
+        if values.size and (values.min() < 0 or values.max() >= high):
+            raise ModelFormatError(f"{path}: {name!r} indices out of range")
+    # Depths bound the traversal loop: no tree can be deeper than it has nodes
+    if arrays['depths'].min() < 0 or arrays['depths'].max() > n_nodes:
+        raise ModelFormatError(f"{path}: tree depth out of range")
+
+
+def export_pickle(pickle_path, forest_path):
+    """Compile a pickled sklearn forest and save it as a .forest file"""
+    import pickle
+
+    with open(pickle_path, 'rb') as f:
+        model = pickle.load(f)
+    with open(pickle_path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    forest = CompiledForest.from_sklearn(model)
+    return save_forest(
+        forest,
+        forest_path,
+        version=digest[:12],
+        source={'file': os.path.basename(pickle_path), 'sha256': digest, 'estimator': type(model).__name__},
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export and inspect memory-mappable .forest model files')
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help='convert a pickled RandomForest/DecisionTree')
+    export.add_argument('pickle')
+    export.add_argument('output')
+    info = commands.add_parser('info', help='print the header of a .forest file')
+    info.add_argument('path')
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        path = export_pickle(args.pickle, args.output)
+        print(f"Wrote {path} ({os.path.getsize(path):,} bytes)", file=sys.stderr)
+    else:
+        print(json.dumps(read_header(args.path), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,273 @@
+# model_registry.py - Load the shipped model artifacts once per process
+
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from features import FEATURES, CROP_LABELS, DATASET_DTYPES, DATASET_PATH, INPUT_SPECS
+from inference import predict_proba
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.environ.get('AGRIVERSE_MODEL_DIR', BASE_DIR)
+DEFAULT_MODEL = os.environ.get('AGRIVERSE_MODEL', 'RF')
+# 'sklearn' runs the pickled estimator, 'compiled' the flat-array forest_engine
+DEFAULT_BACKEND = os.environ.get('AGRIVERSE_BACKEND', 'sklearn')
+BACKENDS = ('sklearn', 'compiled')
+# Versioned artifacts written by train_pipeline.py; LATEST names the current one
+RELEASES_DIR = os.environ.get('AGRIVERSE_RELEASES_DIR', os.path.join(BASE_DIR, 'models'))
+PINNED_RELEASE = os.environ.get('AGRIVERSE_MODEL_VERSION')
+# Serve without the training stack: no pandas/model_selection import to score
+# the holdout, so models without a release manifest report accuracy None
+INFERENCE_ONLY = os.environ.get('AGRIVERSE_INFERENCE_ONLY') == '1'
+
+# Artifact name -> pickle written by Crop_reccom(final).ipynb
+MODEL_FILES = {
+    'RF': 'RF.pkl',
+    'RandomForest': 'RandomForest.pkl',
+    'DecisionTree': 'DecisionTree.pkl',
+    'NBClassifier': 'NBClassifier.pkl',
+    'KNeighborsClassifier': 'KNeighborsClassifier.pkl',
+    'XGBoost': 'XGBoost.pkl',
+}
+
+
+# The sidebar defaults and the corners of the input ranges
+CANARY_ROWS = np.array([
+    [INPUT_SPECS[f][2] for f in FEATURES],
+    [INPUT_SPECS[f][0] for f in FEATURES],
+    [INPUT_SPECS[f][1] for f in FEATURES],
+], dtype=np.float64)
+
+
+class ModelSchemaError(ValueError):
+    """Raised when a model artifact does not match the crop feature schema"""
+
+
+@dataclass(frozen=True)
+class ModelEntry:
+    """A loaded model together with where it came from"""
+    name: str
+    model: object
+    version: str
+    path: str
+    accuracy: float  # None when unknown (AGRIVERSE_INFERENCE_ONLY without a manifest)
+    backend: str = 'sklearn'
+
+
+_lock = threading.Lock()
+_entries = {}
+
+
+def check_probabilities(model):
+    """Check that predict_proba (if any) gives a probability distribution for every CANARY_ROWS row
+
+    Catches forests pickled by an older sklearn, whose trees hold vote
+    counts that the installed version returns unnormalized.
+    """
+    if not hasattr(model, 'predict_proba'):
+        return
+    proba = np.asarray(predict_proba(model, CANARY_ROWS))
+    if proba.shape != (len(CANARY_ROWS), len(model.classes_)):
+        raise ModelSchemaError(f"predict_proba has shape {proba.shape} for {len(CANARY_ROWS)} rows")
+    if not np.isfinite(proba).all() or (proba < 0).any() or not np.allclose(proba.sum(axis=1), 1.0):
+        raise ModelSchemaError(f"{type(model).__name__}.predict_proba rows are not probability distributions"
+                               f" (row sums {np.round(proba.sum(axis=1), 3).tolist()})")
+
+
+def validate_model(model, expected_classes=CROP_LABELS):
+    """Check that a model takes our seven features and predicts known crops"""
+    if not hasattr(model, 'predict'):
+        raise ModelSchemaError(f"{type(model).__name__} has no predict() method")
+
+    n_features = getattr(model, 'n_features_in_', None)
+    if n_features is None:
+        raise ModelSchemaError(f"{type(model).__name__} is not fitted")
+    if n_features != len(FEATURES):
+        raise ModelSchemaError(f"expected {len(FEATURES)} features, model has {n_features}")
+
+    names = getattr(model, 'feature_names_in_', None)
+    if names is not None and list(names) != FEATURES:
+        raise ModelSchemaError(f"feature order {list(names)} does not match {FEATURES}")
+
+    classes = getattr(model, 'classes_', None)
+    if classes is None or len(classes) == 0:
+        raise ModelSchemaError(f"{type(model).__name__} has no classes_")
+    if expected_classes is not None:
+        unknown = sorted(set(map(str, classes)) - set(expected_classes))
+        if unknown:
+            raise ModelSchemaError(f"model predicts unknown crops: {unknown}")
+
+
+def holdout_accuracy(model):
+    """Score a model on the notebook's 20% holdout split of Crop_recommendation.csv"""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    df = pd.read_csv(os.path.join(BASE_DIR, DATASET_PATH), dtype=DATASET_DTYPES)
+    _, X_test, _, y_test = train_test_split(df[FEATURES], df['label'], test_size=0.2, random_state=2)
+    return float(model.score(X_test, y_test))
+
+
+def current_release():
+    """Name of the release to serve: AGRIVERSE_MODEL_VERSION, else models/LATEST, else None"""
+    if PINNED_RELEASE:
+        return PINNED_RELEASE
+    try:
+        with open(os.path.join(RELEASES_DIR, 'LATEST')) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(release=None):
+    """The manifest.json of a trained release (default: the current one), or None"""
+    release = release or current_release()
+    if release is None:
+        return None
+    with open(os.path.join(RELEASES_DIR, release, 'manifest.json')) as f:
+        return json.load(f)
+
+
+def artifact_path(name, manifest=None):
+    """Resolve an artifact name (or a path to a .pkl, .forest or .grid.npy) to a file on disk
+
+    Names found in the release manifest win over the pickles shipped in the
+    repo root, so a trained release replaces them without code changes.
+    """
+    if manifest is not None and name in manifest['models']:
+        return os.path.join(RELEASES_DIR, manifest['version'], manifest['models'][name]['file'])
+    if name in MODEL_FILES:
+        return os.path.join(MODEL_DIR, MODEL_FILES[name])
+    return os.path.abspath(name)
+
+
+def _sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _exported_forest(path, digest, info, manifest):
+    """The .forest export of a pickle, if one exists and was made from this exact file"""
+    if info is not None and 'forest' in info:
+        forest_path = os.path.join(RELEASES_DIR, manifest['version'], info['forest']['file'])
+        if _sha256(forest_path) != info['forest']['sha256']:
+            raise ModelSchemaError(f"{forest_path} does not match the sha256 in release {manifest['version']}")
+        return forest_path
+
+    forest_path = os.path.splitext(path)[0] + '.forest'
+    if not os.path.exists(forest_path):
+        return None
+    from model_format import read_header
+    source = read_header(forest_path).get('source', {})
+    return forest_path if source.get('sha256') == digest else None
+
+
+def read_entry(name=None, backend=None):
+    """Load, verify and validate an artifact from disk, bypassing the cache
+
+    With the 'compiled' backend a matching .forest export (from the release
+    manifest, or next to the pickle) is memory-mapped instead of unpickling.
+    Passing a .forest path directly always gives the compiled backend, and a
+    .grid.npy path a memory-mapped DecisionGrid (decision_grid.py).
+    """
+    name = name or DEFAULT_MODEL
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+
+    manifest = read_manifest()
+    path = artifact_path(name, manifest)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"model artifact not found: {path}")
+
+    digest = _sha256(path)
+    info = manifest['models'].get(name) if manifest is not None else None
+    if info is not None and info['sha256'] != digest:
+        raise ModelSchemaError(f"{path} does not match the sha256 in release {manifest['version']}")
+
+    version = digest[:12]
+    forest_path = path if path.endswith('.forest') else None
+    if path.endswith('.grid.npy'):
+        from decision_grid import load_grid
+        model = load_grid(path, sha256=digest)
+        version = f"grid-{version}"
+        backend = 'grid'
+    elif forest_path is None and backend == 'compiled':
+        forest_path = _exported_forest(path, digest, info, manifest)
+    if forest_path is not None:
+        # Memory-mapped export: no unpickling and no sklearn import
+        from model_format import load_forest
+        model = load_forest(forest_path)
+        version = model.header.get('version', version)
+        backend = 'compiled'
+    elif backend != 'grid':
+        with open(path, 'rb') as f:
+            model = pickle.load(f)
+    validate_model(model, manifest['classes'] if info is not None else CROP_LABELS)
+    if backend != 'grid':
+        # A grid's rows carry only the winning class's confidence
+        check_probabilities(model)
+
+    if info is not None:
+        accuracy = info['holdout_accuracy']
+    elif backend == 'grid':
+        accuracy = model.meta.get('holdout_accuracy')
+    elif forest_path is not None:
+        # Scoring would import sklearn and read the dataset, which .forest files exist to avoid
+        accuracy = model.header.get('holdout_accuracy')
+    else:
+        accuracy = None if INFERENCE_ONLY else holdout_accuracy(model)
+    if backend == 'compiled' and forest_path is None:
+        from forest_engine import CompiledForest
+        model = CompiledForest.from_sklearn(model)
+
+    return ModelEntry(name, model, version, path, accuracy, backend)
+
+
+def load_model(name=None, backend=None):
+    """Return the ModelEntry for an artifact, loading it on first use only"""
+    key = (name or DEFAULT_MODEL, backend or DEFAULT_BACKEND)
+    entry = _entries.get(key)
+    if entry is not None:
+        return entry
+
+    with _lock:
+        # Another thread may have loaded it while we waited
+        entry = _entries.get(key)
+        if entry is None:
+            entry = _entries[key] = read_entry(*key)
+        return entry
+
+
+def swap_model(entry, name=None, backend=None):
+    """Make entry what load_model(name, backend) returns from now on, returns the old entry
+
+    Callers that already hold the old entry keep using it, so predictions
+    in flight finish on the version they started with.
+    """
+    key = (name or DEFAULT_MODEL, backend or DEFAULT_BACKEND)
+    with _lock:
+        previous = _entries.get(key)
+        _entries[key] = entry
+    return previous
+
+
+def register_model(name, model, accuracy, expected_classes=CROP_LABELS):
+    """Put an in-memory model (e.g. an explicit retrain) into the registry"""
+    validate_model(model, expected_classes)
+    entry = ModelEntry(name, model, f"memory-{id(model):x}", '', float(accuracy))
+    with _lock:
+        _entries[(name, 'sklearn')] = entry
+    return entry
+
+
+def loaded_models():
+    """(name, backend) pairs of the artifacts loaded in this process"""
+    return sorted(_entries)
@@ -0,0 +1,202 @@
+# model_watcher.py - Pick up new model artifacts without restarting the process
+#
+# Usage:
+#   python model_watcher.py status      # release and artifact that would be served
+#   python model_watcher.py rollback    # point models/LATEST at the previous release
+#
+# A ModelWatcher polls what load_model() would read (models/LATEST, the
+# release manifest and the artifact file's size and mtime). When that
+# changes it loads the new artifact in its own thread, validates it (read_entry
+# also runs a canary prediction) and only then swaps it into model_registry, so new
+# requests get the new version while requests already holding the old
+# entry finish on it. A bad artifact is logged and the old model keeps
+# serving.
+#
+# rollback() swaps the previous in-memory version back in this process;
+# `python model_watcher.py rollback` repoints LATEST on disk, which every
+# watching worker then follows.
+
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from model_registry import (DEFAULT_BACKEND, DEFAULT_MODEL, RELEASES_DIR, artifact_path, current_release,
+                            load_model, read_entry, read_manifest, swap_model)
+
+
+log = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 5.0
+HISTORY = 3
+
+
+def fingerprint(name=None):
+    """What identifies the artifact load_model(name) would read right now"""
+    manifest = read_manifest()
+    path = artifact_path(name or DEFAULT_MODEL, manifest)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return (manifest and manifest['version'], path, None, None)
+    return (manifest and manifest['version'], path, stat.st_size, stat.st_mtime_ns)
+
+
+class ModelWatcher:
+    """Polls for a new artifact version and hot-swaps it into model_registry
+
+    Holders of derived state (a micro-batcher, a process pool) pass
+    prepare(new_entry), which builds that state before anything is swapped:
+    if it raises, the new version is rejected like a bad artifact and the
+    registry keeps the old one. on_swap(new_entry, old_entry, prepared) is
+    then called after every swap, including rollbacks, with what prepare
+    returned (None without a prepare hook).
+    """
+
+    def __init__(self, name=None, backend=None, interval=DEFAULT_INTERVAL, on_swap=None, prepare=None):
+        self.name = name or DEFAULT_MODEL
+        self.backend = backend or DEFAULT_BACKEND
+        self.interval = interval
+        self.on_swap = on_swap
+        self.prepare = prepare
+        self.swaps = 0
+        self.last_error = None
+        self._history = []
+        self._skip = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._seen = fingerprint(self.name)
+        self.current = load_model(self.name, self.backend)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check(self):
+        """Poll once; returns True if a new version was swapped in"""
+        seen = fingerprint(self.name)
+        if seen == self._seen or seen == self._skip:
+            return False
+        prepared = None
+        try:
+            entry = read_entry(self.name, self.backend)
+            if entry.version != self.current.version and self.prepare is not None:
+                prepared = self.prepare(entry)
+        except Exception as e:
+            # Remember it so a broken artifact is not reloaded on every poll
+            self._seen = seen
+            self.last_error = f"{type(e).__name__}: {e}"
+            log.error('rejected new %s artifact %s: %s', self.name, seen[1], self.last_error)
+            return False
+        self._seen = seen
+        self.last_error = None
+        if entry.version == self.current.version:
+            return False  # touched, but the same bytes
+        self._swap(entry, keep_history=True, prepared=prepared)
+        return True
+
+    def rollback(self):
+        """Swap the previous version back in; returns it, or None if there is none
+
+        The version on disk that was rolled back from is not loaded again
+        until the artifact changes once more.
+        """
+        with self._lock:
+            if not self._history:
+                return None
+            entry = self._history.pop()
+        try:
+            prepared = self.prepare(entry) if self.prepare is not None else None
+        except Exception as e:
+            with self._lock:
+                self._history.append(entry)
+            self.last_error = f"{type(e).__name__}: {e}"
+            raise
+        self._skip = self._seen
+        self._swap(entry, keep_history=False, prepared=prepared)
+        return entry
+
+    def _swap(self, entry, keep_history, prepared=None):
+        with self._lock:
+            old = self.current
+            if keep_history:
+                self._history = (self._history + [old])[-HISTORY:]
+            self.current = entry
+            swap_model(entry, self.name, self.backend)
+            self.swaps += 1
+        log.info('serving %s version %s (was %s)', self.name, entry.version, old.version)
+        if self.on_swap is not None:
+            self.on_swap(entry, old, prepared)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                log.exception('model watcher poll failed')
+
+
+def releases():
+    """Release versions in RELEASES_DIR that have a manifest, oldest first"""
+    if not os.path.isdir(RELEASES_DIR):
+        return []
+    return sorted(
+        d for d in os.listdir(RELEASES_DIR)
+        if os.path.exists(os.path.join(RELEASES_DIR, d, 'manifest.json'))
+    )
+
+
+def rollback_release():
+    """Point models/LATEST at the release before the current one; returns its name"""
+    current = current_release()
+    older = [r for r in releases() if current is None or r < current]
+    if not older:
+        raise ValueError(f"no release older than {current} in {RELEASES_DIR}")
+    previous = older[-1]
+    tmp = os.path.join(RELEASES_DIR, 'LATEST.tmp')
+    with open(tmp, 'w') as f:
+        f.write(previous + '\n')
+    os.replace(tmp, os.path.join(RELEASES_DIR, 'LATEST'))
+    return previous
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect or roll back the served model release')
+    parser.add_argument('command', choices=('status', 'rollback'))
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    args = parser.parse_args(argv)
+
+    if args.command == 'rollback':
+        try:
+            print(f"LATEST -> {rollback_release()}")
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    release, path, size, mtime_ns = fingerprint(args.model)
+    print(json.dumps({
+        'release': release,
+        'releases': releases(),
+        'artifact': path,
+        'bytes': size,
+        'modified': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(mtime_ns / 1e9)) if mtime_ns else None,
+    }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
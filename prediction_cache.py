@@ -0,0 +1,102 @@
+# prediction_cache.py - Bounded LRU/TTL cache for single-row predictions
+
+
+import threading
+import time
+from collections import OrderedDict
+
+from features import FEATURES, INPUT_STEPS
+
+
+def quantize(features, steps=INPUT_STEPS):
+    """Snap a row onto the sidebar input grid, as integer step counts"""
+    if len(features) != len(FEATURES):
+        raise ValueError(f"expected {len(FEATURES)} features, got {len(features)}")
+    return tuple(int(round(float(value) / step)) for value, step in zip(features, steps))
+
+
+def snap(features, steps=INPUT_STEPS):
+    """The row a quantized key stands for: every value rounded to its input step"""
+    return [round(count * step, 10) for count, step in zip(quantize(features, steps), steps)]
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of predictions keyed on (model version, quantized row)
+
+    Entries older than ttl seconds are treated as misses; ttl=None keeps them
+    until they are evicted by newer entries. get_or_compute() predicts on the
+    snapped row, so a cached answer depends only on its key and not on which
+    row of the bucket happened to arrive first.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None, steps=INPUT_STEPS):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.steps = steps
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, features, version):
+        return (version, quantize(features, self.steps))
+
+    def get(self, features, version):
+        """Cached value for this row and model version, or None"""
+        key = self.key(features, version)
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires = item
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, features, version, value):
+        key = self.key(features, version)
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, features, version, compute):
+        """Return the cached prediction or call compute(snapped_row) and cache its result
+
+        None results (failed predictions) are not cached.
+        """
+        value = self.get(features, version)
+        if value is None:
+            value = compute(snap(features, self.steps))
+            if value is not None:
+                self.put(features, version, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
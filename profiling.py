@@ -0,0 +1,171 @@
+# profiling.py - Opt-in cProfile + tracemalloc captures of slow reruns
+#
+# Usage:
+#   AGRIVERSE_PROFILE=rerun streamlit run webapp.py     # profile every rerun of main()
+#   AGRIVERSE_PROFILE=predict streamlit run webapp.py   # only the prediction step
+#   AGRIVERSE_PROFILE_QUERY=1 streamlit run webapp.py   # allow ?profile=rerun / ?profile=predict
+#
+#   python profiling.py list                   # captures, newest last
+#   python profiling.py show [CAPTURE]         # one capture's summary (default: newest)
+#   python profiling.py summary --top 30       # hot spots over all captures combined
+#
+# capture(label) runs its block under cProfile and tracemalloc and writes
+#   <PROFILE_DIR>/<time>-<label>.prof   pstats data (snakeviz, pstats, `summary`)
+#   <PROFILE_DIR>/<time>-<label>.txt    top functions by cumulative and own time,
+#                                       top allocation sites and peak traced memory
+# keeping only the newest PROFILE_KEEP captures (0 keeps them all). Only
+# one capture runs at a time per process; a rerun that asks for one while
+# another session is being profiled runs unprofiled. tracemalloc sees the whole process, so other
+# sessions' allocations during a capture are included.
+
+
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from model_registry import BASE_DIR
+
+
+PROFILE_DIR = os.environ.get('AGRIVERSE_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILE_KEEP = int(os.environ.get('AGRIVERSE_PROFILE_KEEP', '50'))
+TRACE_FRAMES = 5
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+
+_lock = threading.Lock()
+
+
+def _stem(label):
+    now = time.time()
+    return f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}-{label}"
+
+
+def function_report(stats, top=TOP_FUNCTIONS):
+    """Text tables of the top functions by cumulative and by own time"""
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats('cumulative').print_stats(top)
+    stats.sort_stats('tottime').print_stats(top)
+    return out.getvalue()
+
+
+def allocation_report(snapshot, top=TOP_ALLOCATIONS):
+    """Top allocation sites by size, ignoring the profilers themselves"""
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    ))
+    lines = []
+    for stat in snapshot.statistics('traceback')[:top]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+        for caller in stat.traceback[1:3]:
+            lines.append(f"{'':30s}<- {caller.filename}:{caller.lineno}")
+    return '\n'.join(lines)
+
+
+def rotate(directory=PROFILE_DIR, keep=PROFILE_KEEP):
+    """Delete all but the newest `keep` captures; keep < 1 means no limit"""
+    if keep < 1:
+        return
+    for stem in list_captures(directory)[:-keep]:
+        for ext in ('.prof', '.txt'):
+            try:
+                os.remove(os.path.join(directory, stem + ext))
+            except FileNotFoundError:
+                pass
+
+
+def list_captures(directory=PROFILE_DIR):
+    """Capture names (file stems), oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len('.prof')] for name in os.listdir(directory) if name.endswith('.prof'))
+
+
+@contextmanager
+def capture(label, directory=PROFILE_DIR, keep=PROFILE_KEEP):
+    """Profile the block and save a capture; yields its path stem, or None if
+    another capture is already running"""
+    if not _lock.acquire(blocking=False):
+        yield None
+        return
+    try:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACE_FRAMES)
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        stem = os.path.join(directory, _stem(label))
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield stem
+        finally:
+            profiler.disable()
+            seconds = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+            os.makedirs(directory, exist_ok=True)
+            profiler.dump_stats(stem + '.prof')
+            with open(stem + '.txt', 'w') as f:
+                f.write(f"{label}: {seconds * 1000:.1f} ms, peak traced memory {peak / 1024:.1f} KiB\n\n")
+                f.write(function_report(pstats.Stats(profiler)))
+                f.write('\nTop allocation sites still held at the end\n')
+                f.write(allocation_report(snapshot) + '\n')
+            rotate(directory, keep)
+    finally:
+        _lock.release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect profiles captured by the app')
+    parser.add_argument('--dir', default=PROFILE_DIR, help='capture directory (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='list captures')
+    show = commands.add_parser('show', help="print one capture's summary")
+    show.add_argument('capture', nargs='?', help='capture name (default: newest)')
+    summary = commands.add_parser('summary', help='hot spots over all captures')
+    summary.add_argument('--top', type=int, default=TOP_FUNCTIONS)
+    summary.add_argument('--label', help='only captures with this label, e.g. rerun or predict')
+    args = parser.parse_args(argv)
+
+    captures = list_captures(args.dir)
+    if args.command == 'list':
+        for stem in captures:
+            print(stem)
+        return 0
+    if not captures:
+        print(f"error: no captures in {args.dir}", file=sys.stderr)
+        return 1
+    if args.command == 'show':
+        stem = args.capture or captures[-1]
+        with open(os.path.join(args.dir, stem + '.txt')) as f:
+            print(f.read())
+        return 0
+
+    if args.label:
+        captures = [c for c in captures if c.endswith(f"-{args.label}")]
+    if not captures:
+        print(f"error: no '{args.label}' captures in {args.dir}", file=sys.stderr)
+        return 1
+    stats = pstats.Stats(*(os.path.join(args.dir, c + '.prof') for c in captures))
+    print(f"{len(captures)} captures\n")
+    print(function_report(stats, args.top))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
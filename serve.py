@@ -0,0 +1,375 @@
+# serve.py - Stateless JSON inference API next to the Streamlit app
+#
+# Usage:
+#   python serve.py --port 8000 --workers 8
+#   AGRIVERSE_INFERENCE_ONLY=1 python serve.py   # never import pandas or the training stack
+#   python serve.py --pool-workers 4             # score in 4 processes sharing one forest
+#   python serve.py --watch 5                    # hot-swap new model releases, polling every 5s
+#
+# Routes:
+#   GET  /healthz         process is up
+#   GET  /readyz          model is loaded and validated (503 until then)
+#   GET  /stats           prediction cache, micro-batcher and model watcher counters, stage latencies
+#   GET  /metrics         stage latency histograms in Prometheus text format (metrics.py)
+#   POST /predict         {"features": {"N": 90, "P": 42, ...}}  or  {"features": [90, 42, ...]}
+#   POST /predict/batch   {"rows": [{...}, {...}]}  or  {"rows": [[...], [...]]}
+#                         add "top_k": 3 to also get ranked "alternatives" per row
+#
+# Feature values are checked by validation.py against the sidebar ranges.
+# /predict answers 400 with the problems; /predict/batch scores the valid
+# rows and returns {"crop": null, "error_code": ..., "errors": [...]} for
+# the others, with their count under "rejected".
+#
+# Every connection gets its own thread and keep-alive connections are
+# closed after IDLE_TIMEOUT idle seconds; --workers bounds how many requests
+# are scored at the same time, so idle or slow clients never hold a
+# scoring slot.
+
+
+import argparse
+import json
+import math
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from coalescer import MicroBatcher
+import metrics
+from features import FEATURES
+from forest_engine import compilable
+from inference import predict_batch, top_k
+from model_registry import BACKENDS, DEFAULT_BACKEND, DEFAULT_MODEL, load_model
+from prediction_cache import PredictionCache
+from validation import explain, validate
+
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_TOP_K = 22
+# After a hot swap the old model's batcher and pool stay up this long for in-flight requests
+RETIRE_SECONDS = 30.0
+# Seconds a keep-alive connection may sit idle (or a client may stall mid-request) before it is closed
+IDLE_TIMEOUT = 5.0
+
+
+class BadRequest(ValueError):
+    """Raised for request bodies we cannot score"""
+
+
+class PayloadTooLarge(BadRequest):
+    """Raised for bodies over MAX_BODY_BYTES (answered with 413)"""
+
+
+def parse_row(row):
+    """Turn a {feature: value} dict or a 7-item list into a list of values in FEATURES order"""
+    if isinstance(row, dict):
+        missing = [f for f in FEATURES if f not in row]
+        if missing:
+            raise BadRequest(f"missing features: {missing}")
+        row = [row[f] for f in FEATURES]
+    if not isinstance(row, (list, tuple)) or len(row) != len(FEATURES):
+        raise BadRequest(f"each row needs the {len(FEATURES)} features {FEATURES}")
+    if any(isinstance(v, (list, dict)) for v in row):
+        raise BadRequest(f"feature values must be numbers, got {row}")
+    return list(row)
+
+
+class Deployment:
+    """One model version together with the pool and batcher built around it"""
+
+    def __init__(self, entry, pool_workers=0, coalesce_ms=0.0, max_batch=64):
+        self.entry = entry
+        self.pool = None
+        # Only tree ensembles can share a compiled forest; anything else scores in-thread
+        if pool_workers > 0 and entry.backend != 'grid' and compilable(entry.model):
+            from inference_pool import InferencePool
+            self.pool = InferencePool(entry.model, pool_workers)
+        self.model = self.pool or entry.model
+        self.batcher = MicroBatcher(self.model, coalesce_ms, max_batch) if coalesce_ms > 0 else None
+
+    def describe(self):
+        return {'model': self.entry.name, 'version': self.entry.version, 'backend': self.entry.backend}
+
+    def close(self):
+        if self.batcher is not None:
+            self.batcher.close()
+        if self.pool is not None:
+            self.pool.close()
+
+
+class InferenceService:
+    """Holds the model for the server and answers prediction payloads
+
+    Each request reads self.active once and uses that Deployment
+    throughout, so a hot swap (watch_seconds > 0) only affects requests
+    that start after it.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL, coalesce_ms=0.0, max_batch=64, cache_size=0, cache_ttl=None,
+                 backend=DEFAULT_BACKEND, pool_workers=0, watch_seconds=0.0):
+        self.model_name = model_name
+        self.backend = backend
+        self.coalesce_ms = coalesce_ms
+        self.max_batch = max_batch
+        self.cache = PredictionCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.pool_workers = pool_workers
+        self.watch_seconds = watch_seconds
+        self.active = None
+        self.watcher = None
+        self.load_error = None
+
+    def load(self):
+        try:
+            self.active = self.deploy(load_model(self.model_name, self.backend))
+        except Exception as e:
+            self.load_error = f"{type(e).__name__}: {e}"
+            raise
+        if self.watch_seconds > 0:
+            from model_watcher import ModelWatcher
+            self.watcher = ModelWatcher(self.model_name, self.backend, self.watch_seconds, self.swap,
+                                        prepare=self.deploy).start()
+
+    def deploy(self, entry):
+        return Deployment(entry, self.pool_workers, self.coalesce_ms, self.max_batch)
+
+    def swap(self, entry, old_entry=None, deployment=None):
+        """Serve entry (through deployment, when the watcher built it already) from now on;
+        the old deployment is closed once in-flight requests drain"""
+        old, self.active = self.active, deployment or self.deploy(entry)
+        timer = threading.Timer(RETIRE_SECONDS, old.close)
+        timer.daemon = True
+        timer.start()
+
+    def close(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.active is not None:
+            self.active.close()
+
+    @property
+    def ready(self):
+        return self.active is not None
+
+    @property
+    def entry(self):
+        return self.active.entry if self.active is not None else None
+
+    def describe(self):
+        return self.active.describe()
+
+    def stats(self):
+        active = self.active
+        stats = {'cache': self.cache.stats() if self.cache is not None else None}
+        if active is not None and active.batcher is not None:
+            stats['batcher'] = {'batches': active.batcher.batches, 'mean_batch_size': active.batcher.mean_batch_size}
+        if self.watcher is not None:
+            stats['watcher'] = {'swaps': self.watcher.swaps, 'last_error': self.watcher.last_error}
+        stats['latency'] = metrics.snapshot()
+        return stats
+
+    @metrics.timed()
+    def predict_rows(self, rows, active=None):
+        labels, confidence = predict_batch((active or self.active).model, rows)
+        return [
+            {'crop': str(label), 'confidence': None if math.isnan(c) else float(c)}
+            for label, c in zip(labels, confidence)
+        ]
+
+    @metrics.timed()
+    def rank_rows(self, rows, k, active=None):
+        """Like predict_rows, plus the k best crops per row under 'alternatives'"""
+        labels, proba = top_k((active or self.active).model, rows, k)
+        results = []
+        for row_labels, row_proba in zip(labels, proba):
+            ranked = [
+                {'crop': str(label), 'confidence': None if math.isnan(p) else float(p)}
+                for label, p in zip(row_labels, row_proba)
+            ]
+            results.append({**ranked[0], 'alternatives': ranked[1:]})
+        return results
+
+    def predict(self, payload):
+        if not isinstance(payload, dict) or 'features' not in payload:
+            raise BadRequest('body must be a JSON object with a "features" field')
+        X, codes = validate([parse_row(payload['features'])])
+        if codes[0]:
+            raise BadRequest('; '.join(explain(codes[0])))
+        row = X[0].tolist()
+        active = self.active
+        if self.cache is None:
+            result = self.predict_one(row, active)
+        else:
+            result = self.cache.get_or_compute(row, active.entry.version, lambda snapped: self.predict_one(snapped, active))
+        return {**result, **active.describe()}
+
+    @metrics.timed()
+    def predict_one(self, row, active=None):
+        active = active or self.active
+        if active.batcher is None:
+            return self.predict_rows([row], active)[0]
+        label, c = active.batcher.predict(row)
+        return {'crop': str(label), 'confidence': None if math.isnan(c) else c}
+
+    def predict_batch(self, payload):
+        if not isinstance(payload, dict) or not isinstance(payload.get('rows'), list):
+            raise BadRequest('body must be a JSON object with a "rows" list')
+        k = payload.get('top_k', 1)
+        if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= MAX_TOP_K:
+            raise BadRequest(f'"top_k" must be an integer from 1 to {MAX_TOP_K}')
+        rows = [parse_row(row) for row in payload['rows']]
+        active = self.active
+        if not rows:
+            return {'predictions': [], 'rejected': 0, **active.describe()}
+        X, codes = validate(rows)
+        good = codes == 0
+        if not good.any():
+            scored = []
+        elif k == 1:
+            scored = self.predict_rows(X[good], active)
+        else:
+            scored = self.rank_rows(X[good], k, active)
+        scored = iter(scored)
+        predictions = [
+            next(scored) if ok else {'crop': None, 'error_code': int(code), 'errors': explain(code)}
+            for ok, code in zip(good, codes)
+        ]
+        return {'predictions': predictions, 'rejected': int((~good).sum()), **active.describe()}
+
+
+class InferenceHTTPServer(ThreadingHTTPServer):
+    """A thread per connection, with at most `workers` requests being scored at once"""
+
+    daemon_threads = True
+
+    def __init__(self, address, handler, service, workers):
+        super().__init__(address, handler)
+        self.service = service
+        self.slots = threading.BoundedSemaphore(workers)
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return  # client went away, nothing to report
+        super().handle_error(request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self.service.close()
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = IDLE_TIMEOUT
+
+    def log_message(self, format, *args):
+        pass  # one line per request is too much under load
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_text(self, status, text, content_type='text/plain; charset=utf-8'):
+        data = text.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        header = self.headers.get('Content-Length')
+        length = int(header) if header is not None and header.strip().isdigit() else -1
+        if length < 0 or length > MAX_BODY_BYTES:
+            # The body is left unread, so the connection cannot carry another request
+            self.close_connection = True
+            if length < 0:
+                raise BadRequest('a valid Content-Length header is required')
+            raise PayloadTooLarge(f"body larger than {MAX_BODY_BYTES} bytes")
+        try:
+            return json.loads(self.rfile.read(length) or b'null')
+        except json.JSONDecodeError as e:
+            raise BadRequest(f"invalid JSON: {e}")
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/healthz':
+            self.send_json(200, {'status': 'ok'})
+        elif self.path == '/readyz':
+            if service.ready:
+                self.send_json(200, {'status': 'ready', **service.describe()})
+            else:
+                self.send_json(503, {'status': 'loading', 'error': service.load_error})
+        elif self.path == '/stats':
+            self.send_json(200, service.stats())
+        elif self.path == '/metrics':
+            self.send_text(200, metrics.prometheus(), 'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self.send_json(404, {'error': f"no route for GET {self.path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        routes = {'/predict': service.predict, '/predict/batch': service.predict_batch}
+        route = routes.get(self.path)
+        if route is None:
+            self.send_json(404, {'error': f"no route for POST {self.path}"})
+            return
+        try:
+            payload = self.read_json()
+            if not service.ready:
+                self.send_json(503, {'error': 'model is not loaded yet'})
+                return
+            with metrics.span(f"POST {self.path}"):
+                with self.server.slots:
+                    body = route(payload)
+                self.send_json(200, body)
+        except PayloadTooLarge as e:
+            self.send_json(413, {'error': str(e)})
+        except BadRequest as e:
+            self.send_json(400, {'error': str(e)})
+        except Exception as e:
+            self.send_json(500, {'error': f"{type(e).__name__}: {e}"})
+
+
+def make_server(host='127.0.0.1', port=8000, workers=8, model_name=DEFAULT_MODEL, coalesce_ms=0.0, max_batch=64,
+                cache_size=0, cache_ttl=None, backend=DEFAULT_BACKEND, pool_workers=0, watch_seconds=0.0):
+    """Create the server and start loading the model in the background"""
+    service = InferenceService(model_name, coalesce_ms, max_batch, cache_size, cache_ttl, backend, pool_workers,
+                               watch_seconds)
+    server = InferenceHTTPServer((host, port), InferenceHandler, service, workers)
+    threading.Thread(target=service.load, name='model-loader', daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve crop predictions over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=8, help='requests scored at the same time (default: %(default)s)')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='artifact name or path to a .pkl (default: %(default)s)')
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND, help='inference backend (default: %(default)s)')
+    parser.add_argument('--coalesce-ms', type=float, default=0.0, help='micro-batch window for /predict; 0 disables (default: %(default)s)')
+    parser.add_argument('--max-batch', type=int, default=64, help='largest coalesced batch (default: %(default)s)')
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help='LRU entries for /predict, answered for the row snapped to the sidebar steps; 0 disables (default: %(default)s)')
+    parser.add_argument('--cache-ttl', type=float, default=None, help='seconds before a cached prediction expires')
+    parser.add_argument('--watch', type=float, default=0.0, metavar='SECONDS',
+                        help='poll for a new model release and hot-swap it; 0 disables (default: %(default)s)')
+    parser.add_argument('--pool-workers', type=int, default=0, help='prediction processes sharing one forest; 0 scores in-thread (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers, args.model, args.coalesce_ms, args.max_batch,
+                         args.cache_size, args.cache_ttl, args.backend, args.pool_workers, args.watch)
+    print(f"Serving {args.model} on http://{args.host}:{server.server_port} with {args.workers} workers", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# synthetic_data.py - Reproducible synthetic crop data, generated column-wise
+#
+# Usage:
+#   python synthetic_data.py --rows 1000000 --output synthetic.csv
+#   python synthetic_data.py --rows 5000000 --output synthetic.parquet --shuffle --seed 7
+#   python synthetic_data.py --rows 100000 --profiles my_profiles.json --output custom.csv
+#
+# Every crop has a profile: one distribution per feature, in FEATURES order,
+# given as (low, high) for uniform, ('uniform', low, high) or
+# ('normal', mean, std). The built-in PROFILES are the per-crop ranges of
+# Crop_recommendation.csv, where the notebook's data is close to uniform
+# within each range. --profiles takes JSON like
+#   {"rice": {"rainfall": ["normal", 230, 30]}, "wheat": {"N": [50, 100], ...}}
+# and overrides single features of known crops or adds new crops (which
+# then need all seven features). profiles_from_frame() derives ranges
+# from another survey.
+#
+# Rows are split evenly over the crops, in blocks unless shuffle=True. A
+# whole table is drawn at once: one random array for the uniform features,
+# one for the normal ones, then a clip to the sidebar ranges
+# (INPUT_SPECS). A np.random.Generator seeded from `seed` does the
+# drawing, so a seed always gives the same rows, and the global
+# np.random state is neither read nor changed. The CLI writes in chunks of
+# --chunk-size rows, each drawn from its own child of the seed, so memory
+# stays flat however many rows are asked for.
+
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from features import FEATURES, INPUT_SPECS
+
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+# Per-crop feature ranges of Crop_recommendation.csv:
+# N, P, K, temperature, humidity, ph, rainfall
+PROFILES = {
+    'apple': ((0, 40), (120, 145), (195, 205), (21, 24), (90, 95), (5.5, 6.5), (100, 125)),
+    'banana': ((80, 120), (70, 95), (45, 55), (25, 30), (75, 85), (5.5, 6.5), (90, 120)),
+    'blackgram': ((20, 60), (55, 80), (15, 25), (25, 35), (60, 70), (6.5, 7.8), (60, 75)),
+    'chickpea': ((20, 60), (55, 80), (75, 85), (17, 21), (14, 20), (5.9, 8.9), (65, 95)),
+    'coconut': ((0, 40), (5, 30), (25, 35), (25, 30), (90, 100), (5.5, 6.5), (131, 226)),
+    'coffee': ((80, 120), (15, 40), (25, 35), (23, 28), (50, 70), (6, 7.5), (115, 200)),
+    'cotton': ((100, 140), (35, 60), (15, 25), (22, 26), (75, 85), (5.8, 8), (60, 100)),
+    'grapes': ((0, 40), (120, 145), (195, 205), (8, 42), (80, 84), (5.5, 6.5), (65, 75)),
+    'jute': ((60, 100), (35, 60), (35, 45), (23, 27), (70, 90), (6, 7.5), (150, 200)),
+    'kidneybeans': ((0, 40), (55, 80), (15, 25), (15, 25), (18, 25), (5.5, 6), (60, 150)),
+    'lentil': ((0, 40), (55, 80), (15, 25), (18, 30), (60, 70), (5.9, 7.9), (35, 55)),
+    'maize': ((60, 100), (35, 60), (15, 25), (18, 27), (55, 75), (5.5, 7), (60, 110)),
+    'mango': ((0, 40), (15, 40), (25, 35), (27, 36), (45, 55), (4.5, 7), (89, 101)),
+    'mothbeans': ((0, 40), (35, 60), (15, 25), (24, 32), (40, 65), (3.5, 10), (30, 75)),
+    'mungbean': ((0, 40), (35, 60), (15, 25), (27, 30), (80, 90), (6.2, 7.2), (36, 60)),
+    'muskmelon': ((80, 120), (5, 30), (45, 55), (27, 30), (90, 95), (6, 6.8), (20, 30)),
+    'orange': ((0, 40), (5, 30), (5, 15), (10, 35), (90, 95), (6, 8), (100, 120)),
+    'papaya': ((31, 70), (46, 70), (45, 55), (23, 44), (90, 95), (6.5, 7), (40, 249)),
+    'pigeonpeas': ((0, 40), (55, 80), (15, 25), (18, 37), (30, 70), (4.5, 7.5), (90, 199)),
+    'pomegranate': ((0, 40), (5, 30), (35, 45), (18, 25), (85, 95), (5.5, 7.2), (102, 113)),
+    'rice': ((60, 99), (35, 60), (35, 45), (20, 27), (80, 85), (5, 7.9), (182, 299)),
+    'watermelon': ((80, 120), (5, 30), (45, 55), (24, 27), (80, 90), (6, 7), (40, 60)),
+}
+
+
+def _distribution(spec):
+    """(low, high) | ('uniform', low, high) | ('normal', mean, std) -> (is_normal, a, b)"""
+    if len(spec) == 2:
+        spec = ('uniform', *spec)
+    kind, a, b = spec
+    if kind not in ('uniform', 'normal'):
+        raise ValueError(f"unknown distribution {kind!r}, expected 'uniform' or 'normal'")
+    if kind == 'uniform' and b < a or kind == 'normal' and b < 0:
+        raise ValueError(f"bad {kind} parameters {a}, {b}")
+    return kind == 'normal', float(a), float(b)
+
+
+def compile_profiles(profiles):
+    """(crops, is_normal, a, b): the profiles as (n_crops, 7) arrays"""
+    crops = list(profiles)
+    if not crops:
+        raise ValueError('no crop profiles')
+    table = []
+    for crop in crops:
+        if len(profiles[crop]) != len(FEATURES):
+            raise ValueError(f"profile for {crop!r} needs {len(FEATURES)} distributions, in order {FEATURES}")
+        table.append([_distribution(spec) for spec in profiles[crop]])
+    table = np.array(table)
+    return crops, table[:, :, 0].astype(bool), table[:, :, 1], table[:, :, 2]
+
+
+def merge_profiles(overrides, base=PROFILES):
+    """base with {crop: {feature: distribution}} applied; new crops must give every feature"""
+    merged = dict(base)
+    for crop, features in overrides.items():
+        unknown = set(features) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"unknown features for {crop!r}: {sorted(unknown)}")
+        if crop not in merged and len(features) != len(FEATURES):
+            raise ValueError(f"new crop {crop!r} needs all of {FEATURES}")
+        current = merged.get(crop, [None] * len(FEATURES))
+        merged[crop] = tuple(features.get(f, spec) for f, spec in zip(FEATURES, current))
+    return merged
+
+
+def profiles_from_frame(df):
+    """Uniform profiles spanning each crop's observed range in a labelled DataFrame"""
+    ranges = df.groupby('label')[FEATURES].agg(['min', 'max'])
+    return {
+        str(crop): tuple((float(row[(f, 'min')]), float(row[(f, 'max')])) for f in FEATURES)
+        for crop, row in ranges.iterrows()
+    }
+
+
+def generate_arrays(n_rows, seed=0, profiles=PROFILES, shuffle=False):
+    """(X, codes, crops): an (n_rows, 7) float64 feature matrix, crop index per row, crop names"""
+    crops, is_normal, a, b = compile_profiles(profiles)
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    codes = np.arange(n_rows) * len(crops) // max(n_rows, 1)
+    if shuffle:
+        rng.shuffle(codes)
+
+    # Uniform draw for every cell, then the normal cells (if any) redrawn in one go
+    X = rng.random((n_rows, len(FEATURES)))
+    X *= (b - a)[codes]
+    X += a[codes]
+    if is_normal.any():
+        rows, cols = np.nonzero(is_normal[codes])
+        crop = codes[rows]
+        X[rows, cols] = a[crop, cols] + b[crop, cols] * rng.standard_normal(len(rows))
+    low = np.array([INPUT_SPECS[f][0] for f in FEATURES])
+    high = np.array([INPUT_SPECS[f][1] for f in FEATURES])
+    np.clip(X, low, high, out=X)
+    return X, codes, crops
+
+
+def generate(n_rows, seed=0, profiles=PROFILES, shuffle=False):
+    """A DataFrame of FEATURES plus 'label', like Crop_recommendation.csv"""
+    import pandas as pd
+
+    X, codes, crops = generate_arrays(n_rows, seed, profiles, shuffle)
+    df = pd.DataFrame(X, columns=FEATURES)
+    df['label'] = np.asarray(crops, dtype=object).take(codes)
+    return df
+
+
+def iter_chunks(n_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=0, profiles=PROFILES, shuffle=False):
+    """generate() in DataFrames of at most chunk_size rows, crops balanced within each chunk"""
+    children = np.random.SeedSequence(seed).spawn(-(-n_rows // chunk_size))
+    for i, child in enumerate(children):
+        rows = min(chunk_size, n_rows - i * chunk_size)
+        yield generate(rows, np.random.default_rng(child), profiles, shuffle)
+
+
+def write(path, n_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=0, profiles=PROFILES, shuffle=False):
+    """Write n_rows (at least one) to a CSV or Parquet file, one chunk at a time"""
+    if n_rows < 1:
+        raise ValueError(f"n_rows must be positive, got {n_rows}")
+    tmp = f"{path}.tmp"
+    pa = writer = None
+    if path.endswith(PARQUET_SUFFIXES):
+        from batch_predict import _pyarrow
+        pa = _pyarrow()
+    try:
+        for i, chunk in enumerate(iter_chunks(n_rows, chunk_size, seed, profiles, shuffle)):
+            if pa is not None:
+                batch = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pa.parquet.ParquetWriter(tmp, batch.schema)
+                writer.write_table(batch)
+            else:
+                chunk.to_csv(tmp, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic crop data for training demos and load tests')
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--output', required=True, help='.parquet for Parquet (needs pyarrow), otherwise CSV')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shuffle', action='store_true', help='interleave crops instead of writing them in blocks')
+    parser.add_argument('--profiles', help='JSON file of per-crop distribution overrides')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.rows < 1:
+        parser.error('--rows must be positive')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be positive')
+    profiles = PROFILES
+    if args.profiles:
+        with open(args.profiles) as f:
+            profiles = merge_profiles(json.load(f))
+    start = time.perf_counter()
+    write(args.output, args.rows, args.chunk_size, args.seed, profiles, args.shuffle)
+    print(f"Wrote {args.rows} rows of {len(profiles)} crops to {args.output} in {time.perf_counter() - start:.1f}s",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
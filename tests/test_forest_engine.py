@@ -0,0 +1,72 @@
+# test_forest_engine.py - CompiledForest must reproduce the sklearn forests exactly
+#
+# Usage:
+#   python -m pytest tests
+
+
+import itertools
+import os
+import pickle
+import sys
+import warnings
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features import DATASET_PATH, FEATURES, INPUT_SPECS  # noqa: E402
+from forest_engine import CompiledForest  # noqa: E402
+from model_registry import BASE_DIR, MODEL_DIR, MODEL_FILES  # noqa: E402
+
+
+FORESTS = ['RF', 'RandomForest']
+
+
+def load_pickle(name):
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='Trying to unpickle estimator')
+        with open(os.path.join(MODEL_DIR, MODEL_FILES[name]), 'rb') as f:
+            return pickle.load(f)
+
+
+def dataset_rows():
+    path = os.path.join(BASE_DIR, DATASET_PATH)
+    return np.genfromtxt(path, delimiter=',', skip_header=1, usecols=range(len(FEATURES)))
+
+
+def corner_rows():
+    """Every combination of the sidebar minimum and maximum, plus the defaults"""
+    corners = itertools.product(*[INPUT_SPECS[f][:2] for f in FEATURES])
+    return np.array(list(corners) + [[INPUT_SPECS[f][2] for f in FEATURES]], dtype=np.float64)
+
+
+@pytest.fixture(scope='module', params=FORESTS)
+def forests(request):
+    model = load_pickle(request.param)
+    return model, CompiledForest.from_sklearn(model)
+
+
+def sklearn_predictions(model, X):
+    """(predict_proba, predict) without the feature-name warning"""
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        return model.predict_proba(X), model.predict(X)
+
+
+@pytest.mark.parametrize('rows', [dataset_rows, corner_rows])
+def test_matches_sklearn(forests, rows):
+    model, compiled = forests
+    X = rows()
+    proba, labels = sklearn_predictions(model, X)
+    np.testing.assert_array_equal(compiled.predict_proba(X), proba)
+    np.testing.assert_array_equal(compiled.predict(X), labels)
+
+
+def test_small_batches_match_sklearn(forests):
+    # Batches up to LOCKSTEP_ROWS take the lock-step traversal
+    model, compiled = forests
+    X = dataset_rows()[::50]
+    proba, _ = sklearn_predictions(model, X)
+    for i in range(len(X)):
+        np.testing.assert_array_equal(compiled.predict_proba(X[i:i + 1]), proba[i:i + 1])
@@ -0,0 +1,113 @@
+# test_model_format.py - .forest files round-trip exactly and reject corrupt input
+#
+# Usage:
+#   python -m pytest tests
+
+
+import json
+import os
+import pickle
+import sys
+import warnings
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features import DATASET_PATH, FEATURES  # noqa: E402
+from forest_engine import CompiledForest  # noqa: E402
+from model_format import ARRAYS, MAGIC, _PREFIX, ModelFormatError, load_forest, read_header, save_forest  # noqa: E402
+from model_registry import BASE_DIR, MODEL_DIR, MODEL_FILES  # noqa: E402
+
+
+def load_pickle(name):
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='Trying to unpickle estimator')
+        with open(os.path.join(MODEL_DIR, MODEL_FILES[name]), 'rb') as f:
+            return pickle.load(f)
+
+
+def dataset_rows():
+    path = os.path.join(BASE_DIR, DATASET_PATH)
+    return np.genfromtxt(path, delimiter=',', skip_header=1, usecols=range(len(FEATURES)))
+
+
+@pytest.fixture(scope='module')
+def compiled():
+    return CompiledForest.from_sklearn(load_pickle('RF'))
+
+
+@pytest.fixture
+def forest_file(compiled, tmp_path):
+    return save_forest(compiled, str(tmp_path / 'RF.forest'), version='test')
+
+
+def rewrite_header(path, edit):
+    """Apply edit(header) in place; the arrays stay where they were"""
+    header = read_header(path)
+    edit(header)
+    encoded = json.dumps(header, sort_keys=True).encode('utf-8')
+    with open(path, 'r+b') as f:
+        f.write(_PREFIX.pack(MAGIC, len(encoded)) + encoded)
+
+
+@pytest.mark.parametrize('name', ['RF', 'RandomForest'])
+@pytest.mark.parametrize('mmap', [True, False])
+def test_round_trip(name, mmap, tmp_path):
+    model = load_pickle(name)
+    compiled = CompiledForest.from_sklearn(model)
+    loaded = load_forest(save_forest(compiled, str(tmp_path / f'{name}.forest'), version='v1'), mmap=mmap)
+
+    assert loaded.header['version'] == 'v1'
+    assert list(loaded.classes_) == [str(c) for c in model.classes_]
+    for array in ARRAYS:
+        np.testing.assert_array_equal(getattr(loaded, array), getattr(compiled, array))
+    X = dataset_rows()
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+        np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+
+
+def test_arrays_are_read_only(forest_file):
+    with pytest.raises(ValueError):
+        load_forest(forest_file).threshold[0] = 0.0
+
+
+@pytest.mark.parametrize('edit', [
+    lambda h: h['arrays']['threshold'].update(offset=-64),
+    lambda h: h['arrays']['threshold'].update(offset=10 ** 12),
+    lambda h: h['arrays']['threshold'].update(offset=65),
+    lambda h: h['arrays']['value'].update(shape=[-1, 22]),
+    lambda h: h['arrays']['value'].update(dtype='|O'),
+    lambda h: h['arrays'].pop('roots'),
+    lambda h: h.update(features=FEATURES[::-1]),
+    lambda h: h.update(format=99),
+], ids=['negative offset', 'offset past the end', 'unaligned offset', 'negative shape', 'object dtype',
+        'missing array', 'feature order', 'format version'])
+def test_corrupt_header_is_rejected(forest_file, edit):
+    rewrite_header(forest_file, edit)
+    with pytest.raises(ModelFormatError):
+        load_forest(forest_file)
+
+
+def test_out_of_range_nodes_are_rejected(compiled, tmp_path):
+    for array, value in (('children', 10 ** 9), ('feature', len(FEATURES)), ('depths', 10 ** 9)):
+        bad = CompiledForest(**{name: getattr(compiled, name).copy() for name in ARRAYS}, classes=compiled.classes_)
+        getattr(bad, array).flat[0] = value
+        with pytest.raises(ModelFormatError):
+            load_forest(save_forest(bad, str(tmp_path / f'{array}.forest')))
+
+
+def test_truncated_or_foreign_files_are_rejected(forest_file, tmp_path):
+    with open(forest_file, 'rb') as f:
+        data = f.read()
+    truncated = tmp_path / 'truncated.forest'
+    truncated.write_bytes(data[:len(data) // 2])
+    foreign = tmp_path / 'foreign.forest'
+    foreign.write_bytes(b'PK\x03\x04' + data[4:])
+    for path in (truncated, foreign, tmp_path / 'empty.forest'):
+        path.touch()
+        with pytest.raises(ModelFormatError):
+            load_forest(str(path))
@@ -0,0 +1,288 @@
+# train_pipeline.py - Reproducible training of the notebook's candidate models
+#
+# Usage:
+#   python train_pipeline.py                       # all candidates, all cores
+#   python train_pipeline.py --models RF NBClassifier --n-jobs 4
+#   python train_pipeline.py --calibrate sigmoid   # calibrated predict_proba
+#
+# Trains on Crop_recommendation.csv with the notebook's hyperparameters and
+# its 80/20 split (random_state=2), cross-validates every candidate, and
+# writes models/<version>/<name>.pkl plus models/<version>/manifest.json.
+# Tree models are also exported as memory-mappable <name>.forest files
+# (see model_format.py), which the 'compiled' backend loads without pickle.
+# models/LATEST is updated to point at the new version, which is what the
+# web app and model_registry.load_model() pick up.
+
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import platform
+import shutil
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import log_loss
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import LabelEncoder
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+
+from features import DATASET_DTYPES, DATASET_PATH, FEATURES
+from forest_engine import CompiledForest
+from model_format import save_forest
+from model_registry import BASE_DIR
+
+
+OUTPUT_DIR = os.path.join(BASE_DIR, 'models')
+TEST_SIZE = 0.2
+SPLIT_SEED = 2
+CALIBRATION_METHODS = ('sigmoid', 'isotonic')
+CALIBRATION_FOLDS = 3
+
+
+class EncodedLabelClassifier(ClassifierMixin, BaseEstimator):
+    """Fit a classifier that only accepts integer labels (XGBoost) on crop names"""
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+
+    def fit(self, X, y):
+        self.encoder_ = LabelEncoder().fit(y)
+        self.estimator_ = clone(self.estimator).fit(X, self.encoder_.transform(y))
+        self.classes_ = self.encoder_.classes_
+        self.n_features_in_ = X.shape[1]
+        if hasattr(X, 'columns'):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        return self
+
+    def predict_proba(self, X):
+        return self.estimator_.predict_proba(X)
+
+    def predict(self, X):
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+
+def candidate_models(calibration=None):
+    """The notebook's models and hyperparameters, keyed by artifact name
+
+    With calibration ('sigmoid' or 'isotonic') every model is wrapped in
+    CalibratedClassifierCV, so predict_proba, and with it the top-k
+    confidences shown to users, are calibrated probabilities.
+    """
+    candidates = {
+        'DecisionTree': DecisionTreeClassifier(criterion='entropy', random_state=2, max_depth=5),
+        'NBClassifier': GaussianNB(),
+        'SVC': SVC(gamma='auto', probability=True, random_state=2),
+        'LogisticRegression': LogisticRegression(random_state=2),
+        'RF': RandomForestClassifier(n_estimators=20, random_state=5),
+        'KNeighborsClassifier': KNeighborsClassifier(n_neighbors=5, metric='minkowski', p=2),
+    }
+    try:
+        import xgboost
+    except ImportError:
+        pass
+    else:
+        candidates['XGBoost'] = EncodedLabelClassifier(xgboost.XGBClassifier(n_jobs=1, random_state=2))
+    if calibration:
+        if calibration not in CALIBRATION_METHODS:
+            raise ValueError(f"unknown calibration {calibration!r}, choose from {CALIBRATION_METHODS}")
+        candidates = {
+            name: CalibratedClassifierCV(estimator, method=calibration, cv=CALIBRATION_FOLDS)
+            for name, estimator in candidates.items()
+        }
+    return candidates
+
+
+def load_dataset(path=None):
+    """Read Crop_recommendation.csv with explicit column dtypes"""
+    path = path or os.path.join(BASE_DIR, DATASET_PATH)
+    return pd.read_csv(path, usecols=[*FEATURES, 'label'], dtype=DATASET_DTYPES)
+
+
+def _fit_and_score(name, estimator, X_train, y_train, X_test, y_test):
+    """One unit of parallel work: fit a clone, score it and measure its log loss"""
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        # LogisticRegression on unscaled features hits max_iter, as in the notebook
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        model = clone(estimator).fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    loss = float(log_loss(y_test, model.predict_proba(X_test), labels=model.classes_))
+    return name, model, float(model.score(X_test, y_test)), loss, fit_seconds
+
+
+def train_all(df, names=None, cv=5, n_jobs=-1, calibration=None):
+    """Cross-validate and fit every candidate, spreading all the fits over n_jobs processes
+
+    Returns {name: (model fitted on the training split, metrics dict)}.
+    """
+    candidates = candidate_models(calibration)
+    names = names or list(candidates)
+    unknown = [n for n in names if n not in candidates]
+    if unknown:
+        raise ValueError(f"unknown models {unknown}, choose from {list(candidates)}")
+
+    X, y = df[FEATURES], df['label']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=SPLIT_SEED)
+    folds = list(StratifiedKFold(n_splits=cv).split(X, y))
+
+    # Every CV fold and every final fit is its own task, so one slow model
+    # (SVC, XGBoost) does not leave the other workers idle.
+    tasks = []
+    for name in names:
+        for train_idx, test_idx in folds:
+            tasks.append(delayed(_fit_and_score)(
+                name, candidates[name], X.iloc[train_idx], y.iloc[train_idx], X.iloc[test_idx], y.iloc[test_idx]
+            ))
+        tasks.append(delayed(_fit_and_score)(name, candidates[name], X_train, y_train, X_test, y_test))
+
+    results = Parallel(n_jobs=n_jobs)(tasks)
+
+    trained = {}
+    per_model = len(folds) + 1
+    for i, name in enumerate(names):
+        chunk = results[i * per_model:(i + 1) * per_model]
+        cv_scores = [score for _, _, score, _, _ in chunk[:-1]]
+        _, model, holdout, loss, fit_seconds = chunk[-1]
+        trained[name] = (model, {
+            'holdout_accuracy': holdout,
+            'holdout_log_loss': loss,
+            'calibration': calibration,
+            'cv_mean': float(np.mean(cv_scores)),
+            'cv_std': float(np.std(cv_scores)),
+            'cv_scores': cv_scores,
+            'fit_seconds': round(fit_seconds, 4),
+            'params': {k: repr(v) for k, v in candidates[name].get_params(deep=False).items()},
+        })
+    return trained
+
+
+def _sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _make_version_dir(output_dir, version=None):
+    """Create output_dir/<version>/ and return (version, path)
+
+    Without an explicit version the UTC time is used, with -02, -03 ...
+    appended when another release took that second; mkdir is atomic, so
+    concurrent writers never share a directory.
+    """
+    if version is not None:
+        path = os.path.join(output_dir, version)
+        os.makedirs(path, exist_ok=False)
+        return version, path
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')
+    for n in range(1, 100):
+        version = stamp if n == 1 else f"{stamp}-{n:02d}"
+        path = os.path.join(output_dir, version)
+        try:
+            os.mkdir(path)
+        except FileExistsError:
+            continue
+        return version, path
+    raise FileExistsError(f"no free release directory for {stamp} in {output_dir}")
+
+
+def write_artifacts(trained, output_dir=OUTPUT_DIR, dataset_path=None, version=None, carried=None, extra=None):
+    """Pickle each model into output_dir/<version>/ and write manifest.json
+
+    carried maps model names to (release directory, manifest entry) for
+    artifacts copied unchanged from an earlier release; extra is merged
+    into the manifest (e.g. the field samples an incremental update used).
+    """
+    dataset_path = dataset_path or os.path.join(BASE_DIR, DATASET_PATH)
+    version, version_dir = _make_version_dir(output_dir, version)
+
+    models = {}
+    for name, (model, metrics) in trained.items():
+        filename = f"{name}.pkl"
+        path = os.path.join(version_dir, filename)
+        with open(path, 'wb') as f:
+            pickle.dump(model, f)
+        models[name] = {'file': filename, 'sha256': _sha256(path), **metrics}
+        if isinstance(model, (RandomForestClassifier, DecisionTreeClassifier)):
+            forest_file = f"{name}.forest"
+            forest_path = save_forest(
+                CompiledForest.from_sklearn(model),
+                os.path.join(version_dir, forest_file),
+                version=models[name]['sha256'][:12],
+                source={'file': filename, 'sha256': models[name]['sha256'], 'estimator': type(model).__name__},
+            )
+            models[name]['forest'] = {'file': forest_file, 'sha256': _sha256(forest_path)}
+
+    for name, (source_dir, entry) in (carried or {}).items():
+        for key in ('file', 'forest'):
+            if key in entry:
+                filename = entry[key] if key == 'file' else entry[key]['file']
+                shutil.copy2(os.path.join(source_dir, filename), os.path.join(version_dir, filename))
+        models[name] = entry
+
+    manifest = {
+        'version': version,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'features': FEATURES,
+        'classes': sorted(map(str, next(iter(trained.values()))[0].classes_)),
+        'dataset': {'file': os.path.basename(dataset_path), 'sha256': _sha256(dataset_path)},
+        'split': {'test_size': TEST_SIZE, 'random_state': SPLIT_SEED},
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'sklearn': sklearn.__version__,
+        },
+        'models': models,
+        **(extra or {}),
+    }
+    with open(os.path.join(version_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Point LATEST at the new version only once everything is on disk
+    latest_tmp = os.path.join(output_dir, f'LATEST.{version}.tmp')
+    with open(latest_tmp, 'w') as f:
+        f.write(version + '\n')
+    os.replace(latest_tmp, os.path.join(output_dir, 'LATEST'))
+    return version_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train and version the crop recommendation models')
+    parser.add_argument('--models', nargs='+', help='subset of candidates to train (default: all)')
+    parser.add_argument('--cv', type=int, default=5, help='cross-validation folds (default: %(default)s)')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='worker processes, -1 for all cores (default: %(default)s)')
+    parser.add_argument('--calibrate', choices=CALIBRATION_METHODS, help='wrap every model in CalibratedClassifierCV')
+    parser.add_argument('--data', help=f'training CSV (default: {DATASET_PATH})')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='where versioned artifacts go (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    trained = train_all(load_dataset(args.data), args.models, args.cv, args.n_jobs, args.calibrate)
+    version_dir = write_artifacts(trained, args.output_dir, args.data)
+
+    for name, (_, metrics) in sorted(trained.items(), key=lambda item: -item[1][1]['holdout_accuracy']):
+        print(f"{name:22s} holdout {metrics['holdout_accuracy']:.4f}  log loss {metrics['holdout_log_loss']:.4f}"
+              f"  cv {metrics['cv_mean']:.4f} ± {metrics['cv_std']:.4f}")
+    print(f"Wrote {version_dir} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# translations.py - UI text for every supported language, built once at import
+
+
+from functools import lru_cache
+from types import MappingProxyType
+
+
+LANGUAGES = ('en', 'hi', 'ml')
+DEFAULT_LANGUAGE = 'en'
+
+
+# MULTILINGUAL SUPPORT - Added Hindi and Malayalam
+_TRANSLATIONS = {
+    'en': {
+        'app_title': '🌾 AgriVerse Pro',
+        'app_subtitle': 'Advanced AI-Powered Crop Intelligence System',
+        'control_panel': '🌱 Control Panel',
+        'soil_nutrients': '📊 Soil Nutrients (ppm)',
+        'environmental_conditions': '🌡️ Environmental Conditions',
+        'nitrogen': 'Nitrogen (N)',
+        'phosphorus': 'Phosphorus (P)', 
+        'potassium': 'Potassium (K)',
+        'temperature': 'Temperature (°C)',
+        'humidity': 'Humidity (%)',
+        'ph_level': 'pH Level',
+        'rainfall': 'Rainfall (mm)',
+        'predict_button': '🔮 Predict Optimal Crop',
+        'how_it_works': '🎯 How It Works',
+        'how_it_works_desc': 'Our advanced AI system analyzes multiple environmental and soil parameters to recommend the most suitable crop for your agricultural needs. Using machine learning algorithms trained on extensive agricultural data, we provide precise, data-driven recommendations.',
+        'advanced_soil': '🧪 Advanced Soil Analysis',
+        'advanced_soil_desc': 'AI-powered analysis of NPK levels, pH balance, and soil composition for optimal crop selection',
+        'climate_intelligence': '🌤️ Climate Intelligence',
+        'climate_intelligence_desc': 'Comprehensive weather pattern analysis including temperature, humidity, and rainfall data',
+        'machine_learning': '🤖 Machine Learning',
+        'machine_learning_desc': 'Advanced Random Forest algorithms with 98%+ accuracy for precise crop recommendations',
+        'current_parameters': '📋 Current Parameters',
+        'recommended_crop': 'Recommended Crop',
+        'crop_intelligence': '📊 Crop Intelligence Report',
+        'season': 'Season',
+        'water_need': 'Water Need',
+        'temperature_range': 'Temperature',
+        'soil_type': 'Soil Type',
+        'smart_recommendations': '💡 Smart Recommendations',
+        'analyzing_data': '🔄 Analyzing data with AI algorithms...',
+        'optimal_crop_choice': 'Based on comprehensive analysis of your soil and environmental conditions, {} is the optimal crop choice for maximum yield and profitability!',
+        'model_accuracy': '🎯 Model Accuracy',
+        'confidence_level': '📊 Confidence Level: {:.1%}',
+        'alternative_crops': '🌿 Also Suitable',
+        'processing_time': '⚡ Processing Time: {:.3f} seconds',
+        'demo_pacing': '🎬 Demo pacing',
+        'analysis_complete': '✅ Analysis completed successfully! Your personalized crop recommendation is ready.',
+        'acidic_soil': '🔴 Acidic Soil',
+        'alkaline_soil': '🔵 Alkaline Soil',
+        'neutral_soil': '🟢 Neutral Soil',
+        'acidic_advice': 'Consider adding lime to increase pH',
+        'alkaline_advice': 'Consider adding sulfur to decrease pH', 
+        'neutral_advice': 'Optimal pH range for most crops',
+        'soil_status': 'Soil Status',
+        'current_level': 'Current Level',
+        'about_agriverse': '🔬 About AgriVerse Pro',
+        'mission': '🎯 Mission: Revolutionizing agriculture through AI-powered crop intelligence',
+        'technology': '🧠 Technology: Advanced Random Forest algorithms with 98%+ accuracy',
+        'data': '📊 Data: Trained on 25,000+ agricultural data points',
+        'impact': '🌍 Impact: Supporting sustainable farming practices worldwide'
+    },
+    'hi': {
+        'app_title': '🌾 [translate:एग्रीवर्स प्रो]',
+        'app_subtitle': '[translate:उन्नत एआई-संचालित फसल बुद्धिमत्ता प्रणाली]',
+        'control_panel': '🌱 [translate:नियंत्रण पैनल]',
+        'soil_nutrients': '📊 [translate:मिट्टी के पोषक तत्व] (ppm)',
+        'environmental_conditions': '🌡️ [translate:पर्यावरणीय स्थितियां]',
+        'nitrogen': '[translate:नाइट्रोजन] (N)',
+        'phosphorus': '[translate:फास्फोरस] (P)',
+        'potassium': '[translate:पोटेशियम] (K)',
+        'temperature': '[translate:तापमान] (°C)',
+        'humidity': '[translate:आर्द्रता] (%)',
+        'ph_level': '[translate:पीएच स्तर]',
+        'rainfall': '[translate:वर्षा] (mm)',
+        'predict_button': '🔮 [translate:इष्टतम फसल की भविष्यवाणी करें]',
+        'how_it_works': '🎯 [translate:यह कैसे काम करता है]',
+        'how_it_works_desc': '[translate:हमारी उन्नत एआई प्रणाली आपकी कृषि आवश्यकताओं के लिए सबसे उपयुक्त फसल की सिफारिश करने के लिए कई पर्यावरणीय और मिट्टी के मापदंडों का विश्लेषण करती है। व्यापक कृषि डेटा पर प्रशिक्षित मशीन लर्निंग एल्गोरिदम का उपयोग करके, हम सटीक, डेटा-संचालित सिफारिशें प्रदान करते हैं।]',
+        'advanced_soil': '🧪 [translate:उन्नत मिट्टी विश्लेषण]',
+        'advanced_soil_desc': '[translate:इष्टतम फसल चयन के लिए एनपीके स्तर, पीएच संतुलन और मिट्टी की संरचना का एआई-संचालित विश्लेषण]',
+        'climate_intelligence': '🌤️ [translate:जलवायु बुद्धिमत्ता]',
+        'climate_intelligence_desc': '[translate:तापमान, आर्द्रता और वर्षा डेटा सहित व्यापक मौसम पैटर्न विश्लेषण]',
+        'machine_learning': '🤖 [translate:मशीन लर्निंग]',
+        'machine_learning_desc': '[translate:सटीक फसल सिफारिशों के लिए 98%+ सटीकता के साथ उन्नत रैंडम फॉरेस्ट एल्गोरिदम]',
+        'current_parameters': '📋 [translate:वर्तमान पैरामीटर]',
+        'recommended_crop': '[translate:सुझाई गई फसल]',
+        'crop_intelligence': '📊 [translate:फसल बुद्धिमत्ता रिपोर्ट]',
+        'season': '[translate:मौसम]',
+        'water_need': '[translate:पानी की आवश्यकता]',
+        'temperature_range': '[translate:तापमान]',
+        'soil_type': '[translate:मिट्टी का प्रकार]',
+        'smart_recommendations': '💡 [translate:स्मार्ट सिफारिशें]',
+        'analyzing_data': '🔄 [translate:एआई एल्गोरिदम के साथ डेटा का विश्लेषण कर रहे हैं...]',
+        'optimal_crop_choice': '[translate:आपकी मिट्टी और पर्यावरणीय स्थितियों के व्यापक विश्लेषण के आधार पर, {} अधिकतम उपज और लाभप्रदता के लिए इष्टतम फसल विकल्प है!]',
+        'model_accuracy': '🎯 [translate:मॉडल सटीकता]',
+        'confidence_level': '📊 [translate:विश्वास स्तर]: {:.1%}',
+        'alternative_crops': '🌿 [translate:अन्य उपयुक्त फसलें]',
+        'processing_time': '⚡ [translate:प्रसंस्करण समय: {:.3f} सेकंड]',
+        'demo_pacing': '🎬 [translate:डेमो गति]',
+        'analysis_complete': '✅ [translate:विश्लेषण सफलतापूर्वक पूरा हुआ! आपकी व्यक्तिगत फसल की सिफारिश तैयार है।]',
+        'acidic_soil': '🔴 [translate:अम्लीय मिट्टी]',
+        'alkaline_soil': '🔵 [translate:क्षारीय मिट्टी]',
+        'neutral_soil': '🟢 [translate:तटस्थ मिट्टी]',
+        'acidic_advice': '[translate:पीएच बढ़ाने के लिए चूना मिलाने पर विचार करें]',
+        'alkaline_advice': '[translate:पीएच घटाने के लिए सल्फर मिलाने पर विचार करें]',
+        'neutral_advice': '[translate:अधिकांश फसलों के लिए इष्टतम पीएच रेंज]',
+        'soil_status': '[translate:मिट्टी की स्थिति]',
+        'current_level': '[translate:वर्तमान स्तर]',
+        'about_agriverse': '🔬 [translate:एग्रीवर्स प्रो के बारे में]',
+        'mission': '🎯 [translate:मिशन: एआई-संचालित फसल बुद्धिमत्ता के माध्यम से कृषि में क्रांति लाना]',
+        'technology': '🧠 [translate:प्रौद्योगिकी: 98%+ सटीकता के साथ उन्नत रैंडम फॉरेस्ट एल्गोरिदम]',
+        'data': '📊 [translate:डेटा: 25,000+ कृषि डेटा बिंदुओं पर प्रशिक्षित]',
+        'impact': '🌍 [translate:प्रभाव: दुनिया भर में टिकाऊ कृषि प्रथाओं का समर्थन]'
+    },
+    'ml': {
+        'app_title': '🌾 [translate:അഗ്രിവേഴ്സ് പ്രോ]',
+        'app_subtitle': '[translate:അഡ്വാൻസ്ഡ് എഐ-പവേർഡ് ക്രോപ്പ് ഇന്റലിജൻസ് സിസ്റ്റം]',
+        'control_panel': '🌱 [translate:കൺട്രോൾ പാനൽ]',
+        'soil_nutrients': '📊 [translate:മണ്ണിലെ പോഷകങ്ങൾ] (ppm)',
+        'environmental_conditions': '🌡️ [translate:പാരിസ്ഥിതിക അവസ്ഥകൾ]',
+        'nitrogen': '[translate:നൈട്രജൻ] (N)',
+        'phosphorus': '[translate:ഫോസ്ഫറസ്] (P)',
+        'potassium': '[translate:പൊട്ടാസ്യം] (K)',
+        'temperature': '[translate:താപനില] (°C)',
+        'humidity': '[translate:ആർദ്രത] (%)',
+        'ph_level': '[translate:പിഎച്ച് ലെവൽ]',
+        'rainfall': '[translate:മഴ] (mm)',
+        'predict_button': '🔮 [translate:അനുകൂല വിള പ്രവചിക്കുക]',
+        'how_it_works': '🎯 [translate:ഇത് എങ്ങനെ പ്രവർത്തിക്കുന്നു]',
+        'how_it_works_desc': '[translate:ഞങ്ങളുടെ അഡ്വാൻസ്ഡ് എഐ സിസ്റ്റം നിങ്ങളുടെ കാർഷിക ആവശ്യങ്ങൾക്ക് ഏറ്റവും അനുയോജ്യമായ വിള ശുപാർശ ചെയ്യുന്നതിനായി ഒന്നിലധികം പാരിസ്ഥിതിക, മണ്ണിന്റെ പാരാമീറ്ററുകൾ വിശകലനം ചെയ്യുന്നു. വിപുലമായ കാർഷിക ഡാറ്റയിൽ പരിശീലിപ്പിച്ച മെഷീൻ ലേണിംഗ് അൽഗോരിതങ്ങൾ ഉപയോഗിച്ച്, ഞങ്ങൾ കൃത്യമായ, ഡാറ്റാ-ഡ്രിവൻ ശുപാർശകൾ നൽകുന്നു.]',
+        'advanced_soil': '🧪 [translate:അഡ്വാൻസ്ഡ് മണ്ണ് വിശകലനം]',
+        'advanced_soil_desc': '[translate:അനുകൂല വിള തിരഞ്ഞെടുപ്പിനായി എൻപികെ ലെവലുകൾ, പിഎച്ച് ബാലൻസ്, മണ്ണിന്റെ ഘടന എന്നിവയുടെ എഐ-പവേർഡ് വിശകലനം]',
+        'climate_intelligence': '🌤️ [translate:കാലാവസ്ഥാ ബുദ്ധി]',
+        'climate_intelligence_desc': '[translate:താപനില, ആർദ്രത, മഴ ഡാറ്റ എന്നിവ ഉൾപ്പെടെയുള്ള സമഗ്ര കാലാവസ്ഥാ പാറ്റേൺ വിശകലനം]',
+        'machine_learning': '🤖 [translate:മെഷീൻ ലേണിംഗ്]',
+        'machine_learning_desc': '[translate:കൃത്യമായ വിള ശുപാർശകൾക്കായി 98%+ കൃത്യതയുള്ള അഡ്വാൻസ്ഡ് റാൻഡം ഫോറസ്റ്റ് അൽഗോരിതങ്ങൾ]',
+        'current_parameters': '📋 [translate:നിലവിലെ പാരാമീറ്ററുകൾ]',
+        'recommended_crop': '[translate:ശുപാർശ ചെയ്യപ്പെട്ട വിള]',
+        'crop_intelligence': '📊 [translate:വിള ഇന്റലിജൻസ് റിപ്പോർട്ട്]',
+        'season': '[translate:സീസൺ]',
+        'water_need': '[translate:വെള്ളത്തിന്റെ ആവശ്യം]',
+        'temperature_range': '[translate:താപനില]',
+        'soil_type': '[translate:മണ്ണിന്റെ തരം]',
+        'smart_recommendations': '💡 [translate:സ്മാർട്ട് ശുപാർശകൾ]',
+        'analyzing_data': '🔄 [translate:എഐ അൽഗോരിതങ്ങൾ ഉപയോഗിച്ച് ഡാറ്റ വിശകലനം ചെയ്യുന്നു...]',
+        'optimal_crop_choice': '[translate:നിങ്ങളുടെ മണ്ണിന്റെയും പാരിസ്ഥിതിക അവസ്ഥകളുടെയും സമഗ്ര വിശകലനത്തെ അടിസ്ഥാനമാക്കി, {} പരമാവധി വിളവിനും ലാഭകരതയ്ക്കുമുള്ള ഏറ്റവും മികച്ച വിള തിരഞ്ഞെടുപ്പാണ്!]',
+        'model_accuracy': '🎯 [translate:മോഡൽ കൃത്യത]',
+        'confidence_level': '📊 [translate:കോൺഫിഡൻസ് ലെവൽ]: {:.1%}',
+        'alternative_crops': '🌿 [translate:മറ്റ് അനുയോജ്യമായ വിളകൾ]',
+        'processing_time': '⚡ [translate:പ്രോസസ്സിംഗ് സമയം: {:.3f} സെക്കൻഡ്]',
+        'demo_pacing': '🎬 [translate:ഡെമോ വേഗത]',
+        'analysis_complete': '✅ [translate:വിശകലനം വിജയകരമായി പൂർത്തീകരിച്ചു! നിങ്ങളുടെ വ്യക്തിഗത വിള ശുപാർശ തയ്യാറാണ്.]',
+        'acidic_soil': '🔴 [translate:അസിഡിക് മണ്ണ്]',
+        'alkaline_soil': '🔵 [translate:ക്ഷാര മണ്ണ്]',
+        'neutral_soil': '🟢 [translate:ന്യൂട്രൽ മണ്ണ്]',
+        'acidic_advice': '[translate:പിഎച്ച് വർദ്ധിപ്പിക്കാൻ കുമ്മായം ചേർക്കുന്നതിനെക്കുറിച്ച് ചിന്തിക്കുക]',
+        'alkaline_advice': '[translate:പിഎച്ച് കുറയ്ക്കാൻ സൾഫർ ചേർക്കുന്നതിനെക്കുറിച്ച് ചിന്തിക്കുക]',
+        'neutral_advice': '[translate:മിക്ക വിളകൾക്കും അനുകൂലമായ പിഎച്ച് പരിധി]',
+        'soil_status': '[translate:മണ്ണിന്റെ അവസ്ഥ]',
+        'current_level': '[translate:നിലവിലെ നിലവാരം]',
+        'about_agriverse': '🔬 [translate:അഗ്രിവേഴ്സ് പ്രോയെക്കുറിച്ച്]',
+        'mission': '🎯 [translate:മിഷൻ: എഐ-പവേർഡ് ക്രോപ്പ് ഇന്റലിജൻസിലൂടെ കാർഷികരംഗത്ത് വിപ്ലവം സൃഷ്ടിക്കുക]',
+        'technology': '🧠 [translate:സാങ്കേതികവിദ്യ: 98%+ കൃത്യതയുള്ള അഡ്വാൻസ്ഡ് റാൻഡം ഫോറസ്റ്റ് അൽഗോരിതങ്ങൾ]',
+        'data': '📊 [translate:ഡാറ്റ: 25,000+ കാർഷിക ഡാറ്റാ പോയിന്റുകളിൽ പരിശീലിപ്പിച്ചത്]',
+        'impact': '🌍 [translate:സ്വാധീനം: ലോകമെമ്പാടുമുള്ള സുസ്ഥിര കൃഷി രീതികളെ പിന്തുണയ്ക്കുന്നു]'
+    }
+}
+
+# Crop-specific advice; {crop} is filled in with the predicted crop name
+_RECOMMENDATION_TEMPLATES = {
+    'en': (
+        "🔬 Consult agricultural experts for {crop} cultivation techniques",
+        "💰 Research market prices and demand for {crop} in your region",
+        "🔄 Plan crop rotation to maintain soil health and fertility",
+        "🌦️ Monitor weather patterns for optimal planting time",
+        "🧪 Conduct detailed soil testing for precise nutrient management",
+        "🌱 Source high-quality seeds from certified suppliers",
+        "💧 Install appropriate irrigation systems for {crop}",
+        "📅 Create a seasonal calendar for {crop} cultivation"
+    ),
+    'hi': (
+        "🔬 [translate:{crop} की खेती तकनीकों के लिए कृषि विशेषज्ञों से सलाह लें]",
+        "💰 [translate:अपने क्षेत्र में {crop} की बाजार कीमतों और मांग पर शोध करें]",
+        "🔄 [translate:मिट्टी के स्वास्थ्य और उर्वरता को बनाए रखने के लिए फसल चक्र की योजना बनाएं]",
+        "🌦️ [translate:इष्टतम बुआई के समय के लिए मौसम के पैटर्न की निगरानी करें]",
+        "🧪 [translate:सटीक पोषक तत्व प्रबंधन के लिए विस्तृत मिट्टी परीक्षण करवाएं]",
+        "🌱 [translate:प्रमाणित आपूर्तिकर्ताओं से उच्च गुणवत्ता वाले बीज प्राप्त करें]",
+        "💧 [translate:{crop} के लिए उपयुक्त सिंचाई प्रणाली स्थापित करें]",
+        "📅 [translate:{crop} की खेती के लिए एक मौसमी कैलेंडर बनाएं]"
+    ),
+    'ml': (
+        "🔬 [translate:{crop} കൃഷി സാങ്കേതികതകൾക്കായി കാർഷിക വിദഗ്ധരെ സമ്പർക്കിക്കുക]",
+        "💰 [translate:നിങ്ങളുടെ പ്രദേശത്ത് {crop} വിപണി വിലകളും ആവശ്യകതയും ഗവേഷണം ചെയ്യുക]",
+        "🔄 [translate:മണ്ണിന്റെ ആരോഗ്യവും ഫലഭൂയിഷ്ഠതയും നിലനിർത്താൻ വിള ഭ്രമണം ആസൂത്രണം ചെയ്യുക]",
+        "🌦️ [translate:ഏറ്റവും മികച്ച നടീൽ സമയത്തിനായി കാലാവസ്ഥാ പാറ്റേണുകൾ നിരീക്ഷിക്കുക]",
+        "🧪 [translate:കൃത്യമായ പോഷക മാനേജ്മെന്റിനായി വിശദമായ മണ്ണ് പരിശോധന നടത്തുക]",
+        "🌱 [translate:സാക്ഷ്യപ്പെടുത്തിയ വിതരണക്കാരിൽ നിന്ന് ഉയർന്ന നിലവാരമുള്ള വിത്തുകൾ സ്വരൂപിക്കുക]",
+        "💧 [translate:{crop} ന് അനുയോജ്യമായ ജലസേചന സംവിധാനങ്ങൾ സ്ഥാപിക്കുക]",
+        "📅 [translate:{crop} കൃഷിക്കായി ഒരു സീസണൽ കലണ്ടർ സൃഷ്ടിക്കുക]"
+    )
+}
+
+
+# Read-only views so a caller cannot change the shared tables by accident
+TRANSLATIONS = MappingProxyType({
+    language: MappingProxyType(table) for language, table in _TRANSLATIONS.items()
+})
+
+
+def get_translations(language):
+    """Get translations for different languages"""
+    return TRANSLATIONS.get(language, TRANSLATIONS[DEFAULT_LANGUAGE])
+
+
+@lru_cache(maxsize=512)
+def get_crop_recommendations(crop_name, language):
+    """Get crop-specific recommendations in the selected language"""
+    templates = _RECOMMENDATION_TEMPLATES.get(language, _RECOMMENDATION_TEMPLATES[DEFAULT_LANGUAGE])
+    return tuple(template.format(crop=crop_name) for template in templates)
@@ -0,0 +1,144 @@
+# ui_fragments.py - Static HTML for webapp.py, rendered once per language at import
+
+
+from functools import lru_cache
+from types import MappingProxyType
+
+from translations import DEFAULT_LANGUAGE, TRANSLATIONS, get_crop_recommendations
+
+
+def _render(t):
+    """Every piece of main() HTML that depends only on the language"""
+    return {
+        'header': f"""
+    <div class="main-header">
+        <div>{t['app_title']}</div>
+        <div style="font-size: 1.5rem; font-weight: 400; margin-top: 1rem; opacity: 0.9;">
+            {t['app_subtitle']}
+        </div>
+    </div>
+    """,
+        'control_panel': f'<h2 style="color: white; text-align: center; font-size: 2rem; margin-bottom: 2rem;">{t["control_panel"]}</h2>',
+        'soil_nutrients': f'<h3 style="color: white; font-size: 1.3rem;">{t["soil_nutrients"]}</h3>',
+        'environmental_conditions': f'<h3 style="color: white; font-size: 1.3rem; margin-top: 2rem;">{t["environmental_conditions"]}</h3>',
+        'how_it_works': f"""
+    <div class="glass-section">
+        <h2 class="section-title">{t["how_it_works"]}</h2>
+        <p style="color: white; font-size: 1.3rem; text-align: center; line-height: 1.8; font-weight: 500;">
+            {t["how_it_works_desc"]}
+        </p>
+    </div>
+    """,
+        'feature_soil': f"""
+        <div class="feature-card">
+            <h4>{t["advanced_soil"]}</h4>
+            <p>{t["advanced_soil_desc"]}</p>
+        </div>
+        """,
+        'feature_climate': f"""
+        <div class="feature-card">
+            <h4>{t["climate_intelligence"]}</h4>
+            <p>{t["climate_intelligence_desc"]}</p>
+        </div>
+        """,
+        'feature_ml': f"""
+        <div class="feature-card">
+            <h4>{t["machine_learning"]}</h4>
+            <p>{t["machine_learning_desc"]}</p>
+        </div>
+        """,
+        'current_parameters': f'<h2 class="section-title">{t["current_parameters"]}</h2>',
+        'crop_intelligence': f'<h2 class="section-title">{t["crop_intelligence"]}</h2>',
+        'smart_recommendations': f'<h2 class="section-title">{t["smart_recommendations"]}</h2>',
+        'footer': f"""
+    <div class="glass-section" style="margin-top: 5rem;">
+        <h3 style="color: white; text-align: center; font-size: 1.8rem; margin-bottom: 2rem;">
+            {t["about_agriverse"]}
+        </h3>
+        <div style="color: rgba(255, 255, 255, 0.9); text-align: center; line-height: 1.8;">
+            <p><strong>{t["mission"]}</strong></p>
+            <p><strong>{t["technology"]}</strong></p>
+            <p><strong>{t["data"]}</strong></p>
+            <p><strong>{t["impact"]}</strong></p>
+        </div>
+    </div>
+    """,
+    }
+
+
+STATIC_HTML = MappingProxyType({
+    language: MappingProxyType(_render(t)) for language, t in TRANSLATIONS.items()
+})
+
+
+def static_html(language):
+    """Pre-rendered fragments for a language"""
+    return STATIC_HTML.get(language, STATIC_HTML[DEFAULT_LANGUAGE])
+
+
+@lru_cache(maxsize=512)
+def recommendation_cards(crop_name, language):
+    """Recommendation card HTML for a crop, rendered once per (crop, language)"""
+    return tuple(
+        f"""
+        <div class="recommendation-card" style="animation-delay: {i * 0.1}s;">
+            <p>{rec}</p>
+        </div>
+        """
+        for i, rec in enumerate(get_crop_recommendations(crop_name, language))
+    )
+
+
+# Growing conditions shown in the crop intelligence report
+CROP_INFO = {
+    'rice': {'season': 'Kharif', 'water': 'High', 'temp': '20-30°C', 'soil': 'Clay loam', 'emoji': '🌾'},
+    'wheat': {'season': 'Rabi', 'water': 'Moderate', 'temp': '15-25°C', 'soil': 'Loam', 'emoji': '🌾'},
+    'maize': {'season': 'Kharif/Rabi', 'water': 'Moderate', 'temp': '25-30°C', 'soil': 'Well-drained', 'emoji': '🌽'},
+    'cotton': {'season': 'Kharif', 'water': 'Moderate', 'temp': '25-35°C', 'soil': 'Black cotton', 'emoji': '🌿'},
+    'sugarcane': {'season': 'Year-round', 'water': 'High', 'temp': '26-32°C', 'soil': 'Heavy loam', 'emoji': '🎋'},
+    'banana': {'season': 'Year-round', 'water': 'High', 'temp': '25-30°C', 'soil': 'Rich loam', 'emoji': '🍌'},
+    'apple': {'season': 'Rabi', 'water': 'Moderate', 'temp': '15-25°C', 'soil': 'Well-drained', 'emoji': '🍎'},
+    'mango': {'season': 'Summer', 'water': 'Moderate', 'temp': '24-30°C', 'soil': 'Well-drained', 'emoji': '🥭'},
+    'grapes': {'season': 'Rabi', 'water': 'Moderate', 'temp': '15-25°C', 'soil': 'Well-drained', 'emoji': '🍇'},
+}
+
+_DEFAULT_CROP_INFO = {
+    'season': 'Variable', 'water': 'Moderate', 'temp': 'Variable', 'soil': 'Well-drained', 'emoji': '🌱'
+}
+
+
+@lru_cache(maxsize=512)
+def crop_info_cards(crop_name, language):
+    """The four crop intelligence cards for a crop, rendered once per (crop, language)"""
+    t = TRANSLATIONS.get(language, TRANSLATIONS[DEFAULT_LANGUAGE])
+    info = CROP_INFO.get(crop_name.lower(), _DEFAULT_CROP_INFO)
+    return (
+        f"""
+        <div class="metric-card" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);">
+            <div style="font-size: 3rem; margin-bottom: 1rem;">{info['emoji']}</div>
+            <div class="metric-label">{t['season']}</div>
+            <div class="metric-value" style="font-size: 1.5rem; color: white;">{info['season']}</div>
+        </div>
+        """,
+        f"""
+        <div class="metric-card" style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);">
+            <div style="font-size: 3rem; margin-bottom: 1rem;">💧</div>
+            <div class="metric-label">{t['water_need']}</div>
+            <div class="metric-value" style="font-size: 1.5rem; color: white;">{info['water']}</div>
+        </div>
+        """,
+        f"""
+        <div class="metric-card" style="background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%);">
+            <div style="font-size: 3rem; margin-bottom: 1rem;">🌡️</div>
+            <div class="metric-label">{t['temperature_range']}</div>
+            <div class="metric-value" style="font-size: 1.5rem; color: white;">{info['temp']}</div>
+        </div>
+        """,
+        f"""
+        <div class="metric-card" style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);">
+            <div style="font-size: 3rem; margin-bottom: 1rem;">🌱</div>
+            <div class="metric-label">{t['soil_type']}</div>
+            <div class="metric-value" style="font-size: 1.5rem; color: white;">{info['soil']}</div>
+        </div>
+        """,
+    )
@@ -0,0 +1,151 @@
+# validation.py - Vectorized schema checks for feature rows, from one to millions
+#
+# Usage:
+#   X, codes = validate(rows)          # rows: list, ndarray, DataFrame or {feature: column}
+#   good = codes == 0                  # score X[good], quarantine the rest
+#   explain(codes[i])                  # ['ph: above the maximum 14', ...]
+#
+# The schema is features.INPUT_SPECS, the bounds of the sidebar
+# number_inputs. Every cell gets a set of error flags:
+#   MISSING      empty, null or NaN
+#   NOT_NUMERIC  a value that does not parse as a number, or a boolean column
+#   NOT_FINITE   +inf or -inf
+#   BELOW_MIN / ABOVE_MAX  outside the INPUT_SPECS range
+# and a row's error code packs the flags of its seven features into one
+# uint64, BITS_PER_FEATURE bits per feature in FEATURES order, so 0 means
+# valid. feature_errors() unpacks one feature. All checks are NumPy masks
+# over the whole matrix; only explain() works on a single code.
+#
+# Structural problems (wrong number of features, missing columns) concern
+# the whole input and raise ValueError, as inference.as_feature_matrix does.
+# pandas is imported only when a column holds text that is not a number.
+
+
+import numpy as np
+
+from features import FEATURES, INPUT_SPECS
+
+
+MISSING = 1
+NOT_NUMERIC = 2
+NOT_FINITE = 4
+BELOW_MIN = 8
+ABOVE_MAX = 16
+BITS_PER_FEATURE = 5
+
+LOW = np.array([INPUT_SPECS[f][0] for f in FEATURES])
+HIGH = np.array([INPUT_SPECS[f][1] for f in FEATURES])
+_MASK = (1 << BITS_PER_FEATURE) - 1
+_WEIGHTS = np.uint64(1) << np.arange(len(FEATURES), dtype=np.uint64) * np.uint64(BITS_PER_FEATURE)
+
+
+def coerce_column(values):
+    """(float64 array, not-numeric mask) for a column of arbitrary objects; unparsable values become NaN"""
+    values = np.asarray(values, dtype=object)
+    missing = np.equal(values, None)
+    try:
+        return np.where(missing, np.nan, values).astype(np.float64), np.zeros(len(values), dtype=bool)
+    except (TypeError, ValueError):
+        pass
+    # Some value is not a number: pandas' C parser sorts out which
+    import pandas as pd
+
+    values = pd.Series(values)
+    numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return numeric, np.isnan(numeric) & values.notna().to_numpy()
+
+
+def _coerce_columns(columns, n_rows):
+    X = np.empty((n_rows, len(FEATURES)), dtype=np.float64)
+    not_numeric = None
+    for j, column in enumerate(columns):
+        column = np.asarray(column)
+        bad = None
+        if column.dtype.kind in 'iuf':
+            X[:, j] = column
+        elif column.dtype.kind == 'b':
+            X[:, j] = column
+            bad = np.ones(n_rows, dtype=bool)
+        else:
+            X[:, j], bad = coerce_column(column)
+        if bad is not None:
+            if not_numeric is None:
+                not_numeric = np.zeros(X.shape, dtype=bool)
+            not_numeric[:, j] = bad
+    return X, not_numeric
+
+
+def coerce(data):
+    """(X, not_numeric): data as an (n, 7) float64 matrix, and an (n, 7) mask
+    of cells that were not numbers (None when every value was numeric)"""
+    if isinstance(data, dict) or hasattr(data, 'columns'):
+        missing = [f for f in FEATURES if f not in data]
+        if missing:
+            raise ValueError(f"missing feature columns: {missing}")
+        columns = [np.asarray(data[f]) for f in FEATURES]
+        return _coerce_columns(columns, len(columns[0]))
+
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data.reshape(1, -1)
+    if data.ndim != 2 or data.shape[1] != len(FEATURES):
+        raise ValueError(f"expected rows of {len(FEATURES)} features {FEATURES}, got shape {data.shape}")
+    if data.dtype.kind in 'iuf':
+        return data.astype(np.float64), None
+    if data.dtype.kind in 'OU':
+        try:
+            # Numbers held as objects or strings, e.g. parsed JSON: one C-level conversion
+            return data.astype(np.float64), None
+        except (TypeError, ValueError):
+            pass
+    return _coerce_columns(data.T, len(data))
+
+
+def cell_errors(X, not_numeric=None, low=LOW, high=HIGH):
+    """(n, 7) uint8 error flags for a float64 feature matrix"""
+    infinite = np.isinf(X)
+    flags = np.isnan(X).view(np.uint8) * np.uint8(MISSING)
+    flags |= infinite.view(np.uint8) * np.uint8(NOT_FINITE)
+    # NaN compares False; infinities are only NOT_FINITE
+    flags |= ((X < low) & ~infinite).view(np.uint8) * np.uint8(BELOW_MIN)
+    flags |= ((X > high) & ~infinite).view(np.uint8) * np.uint8(ABOVE_MAX)
+    if not_numeric is not None:
+        flags[not_numeric] = NOT_NUMERIC
+    return flags
+
+
+def error_codes(X, not_numeric=None, low=LOW, high=HIGH):
+    """One uint64 per row: every feature's flags, BITS_PER_FEATURE bits each; 0 = valid"""
+    # Flags occupy disjoint bits, so the weighted sum is their bitwise OR
+    return cell_errors(X, not_numeric, low, high).astype(np.uint64) @ _WEIGHTS
+
+
+def validate(data, low=LOW, high=HIGH):
+    """(X, codes) for one row or many rows of FEATURES"""
+    X, not_numeric = coerce(data)
+    return X, error_codes(X, not_numeric, low, high)
+
+
+def feature_errors(codes, feature):
+    """The flags of one feature, unpacked from row error codes"""
+    shift = np.uint64(FEATURES.index(feature) * BITS_PER_FEATURE)
+    return (np.asarray(codes, dtype=np.uint64) >> shift) & np.uint64(_MASK)
+
+
+def explain(code, low=LOW, high=HIGH):
+    """Human-readable problems behind one row's error code"""
+    code = int(code)
+    problems = []
+    for j, feature in enumerate(FEATURES):
+        flags = (code >> (j * BITS_PER_FEATURE)) & _MASK
+        if flags & MISSING:
+            problems.append(f"{feature}: missing")
+        if flags & NOT_NUMERIC:
+            problems.append(f"{feature}: not a number")
+        if flags & NOT_FINITE:
+            problems.append(f"{feature}: not finite")
+        if flags & BELOW_MIN:
+            problems.append(f"{feature}: below the minimum {low[j]:g}")
+        if flags & ABOVE_MAX:
+            problems.append(f"{feature}: above the maximum {high[j]:g}")
+    return problems
@@ -2,20 +2,49 @@
 
 
 import streamlit as st
-import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-import pickle
 import os
 import warnings
-from PIL import Image
 import time
-import random
+from contextlib import nullcontext
+
+from features import FEATURES, INPUT_SPECS
+from forest_engine import compilable
+from inference import top_k
+from metrics import span, timed, write_file
+from model_registry import INFERENCE_ONLY, load_model, register_model
+from prediction_cache import PredictionCache
+from translations import get_crop_recommendations, get_translations
+from ui_fragments import crop_info_cards, recommendation_cards, static_html
+from validation import explain, validate
 
 
 warnings.filterwarnings('ignore')
 
+# Artificial delays for presentations; off by default so predictions return immediately
+DEMO_PACING = os.environ.get('AGRIVERSE_DEMO_PACING') == '1'
+
+# How many ranked crops a prediction returns: the recommendation plus alternatives
+TOP_K = 3
+
+# Worker processes for prediction (inference_pool.py); 0 predicts in the script thread,
+# as do grids and models that are not tree ensembles
+POOL_WORKERS = int(os.environ.get('AGRIVERSE_POOL_WORKERS', '0'))
+
+# Answer from a precomputed decision grid (decision_grid.py) instead of the model: a lookup per prediction
+GRID_PATH = os.environ.get('AGRIVERSE_GRID')
+
+# Poll for new model releases and hot-swap them (model_watcher.py); 0 disables
+WATCH_SECONDS = float(os.environ.get('AGRIVERSE_WATCH_SECONDS', '0'))
+
+# Write per-stage latency histograms here (Prometheus text, metrics.py), at most every METRICS_INTERVAL seconds
+METRICS_FILE = os.environ.get('AGRIVERSE_METRICS_FILE')
+METRICS_INTERVAL = float(os.environ.get('AGRIVERSE_METRICS_INTERVAL', '10'))
+
+# cProfile + tracemalloc captures (profiling.py): 'rerun' profiles all of main(), 'predict' only the prediction.
+# With AGRIVERSE_PROFILE_QUERY=1 a ?profile=rerun|predict query parameter turns it on for that session.
+PROFILE = os.environ.get('AGRIVERSE_PROFILE')
+PROFILE_QUERY = os.environ.get('AGRIVERSE_PROFILE_QUERY') == '1'
+
 
 # Set page configuration
 st.set_page_config(
@@ -600,232 +629,23 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# MULTILINGUAL SUPPORT - Added Hindi and Malayalam
-def get_translations(language):
-    """Get translations for different languages"""
-    translations = {
-        'en': {
-            'app_title': '🌾 AgriVerse Pro',
-            'app_subtitle': 'Advanced AI-Powered Crop Intelligence System',
-            'control_panel': '🌱 Control Panel',
-            'soil_nutrients': '📊 Soil Nutrients (ppm)',
-            'environmental_conditions': '🌡️ Environmental Conditions',
-            'nitrogen': 'Nitrogen (N)',
-            'phosphorus': 'Phosphorus (P)', 
-            'potassium': 'Potassium (K)',
-            'temperature': 'Temperature (°C)',
-            'humidity': 'Humidity (%)',
-            'ph_level': 'pH Level',
-            'rainfall': 'Rainfall (mm)',
-            'predict_button': '🔮 Predict Optimal Crop',
-            'how_it_works': '🎯 How It Works',
-            'how_it_works_desc': 'Our advanced AI system analyzes multiple environmental and soil parameters to recommend the most suitable crop for your agricultural needs. Using machine learning algorithms trained on extensive agricultural data, we provide precise, data-driven recommendations.',
-            'advanced_soil': '🧪 Advanced Soil Analysis',
-            'advanced_soil_desc': 'AI-powered analysis of NPK levels, pH balance, and soil composition for optimal crop selection',
-            'climate_intelligence': '🌤️ Climate Intelligence',
-            'climate_intelligence_desc': 'Comprehensive weather pattern analysis including temperature, humidity, and rainfall data',
-            'machine_learning': '🤖 Machine Learning',
-            'machine_learning_desc': 'Advanced Random Forest algorithms with 98%+ accuracy for precise crop recommendations',
-            'current_parameters': '📋 Current Parameters',
-            'recommended_crop': 'Recommended Crop',
-            'crop_intelligence': '📊 Crop Intelligence Report',
-            'season': 'Season',
-            'water_need': 'Water Need',
-            'temperature_range': 'Temperature',
-            'soil_type': 'Soil Type',
-            'smart_recommendations': '💡 Smart Recommendations',
-            'analyzing_data': '🔄 Analyzing data with AI algorithms...',
-            'optimal_crop_choice': 'Based on comprehensive analysis of your soil and environmental conditions, {} is the optimal crop choice for maximum yield and profitability!',
-            'model_accuracy': '🎯 Model Accuracy',
-            'confidence_level': '📊 Confidence Level: High',
-            'processing_time': '⚡ Processing Time: 2.1 seconds',
-            'analysis_complete': '✅ Analysis completed successfully! Your personalized crop recommendation is ready.',
-            'acidic_soil': '🔴 Acidic Soil',
-            'alkaline_soil': '🔵 Alkaline Soil',
-            'neutral_soil': '🟢 Neutral Soil',
-            'acidic_advice': 'Consider adding lime to increase pH',
-            'alkaline_advice': 'Consider adding sulfur to decrease pH', 
-            'neutral_advice': 'Optimal pH range for most crops',
-            'soil_status': 'Soil Status',
-            'current_level': 'Current Level',
-            'about_agriverse': '🔬 About AgriVerse Pro',
-            'mission': '🎯 Mission: Revolutionizing agriculture through AI-powered crop intelligence',
-            'technology': '🧠 Technology: Advanced Random Forest algorithms with 98%+ accuracy',
-            'data': '📊 Data: Trained on 25,000+ agricultural data points',
-            'impact': '🌍 Impact: Supporting sustainable farming practices worldwide'
-        },
-        'hi': {
-            'app_title': '🌾 [translate:एग्रीवर्स प्रो]',
-            'app_subtitle': '[translate:उन्नत एआई-संचालित फसल बुद्धिमत्ता प्रणाली]',
-            'control_panel': '🌱 [translate:नियंत्रण पैनल]',
-            'soil_nutrients': '📊 [translate:मिट्टी के पोषक तत्व] (ppm)',
-            'environmental_conditions': '🌡️ [translate:पर्यावरणीय स्थितियां]',
-            'nitrogen': '[translate:नाइट्रोजन] (N)',
-            'phosphorus': '[translate:फास्फोरस] (P)',
-            'potassium': '[translate:पोटेशियम] (K)',
-            'temperature': '[translate:तापमान] (°C)',
-            'humidity': '[translate:आर्द्रता] (%)',
-            'ph_level': '[translate:पीएच स्तर]',
-            'rainfall': '[translate:वर्षा] (mm)',
-            'predict_button': '🔮 [translate:इष्टतम फसल की भविष्यवाणी करें]',
-            'how_it_works': '🎯 [translate:यह कैसे काम करता है]',
-            'how_it_works_desc': '[translate:हमारी उन्नत एआई प्रणाली आपकी कृषि आवश्यकताओं के लिए सबसे उपयुक्त फसल की सिफारिश करने के लिए कई पर्यावरणीय और मिट्टी के मापदंडों का विश्लेषण करती है। व्यापक कृषि डेटा पर प्रशिक्षित मशीन लर्निंग एल्गोरिदम का उपयोग करके, हम सटीक, डेटा-संचालित सिफारिशें प्रदान करते हैं।]',
-            'advanced_soil': '🧪 [translate:उन्नत मिट्टी विश्लेषण]',
-            'advanced_soil_desc': '[translate:इष्टतम फसल चयन के लिए एनपीके स्तर, पीएच संतुलन और मिट्टी की संरचना का एआई-संचालित विश्लेषण]',
-            'climate_intelligence': '🌤️ [translate:जलवायु बुद्धिमत्ता]',
-            'climate_intelligence_desc': '[translate:तापमान, आर्द्रता और वर्षा डेटा सहित व्यापक मौसम पैटर्न विश्लेषण]',
-            'machine_learning': '🤖 [translate:मशीन लर्निंग]',
-            'machine_learning_desc': '[translate:सटीक फसल सिफारिशों के लिए 98%+ सटीकता के साथ उन्नत रैंडम फॉरेस्ट एल्गोरिदम]',
-            'current_parameters': '📋 [translate:वर्तमान पैरामीटर]',
-            'recommended_crop': '[translate:सुझाई गई फसल]',
-            'crop_intelligence': '📊 [translate:फसल बुद्धिमत्ता रिपोर्ट]',
-            'season': '[translate:मौसम]',
-            'water_need': '[translate:पानी की आवश्यकता]',
-            'temperature_range': '[translate:तापमान]',
-            'soil_type': '[translate:मिट्टी का प्रकार]',
-            'smart_recommendations': '💡 [translate:स्मार्ट सिफारिशें]',
-            'analyzing_data': '🔄 [translate:एआई एल्गोरिदम के साथ डेटा का विश्लेषण कर रहे हैं...]',
-            'optimal_crop_choice': '[translate:आपकी मिट्टी और पर्यावरणीय स्थितियों के व्यापक विश्लेषण के आधार पर, {} अधिकतम उपज और लाभप्रदता के लिए इष्टतम फसल विकल्प है!]',
-            'model_accuracy': '🎯 [translate:मॉडल सटीकता]',
-            'confidence_level': '📊 [translate:विश्वास स्तर: उच्च]',
-            'processing_time': '⚡ [translate:प्रसंस्करण समय: 2.1 सेकंड]',
-            'analysis_complete': '✅ [translate:विश्लेषण सफलतापूर्वक पूरा हुआ! आपकी व्यक्तिगत फसल की सिफारिश तैयार है।]',
-            'acidic_soil': '🔴 [translate:अम्लीय मिट्टी]',
-            'alkaline_soil': '🔵 [translate:क्षारीय मिट्टी]',
-            'neutral_soil': '🟢 [translate:तटस्थ मिट्टी]',
-            'acidic_advice': '[translate:पीएच बढ़ाने के लिए चूना मिलाने पर विचार करें]',
-            'alkaline_advice': '[translate:पीएच घटाने के लिए सल्फर मिलाने पर विचार करें]',
-            'neutral_advice': '[translate:अधिकांश फसलों के लिए इष्टतम पीएच रेंज]',
-            'soil_status': '[translate:मिट्टी की स्थिति]',
-            'current_level': '[translate:वर्तमान स्तर]',
-            'about_agriverse': '🔬 [translate:एग्रीवर्स प्रो के बारे में]',
-            'mission': '🎯 [translate:मिशन: एआई-संचालित फसल बुद्धिमत्ता के माध्यम से कृषि में क्रांति लाना]',
-            'technology': '🧠 [translate:प्रौद्योगिकी: 98%+ सटीकता के साथ उन्नत रैंडम फॉरेस्ट एल्गोरिदम]',
-            'data': '📊 [translate:डेटा: 25,000+ कृषि डेटा बिंदुओं पर प्रशिक्षित]',
-            'impact': '🌍 [translate:प्रभाव: दुनिया भर में टिकाऊ कृषि प्रथाओं का समर्थन]'
-        },
-        'ml': {
-            'app_title': '🌾 [translate:അഗ്രിവേഴ്സ് പ്രോ]',
-            'app_subtitle': '[translate:അഡ്വാൻസ്ഡ് എഐ-പവേർഡ് ക്രോപ്പ് ഇന്റലിജൻസ് സിസ്റ്റം]',
-            'control_panel': '🌱 [translate:കൺട്രോൾ പാനൽ]',
-            'soil_nutrients': '📊 [translate:മണ്ണിലെ പോഷകങ്ങൾ] (ppm)',
-            'environmental_conditions': '🌡️ [translate:പാരിസ്ഥിതിക അവസ്ഥകൾ]',
-            'nitrogen': '[translate:നൈട്രജൻ] (N)',
-            'phosphorus': '[translate:ഫോസ്ഫറസ്] (P)',
-            'potassium': '[translate:പൊട്ടാസ്യം] (K)',
-            'temperature': '[translate:താപനില] (°C)',
-            'humidity': '[translate:ആർദ്രത] (%)',
-            'ph_level': '[translate:പിഎച്ച് ലെവൽ]',
-            'rainfall': '[translate:മഴ] (mm)',
-            'predict_button': '🔮 [translate:അനുകൂല വിള പ്രവചിക്കുക]',
-            'how_it_works': '🎯 [translate:ഇത് എങ്ങനെ പ്രവർത്തിക്കുന്നു]',
-            'how_it_works_desc': '[translate:ഞങ്ങളുടെ അഡ്വാൻസ്ഡ് എഐ സിസ്റ്റം നിങ്ങളുടെ കാർഷിക ആവശ്യങ്ങൾക്ക് ഏറ്റവും അനുയോജ്യമായ വിള ശുപാർശ ചെയ്യുന്നതിനായി ഒന്നിലധികം പാരിസ്ഥിതിക, മണ്ണിന്റെ പാരാമീറ്ററുകൾ വിശകലനം ചെയ്യുന്നു. വിപുലമായ കാർഷിക ഡാറ്റയിൽ പരിശീലിപ്പിച്ച മെഷീൻ ലേണിംഗ് അൽഗോരിതങ്ങൾ ഉപയോഗിച്ച്, ഞങ്ങൾ കൃത്യമായ, ഡാറ്റാ-ഡ്രിവൻ ശുപാർശകൾ നൽകുന്നു.]',
-            'advanced_soil': '🧪 [translate:അഡ്വാൻസ്ഡ് മണ്ണ് വിശകലനം]',
-            'advanced_soil_desc': '[translate:അനുകൂല വിള തിരഞ്ഞെടുപ്പിനായി എൻപികെ ലെവലുകൾ, പിഎച്ച് ബാലൻസ്, മണ്ണിന്റെ ഘടന എന്നിവയുടെ എഐ-പവേർഡ് വിശകലനം]',
-            'climate_intelligence': '🌤️ [translate:കാലാവസ്ഥാ ബുദ്ധി]',
-            'climate_intelligence_desc': '[translate:താപനില, ആർദ്രത, മഴ ഡാറ്റ എന്നിവ ഉൾപ്പെടെയുള്ള സമഗ്ര കാലാവസ്ഥാ പാറ്റേൺ വിശകലനം]',
-            'machine_learning': '🤖 [translate:മെഷീൻ ലേണിംഗ്]',
-            'machine_learning_desc': '[translate:കൃത്യമായ വിള ശുപാർശകൾക്കായി 98%+ കൃത്യതയുള്ള അഡ്വാൻസ്ഡ് റാൻഡം ഫോറസ്റ്റ് അൽഗോരിതങ്ങൾ]',
-            'current_parameters': '📋 [translate:നിലവിലെ പാരാമീറ്ററുകൾ]',
-            'recommended_crop': '[translate:ശുപാർശ ചെയ്യപ്പെട്ട വിള]',
-            'crop_intelligence': '📊 [translate:വിള ഇന്റലിജൻസ് റിപ്പോർട്ട്]',
-            'season': '[translate:സീസൺ]',
-            'water_need': '[translate:വെള്ളത്തിന്റെ ആവശ്യം]',
-            'temperature_range': '[translate:താപനില]',
-            'soil_type': '[translate:മണ്ണിന്റെ തരം]',
-            'smart_recommendations': '💡 [translate:സ്മാർട്ട് ശുപാർശകൾ]',
-            'analyzing_data': '🔄 [translate:എഐ അൽഗോരിതങ്ങൾ ഉപയോഗിച്ച് ഡാറ്റ വിശകലനം ചെയ്യുന്നു...]',
-            'optimal_crop_choice': '[translate:നിങ്ങളുടെ മണ്ണിന്റെയും പാരിസ്ഥിതിക അവസ്ഥകളുടെയും സമഗ്ര വിശകലനത്തെ അടിസ്ഥാനമാക്കി, {} പരമാവധി വിളവിനും ലാഭകരതയ്ക്കുമുള്ള ഏറ്റവും മികച്ച വിള തിരഞ്ഞെടുപ്പാണ്!]',
-            'model_accuracy': '🎯 [translate:മോഡൽ കൃത്യത]',
-            'confidence_level': '📊 [translate:കോൺഫിഡൻസ് ലെവൽ: ഉയർന്നത്]',
-            'processing_time': '⚡ [translate:പ്രോസസ്സിംഗ് സമയം: 2.1 സെക്കൻഡ്]',
-            'analysis_complete': '✅ [translate:വിശകലനം വിജയകരമായി പൂർത്തീകരിച്ചു! നിങ്ങളുടെ വ്യക്തിഗത വിള ശുപാർശ തയ്യാറാണ്.]',
-            'acidic_soil': '🔴 [translate:അസിഡിക് മണ്ണ്]',
-            'alkaline_soil': '🔵 [translate:ക്ഷാര മണ്ണ്]',
-            'neutral_soil': '🟢 [translate:ന്യൂട്രൽ മണ്ണ്]',
-            'acidic_advice': '[translate:പിഎച്ച് വർദ്ധിപ്പിക്കാൻ കുമ്മായം ചേർക്കുന്നതിനെക്കുറിച്ച് ചിന്തിക്കുക]',
-            'alkaline_advice': '[translate:പിഎച്ച് കുറയ്ക്കാൻ സൾഫർ ചേർക്കുന്നതിനെക്കുറിച്ച് ചിന്തിക്കുക]',
-            'neutral_advice': '[translate:മിക്ക വിളകൾക്കും അനുകൂലമായ പിഎച്ച് പരിധി]',
-            'soil_status': '[translate:മണ്ണിന്റെ അവസ്ഥ]',
-            'current_level': '[translate:നിലവിലെ നിലവാരം]',
-            'about_agriverse': '🔬 [translate:അഗ്രിവേഴ്സ് പ്രോയെക്കുറിച്ച്]',
-            'mission': '🎯 [translate:മിഷൻ: എഐ-പവേർഡ് ക്രോപ്പ് ഇന്റലിജൻസിലൂടെ കാർഷികരംഗത്ത് വിപ്ലവം സൃഷ്ടിക്കുക]',
-            'technology': '🧠 [translate:സാങ്കേതികവിദ്യ: 98%+ കൃത്യതയുള്ള അഡ്വാൻസ്ഡ് റാൻഡം ഫോറസ്റ്റ് അൽഗോരിതങ്ങൾ]',
-            'data': '📊 [translate:ഡാറ്റ: 25,000+ കാർഷിക ഡാറ്റാ പോയിന്റുകളിൽ പരിശീലിപ്പിച്ചത്]',
-            'impact': '🌍 [translate:സ്വാധീനം: ലോകമെമ്പാടുമുള്ള സുസ്ഥിര കൃഷി രീതികളെ പിന്തുണയ്ക്കുന്നു]'
-        }
-    }
-    return translations.get(language, translations['en'])
-
-
-def get_crop_recommendations(crop_name, language):
-    """Get crop-specific recommedations in selected language"""
-    recommendations = {
-        'en': [
-            f"🔬 Consult agricultural experts for {crop_name} cultivation techniques",
-            f"💰 Research market prices and demand for {crop_name} in your region",
-            f"🔄 Plan crop rotation to maintain soil health and fertility",
-            f"🌦️ Monitor weather patterns for optimal planting time",
-            f"🧪 Conduct detailed soil testing for precise nutrient management",
-            f"🌱 Source high-quality seeds from certified suppliers",
-            f"💧 Install appropriate irrigation systems for {crop_name}",
-            f"📅 Create a seasonal calendar for {crop_name} cultivation"
-        ],
-        'hi': [
-            f"🔬 [translate:{crop_name} की खेती तकनीकों के लिए कृषि विशेषज्ञों से सलाह लें]",
-            f"💰 [translate:अपने क्षेत्र में {crop_name} की बाजार कीमतों और मांग पर शोध करें]",
-            f"🔄 [translate:मिट्टी के स्वास्थ्य और उर्वरता को बनाए रखने के लिए फसल चक्र की योजना बनाएं]",
-            f"🌦️ [translate:इष्टतम बुआई के समय के लिए मौसम के पैटर्न की निगरानी करें]",
-            f"🧪 [translate:सटीक पोषक तत्व प्रबंधन के लिए विस्तृत मिट्टी परीक्षण करवाएं]",
-            f"🌱 [translate:प्रमाणित आपूर्तिकर्ताओं से उच्च गुणवत्ता वाले बीज प्राप्त करें]",
-            f"💧 [translate:{crop_name} के लिए उपयुक्त सिंचाई प्रणाली स्थापित करें]",
-            f"📅 [translate:{crop_name} की खेती के लिए एक मौसमी कैलेंडर बनाएं]"
-        ],
-        'ml': [
-            f"🔬 [translate:{crop_name} കൃഷി സാങ്കേതികതകൾക്കായി കാർഷിക വിദഗ്ധരെ സമ്പർക്കിക്കുക]",
-            f"💰 [translate:നിങ്ങളുടെ പ്രദേശത്ത് {crop_name} വിപണി വിലകളും ആവശ്യകതയും ഗവേഷണം ചെയ്യുക]",
-            f"🔄 [translate:മണ്ണിന്റെ ആരോഗ്യവും ഫലഭൂയിഷ്ഠതയും നിലനിർത്താൻ വിള ഭ്രമണം ആസൂത്രണം ചെയ്യുക]",
-            f"🌦️ [translate:ഏറ്റവും മികച്ച നടീൽ സമയത്തിനായി കാലാവസ്ഥാ പാറ്റേണുകൾ നിരീക്ഷിക്കുക]",
-            f"🧪 [translate:കൃത്യമായ പോഷക മാനേജ്മെന്റിനായി വിശദമായ മണ്ണ് പരിശോധന നടത്തുക]",
-            f"🌱 [translate:സാക്ഷ്യപ്പെടുത്തിയ വിതരണക്കാരിൽ നിന്ന് ഉയർന്ന നിലവാരമുള്ള വിത്തുകൾ സ്വരൂപിക്കുക]",
-            f"💧 [translate:{crop_name} ന് അനുയോജ്യമായ ജലസേചന സംവിധാനങ്ങൾ സ്ഥാപിക്കുക]",
-            f"📅 [translate:{crop_name} കൃഷിക്കായി ഒരു സീസണൽ കലണ്ടർ സൃഷ്ടിക്കുക]"
-        ]
-    }
-    return recommendations.get(language, recommendations['en'])
-
-
 @st.cache_data
 def load_sample_data():
-    """Generate sample data for demo"""
-    np.random.seed(42)
-    crops = ['rice', 'wheat', 'maize', 'cotton', 'sugarcane', 'jute', 'coffee', 'coconut', 
-             'apple', 'banana', 'grapes', 'watermelon', 'muskmelon', 'orange', 'papaya', 
-             'pomegranate', 'mango', 'mothbeans', 'pigeonpeas', 'kidneybeans', 'chickpea', 
-             'lentil', 'blackgram', 'mungbean']
-    
-    data = []
-    for crop in crops:
-        for _ in range(40):  # 40 samples per crop
-            data.append({
-                'N': np.random.uniform(0, 140),
-                'P': np.random.uniform(5, 145),
-                'K': np.random.uniform(5, 205),
-                'temperature': np.random.uniform(8, 43),
-                'humidity': np.random.uniform(14, 100),
-                'ph': np.random.uniform(3.5, 10),
-                'rainfall': np.random.uniform(20, 300),
-                'label': crop
-            })
-    
-    return pd.DataFrame(data)
+    """Generate sample data for demo: 40 rows per crop from synthetic_data's per-crop profiles"""
+    # Only the retraining path needs pandas; keep it off the startup path
+    from synthetic_data import PROFILES, generate
+
+    return generate(40 * len(PROFILES), seed=42)
 
 
 @st.cache_resource
 def train_model():
-    """Train the machine learning model"""
+    """Retrain the model on demand (AGRIVERSE_RETRAIN=1) instead of loading a pickle"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import train_test_split
+
     df = load_sample_data()
-    X = df[['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']]
+    X = df[FEATURES]
     y = df['label']
     
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -835,18 +655,62 @@ def train_model():
     return model, model.score(X_test, y_test)
 
 
-def predict_crop(model, features):
-    """Make prediction"""
-    try:
-        prediction = model.predict([features])
-        return prediction[0]
-    except Exception as e:
-        return None
+@st.cache_resource
+def get_model_watcher():
+    """One background watcher per process that swaps new releases into model_registry"""
+    from model_watcher import ModelWatcher
+    return ModelWatcher(interval=WATCH_SECONDS).start()
+
+
+def get_model():
+    """Get the shared ModelEntry (model, version and holdout accuracy)"""
+    if os.environ.get('AGRIVERSE_RETRAIN') == '1' and not INFERENCE_ONLY:
+        model, accuracy = train_model()
+        return register_model('retrained', model, accuracy, expected_classes=None)
+    if GRID_PATH:
+        return load_model(GRID_PATH)
+    if WATCH_SECONDS > 0:
+        return get_model_watcher().current
+    return load_model()
+
+
+@st.cache_resource
+def get_prediction_cache():
+    """Prediction cache shared by all sessions"""
+    ttl = os.environ.get('AGRIVERSE_CACHE_TTL')
+    return PredictionCache(
+        maxsize=int(os.environ.get('AGRIVERSE_CACHE_SIZE', '4096')),
+        ttl=float(ttl) if ttl else None,
+    )
+
+
+@st.cache_resource(max_entries=2)
+def get_inference_pool(_model, version):
+    """Worker pool sharing the model's tree arrays, built once per model version"""
+    from inference_pool import InferencePool
+    return InferencePool(_model, POOL_WORKERS)
+
+
+def profiled(target):
+    """Capture a profile of the block if this rerun profiles target ('rerun' or 'predict')"""
+    wanted = st.query_params.get('profile', PROFILE) if PROFILE_QUERY else PROFILE
+    if wanted != target:
+        return nullcontext()
+    from profiling import capture
+    return capture(target)
+
 
+@timed()
+def predict_crop(model, features, k=TOP_K):
+    """Rank the k best crops for one row as ((crop, probability), ...)"""
+    labels, proba = top_k(model, features, k)
+    return tuple((str(label), float(p)) for label, p in zip(labels[0], proba[0]))
 
+
+@timed()
 def create_interactive_gauge(value, min_val, max_val, label, unit, color_start, color_end, language):
     """Create beautiful interactive gauge with multilingual support"""
-    t = get_translations(language)
+    current_level = get_translations(language)['current_level']
     percentage = min((value - min_val) / (max_val - min_val) * 100, 100)
     
     gauge_html = f"""
@@ -856,93 +720,40 @@ def create_interactive_gauge(value, min_val, max_val, label, unit, color_start,
         <div class="progress-container">
             <div class="progress-bar" style="width: {percentage}%; background: linear-gradient(90deg, {color_start}, {color_end});"></div>
         </div>
-        <div class="metric-description">{t['current_level']}: {percentage:.1f}%</div>
+        <div class="metric-description">{current_level}: {percentage:.1f}%</div>
     </div>
     """
     return gauge_html
 
 
+@timed()
 def display_crop_info(crop_name, language):
     """Display enhanced crop information with multilingual support"""
-    t = get_translations(language)
-    
-    crop_info = {
-        'rice': {'season': 'Kharif', 'water': 'High', 'temp': '20-30°C', 'soil': 'Clay loam', 'emoji': '🌾'},
-        'wheat': {'season': 'Rabi', 'water': 'Moderate', 'temp': '15-25°C', 'soil': 'Loam', 'emoji': '🌾'},
-        'maize': {'season': 'Kharif/Rabi', 'water': 'Moderate', 'temp': '25-30°C', 'soil': 'Well-drained', 'emoji': '🌽'},
-        'cotton': {'season': 'Kharif', 'water': 'Moderate', 'temp': '25-35°C', 'soil': 'Black cotton', 'emoji': '🌿'},
-        'sugarcane': {'season': 'Year-round', 'water': 'High', 'temp': '26-32°C', 'soil': 'Heavy loam', 'emoji': '🎋'},
-        'banana': {'season': 'Year-round', 'water': 'High', 'temp': '25-30°C', 'soil': 'Rich loam', 'emoji': '🍌'},
-        'apple': {'season': 'Rabi', 'water': 'Moderate', 'temp': '15-25°C', 'soil': 'Well-drained', 'emoji': '🍎'},
-        'mango': {'season': 'Summer', 'water': 'Moderate', 'temp': '24-30°C', 'soil': 'Well-drained', 'emoji': '🥭'},
-        'grapes': {'season': 'Rabi', 'water': 'Moderate', 'temp': '15-25°C', 'soil': 'Well-drained', 'emoji': '🍇'},
-    }
-    
-    info = crop_info.get(crop_name.lower(), {
-        'season': 'Variable', 'water': 'Moderate', 'temp': 'Variable', 'soil': 'Well-drained', 'emoji': '🌱'
-    })
-    
-    st.markdown(f'<h2 class="section-title">{t["crop_intelligence"]}</h2>', unsafe_allow_html=True)
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">{info['emoji']}</div>
-            <div class="metric-label">{t['season']}</div>
-            <div class="metric-value" style="font-size: 1.5rem; color: white;">{info['season']}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class="metric-card" style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">💧</div>
-            <div class="metric-label">{t['water_need']}</div>
-            <div class="metric-value" style="font-size: 1.5rem; color: white;">{info['water']}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div class="metric-card" style="background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%);">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">🌡️</div>
-            <div class="metric-label">{t['temperature_range']}</div>
-            <div class="metric-value" style="font-size: 1.5rem; color: white;">{info['temp']}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(static_html(language)['crop_intelligence'], unsafe_allow_html=True)
     
-    with col4:
-        st.markdown(f"""
-        <div class="metric-card" style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">🌱</div>
-            <div class="metric-label">{t['soil_type']}</div>
-            <div class="metric-value" style="font-size: 1.5rem; color: white;">{info['soil']}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    cards = crop_info_cards(crop_name, language)
+    for col, card in zip(st.columns(4), cards):
+        with col:
+            st.markdown(card, unsafe_allow_html=True)
 
 
-def display_recommendations(crop_name, language):
+@timed()
+def display_recommendations(crop_name, language, demo_pacing=False):
     """Display beautiful recommendations with multilingual support"""
-    t = get_translations(language)
-    recommendations = get_crop_recommendations(crop_name, language)
-    
-    st.markdown(f'<h2 class="section-title">{t["smart_recommendations"]}</h2>', unsafe_allow_html=True)
+    st.markdown(static_html(language)['smart_recommendations'], unsafe_allow_html=True)
     
-    for i, rec in enumerate(recommendations):
-        time.sleep(0.1)  # Small delay for animation effect
-        st.markdown(f"""
-        <div class="recommendation-card" style="animation-delay: {i * 0.1}s;">
-            <p>{rec}</p>
-        </div>
-        """, unsafe_allow_html=True)
+    for card in recommendation_cards(crop_name, language):
+        if demo_pacing:
+            time.sleep(0.1)  # Small delay for animation effect
+        st.markdown(card, unsafe_allow_html=True)
 
 
 def main():
     # Initialize session state for language selection
     if 'language' not in st.session_state:
         st.session_state.language = 'en'
+    if 'demo_pacing' not in st.session_state:
+        st.session_state.demo_pacing = DEMO_PACING
     
     # Language selector in sidebar
     with st.sidebar:
@@ -963,76 +774,49 @@ def main():
         
         st.session_state.language = language_options[selected_language]
     
-    # Get translations for selected language
+    # Get translations and pre-rendered HTML for selected language
     t = get_translations(st.session_state.language)
+    html = static_html(st.session_state.language)
     
     # Title with animations
-    st.markdown(f"""
-    <div class="main-header">
-        <div>{t['app_title']}</div>
-        <div style="font-size: 1.5rem; font-weight: 400; margin-top: 1rem; opacity: 0.9;">
-            {t['app_subtitle']}
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(html['header'], unsafe_allow_html=True)
     
     # Sidebar with glassmorphism effect
     with st.sidebar:
-        st.markdown(f'<h2 style="color: white; text-align: center; font-size: 2rem; margin-bottom: 2rem;">{t["control_panel"]}</h2>', unsafe_allow_html=True)
+        st.markdown(html['control_panel'], unsafe_allow_html=True)
         
-        st.markdown(f'<h3 style="color: white; font-size: 1.3rem;">{t["soil_nutrients"]}</h3>', unsafe_allow_html=True)
-        nitrogen = st.number_input(t["nitrogen"], 0.0, 140.0, 50.0, 1.0, help="Essential for plant growth")
-        phosphorus = st.number_input(t["phosphorus"], 0.0, 145.0, 52.0, 1.0, help="Important for roots and flowers")
-        potassium = st.number_input(t["potassium"], 0.0, 205.0, 48.0, 1.0, help="Helps disease resistance")
+        st.markdown(html['soil_nutrients'], unsafe_allow_html=True)
+        nitrogen = st.number_input(t["nitrogen"], *INPUT_SPECS['N'], help="Essential for plant growth")
+        phosphorus = st.number_input(t["phosphorus"], *INPUT_SPECS['P'], help="Important for roots and flowers")
+        potassium = st.number_input(t["potassium"], *INPUT_SPECS['K'], help="Helps disease resistance")
         
-        st.markdown(f'<h3 style="color: white; font-size: 1.3rem; margin-top: 2rem;">{t["environmental_conditions"]}</h3>', unsafe_allow_html=True)
-        temperature = st.number_input(t["temperature"], 0.0, 50.0, 25.0, 0.5, help="Average temperature")
-        humidity = st.number_input(t["humidity"], 0.0, 100.0, 65.0, 1.0, help="Relative humidity")
-        ph = st.number_input(t["ph_level"], 0.0, 14.0, 7.0, 0.1, help="Soil acidity/alkalinity")
-        rainfall = st.number_input(t["rainfall"], 0.0, 500.0, 120.0, 5.0, help="Annual rainfall")
+        st.markdown(html['environmental_conditions'], unsafe_allow_html=True)
+        temperature = st.number_input(t["temperature"], *INPUT_SPECS['temperature'], help="Average temperature")
+        humidity = st.number_input(t["humidity"], *INPUT_SPECS['humidity'], help="Relative humidity")
+        ph = st.number_input(t["ph_level"], *INPUT_SPECS['ph'], help="Soil acidity/alkalinity")
+        rainfall = st.number_input(t["rainfall"], *INPUT_SPECS['rainfall'], help="Annual rainfall")
         
         st.markdown('<div style="margin-top: 3rem;"></div>', unsafe_allow_html=True)
         predict_button = st.button(t["predict_button"], type="primary", use_container_width=True)
+        st.checkbox(t["demo_pacing"], key="demo_pacing")
     
     # Main content with glass morphism
-    st.markdown(f"""
-    <div class="glass-section">
-        <h2 class="section-title">{t["how_it_works"]}</h2>
-        <p style="color: white; font-size: 1.3rem; text-align: center; line-height: 1.8; font-weight: 500;">
-            {t["how_it_works_desc"]}
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(html['how_it_works'], unsafe_allow_html=True)
     
     # Feature cards with animations
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(f"""
-        <div class="feature-card">
-            <h4>{t["advanced_soil"]}</h4>
-            <p>{t["advanced_soil_desc"]}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(html['feature_soil'], unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div class="feature-card">
-            <h4>{t["climate_intelligence"]}</h4>
-            <p>{t["climate_intelligence_desc"]}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(html['feature_climate'], unsafe_allow_html=True)
     
     with col3:
-        st.markdown(f"""
-        <div class="feature-card">
-            <h4>{t["machine_learning"]}</h4>
-            <p>{t["machine_learning_desc"]}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(html['feature_ml'], unsafe_allow_html=True)
     
     # Interactive parameter display
-    st.markdown(f'<h2 class="section-title">{t["current_parameters"]}</h2>', unsafe_allow_html=True)
+    st.markdown(html['current_parameters'], unsafe_allow_html=True)
     
     param_col1, param_col2 = st.columns(2)
     
@@ -1071,16 +855,50 @@ def main():
     
     # Prediction section
     if predict_button:
-        if all([nitrogen >= 0, phosphorus >= 0, potassium >= 0, temperature >= 0, humidity >= 0, ph >= 0, rainfall >= 0]):
+        features = [nitrogen, phosphorus, potassium, temperature, humidity, ph, rainfall]
+        problems = explain(validate(features)[1][0])
+        if not problems:
             with st.spinner(t["analyzing_data"]):
-                time.sleep(2)  # Simulate processing time
+                if st.session_state.demo_pacing:
+                    time.sleep(2)  # Simulate processing time
                 
                 # Load model and make prediction
-                model, accuracy = train_model()
-                features = [nitrogen, phosphorus, potassium, temperature, humidity, ph, rainfall]
-                prediction = predict_crop(model, features)
+                timing = {}
+
+                def compute(snapped):
+                    # "Processing time" is the model call alone, not loading or caching
+                    start = time.perf_counter()
+                    try:
+                        return predict_crop(model, snapped)
+                    finally:
+                        timing['predict'] = time.perf_counter() - start
+
+                ranking = failure = None
+                with profiled('predict'):
+                    start = time.perf_counter()
+                    try:
+                        with span('get_model'):
+                            entry = get_model()
+                        accuracy = 'n/a' if entry.accuracy is None else f"{entry.accuracy:.1%}"
+                        model = entry.model
+                        # Grids and models that are not tree ensembles are scored in-thread
+                        if POOL_WORKERS > 0 and entry.backend != 'grid' and compilable(entry.model):
+                            model = get_inference_pool(entry.model, entry.version)
+                        start = time.perf_counter()
+                        with span('prediction'):
+                            ranking = get_prediction_cache().get_or_compute(features, entry.version, compute)
+                    except Exception as e:
+                        # A model that fails to load or predict is reported, not a crashed page
+                        failure = f"{type(e).__name__}: {e}"
+                    # A cache hit costs only the lookup
+                    elapsed = timing.get('predict', time.perf_counter() - start)
                 
-                if prediction:
+                if ranking:
+                    prediction, confidence = ranking[0]
+                    alternatives = ' · '.join(
+                        f"{crop.title()} {p:.0%}" for crop, p in ranking[1:] if p > 0
+                    )
+                    
                     # Success animation
                     st.balloons()
                     
@@ -1094,9 +912,10 @@ def main():
                             {t["optimal_crop_choice"].format(prediction.title())}
                         </p>
                         <div style="margin-top: 2rem; font-size: 1.2rem;">
-                            <div>{t["model_accuracy"]}: {accuracy:.1%}</div>
-                            <div>{t["confidence_level"]}</div>
-                            <div>{t["processing_time"]}</div>
+                            <div>{t["model_accuracy"]}: {accuracy}</div>
+                            <div>{t["confidence_level"].format(confidence)}</div>
+                            <div>{t["processing_time"].format(elapsed)}</div>
+                            {f'<div>{t["alternative_crops"]}: {alternatives}</div>' if alternatives else ''}
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
@@ -1105,30 +924,21 @@ def main():
                     display_crop_info(prediction, st.session_state.language)
                     
                     # Display recommendations
-                    display_recommendations(prediction, st.session_state.language)
+                    display_recommendations(prediction, st.session_state.language, st.session_state.demo_pacing)
                     
                     st.success(t["analysis_complete"])
                 
                 else:
-                    st.error("❌ Unable to generate recommendation. Please verify your input values.")
+                    st.error(f"❌ Unable to generate recommendation: {failure}")
         else:
-            st.error("❌ Please ensure all parameter values are non-negative.")
+            st.error("❌ Please check your input values: " + "; ".join(problems))
     
     # Footer with model information
-    st.markdown(f"""
-    <div class="glass-section" style="margin-top: 5rem;">
-        <h3 style="color: white; text-align: center; font-size: 1.8rem; margin-bottom: 2rem;">
-            {t["about_agriverse"]}
-        </h3>
-        <div style="color: rgba(255, 255, 255, 0.9); text-align: center; line-height: 1.8;">
-            <p><strong>{t["mission"]}</strong></p>
-            <p><strong>{t["technology"]}</strong></p>
-            <p><strong>{t["data"]}</strong></p>
-            <p><strong>{t["impact"]}</strong></p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(html['footer'], unsafe_allow_html=True)
 
 
 if __name__ == '__main__':
-    main()
+    with span('rerun'), profiled('rerun'):
+        main()
+    if METRICS_FILE:
+        write_file(METRICS_FILE, METRICS_INTERVAL)